@@ -0,0 +1,175 @@
+import argparse
+import http.client
+import json
+import signal
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+import numpy as np
+
+# ==============================================================================
+# 📈 LOAD TEST FOR api_server.py
+# ==============================================================================
+# python api_loadtest.py --spawn 4 --scenario beam --requests 5000 --concurrency 32
+# Each client thread keeps one HTTP/1.1 connection open and sends requests back to
+# back; the report gives request / item throughput and latency percentiles.
+# --metrics prints the server's micro-batcher statistics (one worker's view).
+
+SECTIONS = ["H-200x100x5.5x8", "H-300x150x6.5x9", "H-400x200x8x13", "H-500x200x10x16", "H-600x200x11x17"]
+
+CONNECTION = dict(beam_tw=8, plate_t=10, plate_h=210, bolt_dia=20, weld_sz=6,
+                  pitch=60, lev=30, n_rows=3, setback=12, leh=35)
+
+def _beam(rng, batch):
+    return "/v1/beam/check", {"section": SECTIONS[rng.integers(len(SECTIONS))], "L_m": float(rng.uniform(2, 15))}
+
+def _beam_batch(rng, batch):
+    return "/v1/beam/batch", {"sections": [SECTIONS[i] for i in rng.integers(len(SECTIONS), size=batch)],
+                              "L_m": rng.uniform(2, 15, batch).round(2).tolist()}
+
+def _connection(rng, batch):
+    return "/v1/connection/check", {**CONNECTION, "load": float(rng.uniform(5000, 30000))}
+
+def _connection_capacity(rng, batch):
+    return "/v1/connection/capacity", {**CONNECTION, "load": float(rng.uniform(5000, 30000))}
+
+def _connection_batch(rng, batch):
+    return "/v1/connection/batch", {"items": [{**CONNECTION, "load": float(v)} for v in rng.uniform(5000, 30000, batch)]}
+
+def _select(rng, batch):
+    return "/v1/sections/select", {"L_m": rng.uniform(3, 12, batch).round(2).tolist(),
+                                   "w": rng.uniform(500, 5000, batch).round(0).tolist()}
+
+def _analyze(rng, batch):
+    patterns = []
+    for L in rng.uniform(3, 12, batch).round(2):
+        patterns.append({"section": SECTIONS[rng.integers(len(SECTIONS))], "L_m": float(L), "loads": [
+            {"type": "udl", "w": float(rng.uniform(200, 1500))},
+            {"type": "point", "P": float(rng.uniform(0, 5000)), "a": float(rng.uniform(0, L))}]})
+    return "/v1/beam/analyze", {"patterns": patterns}
+
+# name -> (payload builder, items per request uses --batch)
+SCENARIOS = {
+    "beam": (_beam, False),
+    "beam-batch": (_beam_batch, True),
+    "connection": (_connection, False),
+    "connection-capacity": (_connection_capacity, False),
+    "connection-batch": (_connection_batch, True),
+    "select": (_select, True),
+    "analyze": (_analyze, True),
+}
+
+def _client(url, scenario, n_requests, batch, seed, latencies, errors):
+    build = SCENARIOS[scenario][0]
+    rng = np.random.default_rng(seed)
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+    headers = {"Content-Type": "application/json"}
+    for _ in range(n_requests):
+        path, body = build(rng, batch)
+        data = json.dumps(body)
+        t0 = time.perf_counter()
+        try:
+            conn.request("POST", path, data, headers)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status != 200:
+                errors.append(resp.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection(url.hostname, url.port, timeout=60)
+            continue
+        latencies.append(time.perf_counter() - t0)
+    conn.close()
+
+def server_metrics(url):
+    """GET /v1/metrics (answered by whichever worker accepts the connection)"""
+    conn = http.client.HTTPConnection(url.hostname, url.port, timeout=10)
+    conn.request("GET", "/v1/metrics")
+    return json.loads(conn.getresponse().read())
+
+def wait_ready(url, timeout=30.0):
+    """Poll /v1/health until the server answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(url.hostname, url.port, timeout=2)
+            conn.request("GET", "/v1/health")
+            if conn.getresponse().status == 200:
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+def run(url, scenario="beam", requests=2000, concurrency=16, batch=100):
+    """Run one scenario; returns a summary dict"""
+    url = urlparse(url)
+    latencies, errors = [], []
+    per_client = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    threads = [threading.Thread(target=_client, args=(url, scenario, n, batch, i, latencies, errors))
+               for i, n in enumerate(per_client)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    lat = np.array(latencies) * 1000 if latencies else np.array([np.nan])
+    items = len(latencies) * (batch if SCENARIOS[scenario][1] else 1)
+    return {
+        "scenario": scenario, "requests": len(latencies), "errors": len(errors),
+        "seconds": elapsed, "req_per_s": len(latencies) / elapsed, "items_per_s": items / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)), "p95_ms": float(np.percentile(lat, 95)),
+        "p99_ms": float(np.percentile(lat, 99)),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test for api_server.py")
+    parser.add_argument("--url", default="http://127.0.0.1:8765")
+    parser.add_argument("--scenario", choices=list(SCENARIOS) + ["all"], default="all")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch", type=int, default=100, help="items per batch request")
+    parser.add_argument("--spawn", type=int, default=0, metavar="WORKERS",
+                        help="start api_server.py with this many workers for the run")
+    parser.add_argument("--batch-window-ms", type=float, default=None, help="passed to the spawned server")
+    parser.add_argument("--beam-window-ms", type=float, default=None, help="passed to the spawned server")
+    parser.add_argument("--batch-size", type=int, default=None, help="passed to the spawned server")
+    parser.add_argument("--metrics", action="store_true", help="print the server's micro-batcher metrics")
+    args = parser.parse_args()
+
+    server = None
+    url = urlparse(args.url)
+    if args.spawn:
+        cmd = [sys.executable, "api_server.py", "--host", url.hostname,
+               "--port", str(url.port), "--workers", str(args.spawn)]
+        if args.batch_window_ms is not None:
+            cmd += ["--batch-window-ms", str(args.batch_window_ms)]
+        if args.beam_window_ms is not None:
+            cmd += ["--beam-window-ms", str(args.beam_window_ms)]
+        if args.batch_size is not None:
+            cmd += ["--batch-size", str(args.batch_size)]
+        server = subprocess.Popen(cmd)
+    try:
+        if not wait_ready(url):
+            sys.exit(f"No API at {args.url}")
+        scenarios = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+        print(f"{'scenario':<18}{'req':>7}{'err':>5}{'req/s':>9}{'items/s':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+        for name in scenarios:
+            r = run(args.url, name, args.requests, args.concurrency, args.batch)
+            print(f"{name:<18}{r['requests']:>7}{r['errors']:>5}{r['req_per_s']:>9.0f}{r['items_per_s']:>11.0f}"
+                  f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}")
+        if args.metrics:
+            m = server_metrics(url)
+            print(f"\nmicro-batcher (pid {m['pid']}, window {m['window_ms']} ms, max {m['max_size']}):")
+            for name, b in m["batchers"].items():
+                q = b["queue_ms"]
+                print(f"  {name:<10} items {b['items']:>7}  batches {b['batches']:>6}  mean batch {b['mean_batch']:6.1f}"
+                      f"  queue p50/p99 {q['p50'] or 0:.2f}/{q['p99'] or 0:.2f} ms  errors {b['errors']}")
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGINT)   # api_server stops its pre-forked workers
+            server.wait(timeout=15)
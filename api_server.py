@@ -0,0 +1,480 @@
+import json
+import os
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+from database import section_arrays, sorted_sections
+from catalog import BUILTIN_KEY, CatalogError, get_catalog, available_catalogs
+from calculator import core_calculation, core_calculation_vec
+from calculator_tab import MODES, calculate_shear_tab, calculate_shear_tab_vec, shear_tab_columns
+from envelope import MODE_NAMES
+from batcher import MicroBatcher, beam_batch as coalesce_beams, check_beam_keys, shear_tab_batch
+from section_props import complete_props
+from beam_analysis import check_patterns, load_arrays
+from connection_solver import solve_connection
+
+# ==============================================================================
+# 🌐 LOCAL HTTP JSON API (beam / connection checks, section selection, typical details)
+# ==============================================================================
+# Standalone service (no Streamlit session): python api_server.py --workers 4
+# Single-item endpoints call the same functions as the UI; /batch endpoints take
+# arrays and run the vectorized engines. --workers N pre-forks N processes that
+# share one listening socket (POSIX); each process serves requests on threads.
+# Concurrent connection capacity checks are coalesced by a per-process micro-batcher
+# (batcher.py; --batch-window-ms 0 turns it off). Single beam checks are cheaper
+# scalar than batched, so their batcher is off unless --beam-window-ms is set.
+#
+#   GET  /v1/health                     GET  /v1/catalogs
+#   GET  /v1/sections?catalog=<key>
+#   POST /v1/beam/check                 POST /v1/beam/batch
+#   POST /v1/connection/check           POST /v1/connection/batch
+#   POST /v1/connection/capacity        GET  /v1/metrics
+#   POST /v1/sections/select            POST /v1/typical/solve
+#   POST /v1/beam/analyze  (point / partial / linear loads, single or "patterns" batch)
+#
+# หน่วย: span m, load kg/m (beam) / kg (connection), Fy ksc, E GPa, dimensions mm
+
+API_VERSION = "1"
+MAX_BATCH = 200_000       # items per batch request
+MAX_BODY = 32 * 2**20     # bytes
+PARENT_CHECK_S = 1.0      # pre-forked workers exit this soon after the parent dies
+DEFAULTS = {"Fy": 2400.0, "E_gpa": 200.0, "method": "ASD", "def_limit": 360}
+
+# Micro-batching window per batcher [ms], 0 = off (set before serve(); batchers start
+# lazily in each worker process). Beam checks measured slower batched (1570 -> 1140 req/s).
+BATCH_WINDOW_MS = {"beam": 0.0, "shear_tab": 2.0}
+BATCH_SIZE = 256
+_BATCHERS = {}
+_BATCHERS_LOCK = threading.Lock()
+
+BEAM_FIELDS = ("ws", "wm", "wd", "w_gov", "Lp", "Lr", "L_vm", "L_md", "V_des", "M_des")
+ANALYSIS_FIELDS = ("V_max", "M_max", "x_Mmax", "delta_max", "delta_allow", "Cb", "V_des", "M_des",
+                   "R_A", "R_B", "util_V", "util_M", "util_d", "util", "zone", "ok")
+
+class ApiError(ValueError):
+    """Client error -> HTTP 400 (or `status`)"""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+# ==========================================
+# 🧰 HELPERS
+# ==========================================
+def _jsonable(v):
+    """NumPy / non-finite values -> plain JSON (NaN, inf -> null)"""
+    if isinstance(v, dict):
+        return {k: _jsonable(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_jsonable(x) for x in v]
+    if isinstance(v, np.ndarray):
+        if v.dtype.kind == 'f':
+            return np.where(np.isfinite(v), v, None).tolist()
+        return v.tolist()
+    if isinstance(v, np.generic):
+        v = v.item()
+    if isinstance(v, float) and not np.isfinite(v):
+        return None
+    return v
+
+def _positive(name, v):
+    """v (scalar or array) unchanged; ApiError unless every value is finite and > 0"""
+    if not np.all(np.isfinite(v) & (np.asarray(v) > 0)):
+        raise ApiError(f"{name} must be finite and > 0")
+    return v
+
+def _criteria(p):
+    c = {k: p.get(k, d) for k, d in DEFAULTS.items()}
+    if c["method"] not in ("ASD", "LRFD"):
+        raise ApiError("method must be 'ASD' or 'LRFD'")
+    Fy, E_gpa, def_limit = (_positive(k, float(c[k])) for k in ("Fy", "E_gpa", "def_limit"))
+    return Fy, E_gpa, c["method"], int(def_limit)
+
+def _catalog(p):
+    try:
+        return get_catalog(p.get("catalog", BUILTIN_KEY))
+    except (OSError, CatalogError):
+        raise ApiError(f"Unknown catalog: {p.get('catalog')}", 404)
+
+def _props(p, catalog):
+    """Section by name, or ad-hoc 'props' (D, B, tw, tf [mm]; missing values computed)"""
+    if "props" in p:
+        if not isinstance(p["props"], dict):
+            raise ApiError("props must be an object")
+        return p.get("section", "custom"), complete_props(dict(p["props"]))
+    name = p.get("section")
+    if name not in catalog:
+        raise ApiError(f"Unknown section: {name}", 404)
+    return name, catalog[name]
+
+def _array(p, key, default=None):
+    v = p.get(key, default)
+    if v is None:
+        raise ApiError(f"Missing field: {key}")
+    a = np.asarray(v, dtype=float)
+    if a.size > MAX_BATCH:
+        raise ApiError(f"{key}: more than {MAX_BATCH} items")
+    return a
+
+def _batcher(name):
+    """This process's MicroBatcher for `name` ('beam' / 'shear_tab'), None when disabled"""
+    if BATCH_WINDOW_MS.get(name, 0) <= 0:
+        return None
+    if name not in _BATCHERS:
+        with _BATCHERS_LOCK:
+            if name not in _BATCHERS:
+                fn = coalesce_beams if name == "beam" else shear_tab_batch
+                if name == "beam":   # batched rows must keep the scalar response's keys
+                    check_beam_keys(next(iter(get_catalog(BUILTIN_KEY).values())))
+                _BATCHERS[name] = MicroBatcher(fn, BATCH_WINDOW_MS[name], BATCH_SIZE, name)
+    return _BATCHERS[name]
+
+# ==========================================
+# 🏗️ ENDPOINTS (payload dict -> response dict)
+# ==========================================
+def health(p):
+    return {"status": "ok", "version": API_VERSION, "pid": os.getpid()}
+
+def metrics(p):
+    """Micro-batcher counters and queue latency (this worker process)"""
+    return {"pid": os.getpid(), "window_ms": BATCH_WINDOW_MS, "max_size": BATCH_SIZE,
+            "batchers": {name: b.metrics.snapshot() for name, b in _BATCHERS.items()}}
+
+def catalogs(p):
+    return {"catalogs": available_catalogs()}
+
+def sections(p):
+    catalog = _catalog(p)
+    return {"sections": [{"section": n, **catalog[n]} for n in sorted_sections(catalog)]}
+
+def beam_check(p):
+    """core_calculation for one section and span (coalesced with concurrent calls)"""
+    name, props = _props(p, _catalog(p))
+    Fy, E_gpa, method, def_limit = _criteria(p)
+    L_m = _positive("L_m", float(p.get("L_m", 6.0)))
+    batcher = _batcher("beam")
+    if batcher is not None:
+        c = batcher.call((props, L_m, Fy, E_gpa, method, def_limit))
+    else:
+        c = core_calculation(L_m, Fy, E_gpa, props, method, def_limit)
+    w_gov = min(c["ws"], c["wm"], c["wd"])
+    return {"section": name, "w_gov": w_gov, "w_net": max(0.0, w_gov - props["W"]), **c}
+
+def beam_batch(p):
+    """
+    core_calculation_vec over arrays. 'sections' and 'L_m' broadcast item by item,
+    or with "grid": true every section is evaluated at every span (rows = sections).
+    """
+    catalog = _catalog(p)
+    names = p.get("sections") or sorted_sections(catalog)
+    if isinstance(names, str):
+        names = [names]
+    unknown = [n for n in names if n not in catalog]
+    if unknown:
+        raise ApiError(f"Unknown sections: {', '.join(map(str, unknown[:10]))}", 404)
+    L = _positive("L_m", _array(p, "L_m"))
+    Fy, E_gpa, method, def_limit = _criteria(p)
+
+    arr = section_arrays(list(names), catalog)
+    if p.get("grid"):
+        props = {k: v[:, None] for k, v in arr.items()}
+        L = L.reshape(1, -1)
+        if len(names) * L.size > MAX_BATCH:
+            raise ApiError(f"grid larger than {MAX_BATCH} items")
+    else:
+        props = arr
+        try:
+            np.broadcast_shapes(L.shape, (len(names),))
+        except ValueError:
+            raise ApiError("sections and L_m must have the same length (or use grid)")
+    c = core_calculation_vec(L, Fy, E_gpa, props, method, def_limit)
+    shape = np.broadcast_shapes(np.shape(c["w_gov"]), np.shape(props["W"]))
+    out = {k: np.broadcast_to(c[k], shape) for k in BEAM_FIELDS}
+    out["w_net"] = np.maximum(0.0, c["w_gov"] - props["W"])
+    out["mode"] = np.asarray(MODE_NAMES)[np.broadcast_to(c["mode"], shape)]
+    out["zone"] = np.broadcast_to(c["zone"], shape)
+    return {"sections": list(names), "L_m": L.ravel(), **out}
+
+def beam_analyze(p):
+    """
+    Shear / moment / deflection under general loads (beam_analysis), checked with Cb
+    from the moment diagram. One pattern {section, L_m, loads} or {"patterns": [...]}
+    (each pattern may name its own section); "diagrams": true adds x / V / M / delta
+    for a single pattern.
+    """
+    catalog = _catalog(p)
+    Fy, E_gpa, method, def_limit = _criteria(p)
+    single = "patterns" not in p
+    patterns = [p] if single else p["patterns"]
+    if not isinstance(patterns, list) or not patterns:
+        raise ApiError("patterns must be a non-empty list")
+    if len(patterns) > MAX_BATCH // 10:
+        raise ApiError(f"more than {MAX_BATCH // 10} patterns")
+    if any(not isinstance(pt, dict) for pt in patterns):
+        raise ApiError("each pattern must be an object")
+    default = p.get("section")
+    names = [pt.get("section", default) for pt in patterns]
+    unknown = sorted({str(n) for n in names if n not in catalog})
+    if unknown:
+        raise ApiError(f"Unknown sections: {', '.join(unknown[:10])}", 404)
+    arrays = load_arrays([{**pt, "L_m": pt.get("L_m", p.get("L_m", 6.0))} for pt in patterns])
+    r = check_patterns(arrays, section_arrays(names, catalog), Fy, E_gpa, method, def_limit,
+                       self_weight=bool(p.get("self_weight", True)), diagrams=single and bool(p.get("diagrams")))
+    out = {k: r[k] for k in ANALYSIS_FIELDS}
+    out["mode"] = np.asarray(MODE_NAMES)[r["mode"]]
+    if single:
+        out = {k: v[0] for k, v in out.items()}
+        if p.get("diagrams"):
+            out.update({k: r[k][0] for k in ("x", "V", "M", "delta")})
+        return {"section": names[0], "L_m": arrays[0][0], **out}
+    return {"sections": names, "L_m": arrays[0], **out}
+
+def connection_check(p):
+    """calculate_shear_tab for one connection (full report incl. calculation text)"""
+    try:
+        return calculate_shear_tab(p)
+    except KeyError as e:
+        raise ApiError(f"Missing field: {e.args[0]}")
+
+def connection_capacity(p):
+    """Capacities of one connection (a connection/batch row; coalesced with concurrent calls)"""
+    batcher = _batcher("shear_tab")
+    try:
+        return batcher.call(p) if batcher is not None else shear_tab_batch([p])[0]
+    except KeyError as e:
+        raise ApiError(f"Missing field: {e.args[0]}")
+
+def connection_batch(p):
+    """calculate_shear_tab_vec; 'items' = list of calculate_shear_tab inputs (or columns)"""
+    items = p.get("items")
+    if isinstance(items, list):
+        if len(items) > MAX_BATCH:
+            raise ApiError(f"items: more than {MAX_BATCH}")
+    else:
+        cols = p.get("columns") or {}
+    try:
+        r = calculate_shear_tab_vec(shear_tab_columns(items) if isinstance(items, list) else cols)
+    except KeyError as e:
+        raise ApiError(f"Missing field: {e.args[0]}")
+    except ValueError as e:
+        raise ApiError(str(e))
+    return {**{m: r[m] for m in MODES}, "gov_capacity": r["gov_capacity"],
+            "gov_mode": np.asarray(MODES)[r["gov_mode"]], "utilization": r["utilization"], "ok": r["ok"]}
+
+def select_sections(p):
+    """
+    Lightest sections carrying a net uniform load w [kg/m] at span L_m.
+    L_m and w may be arrays (one answer per pair); 'max_depth' [mm] limits D.
+    A single query also returns the 'top' lightest passing candidates.
+    """
+    catalog = _catalog(p)
+    names = np.asarray(sorted_sections(catalog))
+    L = _positive("L_m", _array(p, "L_m"))
+    w = _array(p, "w")
+    try:
+        L, w = np.broadcast_arrays(L, w)
+    except ValueError:
+        raise ApiError("L_m and w must have the same length")
+    Fy, E_gpa, method, def_limit = _criteria(p)
+
+    arr = section_arrays(list(names), catalog)
+    props = {k: v[:, None] for k, v in arr.items()}
+    c = core_calculation_vec(L.reshape(1, -1), Fy, E_gpa, props, method, def_limit)
+    net = c["w_gov"] - props["W"]
+    ok = net >= w.reshape(1, -1)
+    if "max_depth" in p:
+        ok &= props["D"] <= float(p["max_depth"])
+    cost = np.where(ok, props["W"], np.inf)
+    best = cost.argmin(axis=0)
+    found = np.isfinite(cost[best, np.arange(cost.shape[1])])
+    cols = np.arange(cost.shape[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        util = w.ravel() / net[best, cols]
+    out = {
+        "best": np.where(found, names[best], None),
+        "W": np.where(found, arr["W"][best], np.nan),
+        "utilization": np.where(found, util, np.nan),
+        "mode": np.where(found, np.asarray(MODE_NAMES)[c["mode"][best, cols]], None),
+    }
+    if L.ndim == 0:
+        out = {k: v[0] for k, v in out.items()}
+        top = int(p.get("top", 5))
+        order = [i for i in np.argsort(cost[:, 0], kind="stable")[:top] if ok[i, 0]]
+        out["candidates"] = [{"section": names[i], "W": arr["W"][i], "D": arr["D"][i],
+                              "w_net": net[i, 0], "utilization": float(w) / net[i, 0],
+                              "mode": MODE_NAMES[c["mode"][i, 0]]} for i in order]
+    return out
+
+# Solver warm-start state per (catalog, section, method, bolt group), shared by the threads.
+# _WARM[(catalog, section)] = (lock, state): only solves of the same section wait on each other;
+# _WARM_LOCK guards the dict itself.
+_WARM = {}
+_WARM_LOCK = threading.Lock()
+
+def typical_solve(p):
+    """
+    Typical shear-tab detail (connection_solver, as tab7) for 'section' or a list of 'sections'
+    at ratio × V_des of the beam at span L_m (defaults: 0.75 and 6.0 m, as in tab7).
+    """
+    catalog = _catalog(p)
+    Fy, E_gpa, method, def_limit = _criteria(p)
+    names = p.get("sections") or [p.get("section")]
+    L_m = _positive("L_m", float(p.get("L_m", 6.0)))
+    ratio = float(p.get("ratio", 0.75))
+    bolt_group = p.get("bolt_group", "Concentric")
+    if bolt_group not in ("Concentric", "IC"):
+        raise ApiError("bolt_group must be 'Concentric' or 'IC'")
+
+    results = []
+    for name in names:
+        if name not in catalog:
+            raise ApiError(f"Unknown section: {name}", 404)
+        props = catalog[name]
+        V_target = ratio * core_calculation(L_m, Fy, E_gpa, props, method, def_limit)["V_des"]
+        key = (getattr(catalog, "key", BUILTIN_KEY), name)
+        with _WARM_LOCK:
+            lock, warm = _WARM.setdefault(key, (threading.Lock(), {}))
+        with lock:
+            conn = solve_connection(props, V_target, method, warm=warm, bolt_group=bolt_group)
+        results.append({"section": name, "V_target": V_target, **conn})
+    return results[0] if "sections" not in p else {"results": results}
+
+ROUTES = {
+    ("GET", "/v1/health"): health,
+    ("GET", "/v1/metrics"): metrics,
+    ("GET", "/v1/catalogs"): catalogs,
+    ("GET", "/v1/sections"): sections,
+    ("POST", "/v1/beam/check"): beam_check,
+    ("POST", "/v1/beam/batch"): beam_batch,
+    ("POST", "/v1/beam/analyze"): beam_analyze,
+    ("POST", "/v1/connection/check"): connection_check,
+    ("POST", "/v1/connection/capacity"): connection_capacity,
+    ("POST", "/v1/connection/batch"): connection_batch,
+    ("POST", "/v1/sections/select"): select_sections,
+    ("POST", "/v1/typical/solve"): typical_solve,
+}
+
+# ==========================================
+# 🔌 HTTP
+# ==========================================
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive for load tests / clients
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    server_version = "SYS-Beam-API/" + API_VERSION
+    log_requests = False
+
+    def _send(self, status, body):
+        data = json.dumps(_jsonable(body), separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        route = ROUTES.get((method, url.path.rstrip("/")))
+        if route is None:
+            known = any(path == url.path.rstrip("/") for _, path in ROUTES)
+            return self._send(405 if known else 404, {"error": f"{method} {url.path} not found"})
+        try:
+            if method == "POST":
+                size = int(self.headers.get("Content-Length") or 0)
+                if size > MAX_BODY:
+                    raise ApiError("request body too large", 413)
+                payload = json.loads(self.rfile.read(size) or b"{}")
+                if not isinstance(payload, dict):
+                    raise ApiError("body must be a JSON object")
+            else:
+                payload = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            self._send(200, route(payload))
+        except ApiError as e:
+            self._send(e.status, {"error": str(e)})
+        except (json.JSONDecodeError, TypeError, ValueError, KeyError) as e:
+            self._send(400, {"error": f"{type(e).__name__}: {e}"})
+        except Exception as e:  # keep the worker alive; report as server error
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, format, *args):
+        if self.log_requests:
+            super().log_message(format, *args)
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128   # listen backlog (socketserver default 5 drops bursts)
+
+def make_server(host="127.0.0.1", port=8765):
+    return ApiServer((host, port), ApiHandler)
+
+def serve(host="127.0.0.1", port=8765, workers=1):
+    """
+    Bind once, then pre-fork `workers` processes that accept on the shared socket
+    (the kernel balances connections). workers=1 or no fork() -> single process.
+    """
+    server = make_server(host, port)
+    print(f"API listening on http://{host}:{server.server_address[1]} ({workers} worker(s))", flush=True)
+    if workers <= 1 or not hasattr(os, "fork"):
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+        return
+
+    import multiprocessing as mp
+    ctx = mp.get_context("fork")
+    procs = [ctx.Process(target=_worker, args=(server, os.getpid()), daemon=True) for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+    # SIGTERM (e.g. api_loadtest --spawn) must also stop the workers: run the finally below
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+    try:
+        for proc in procs:
+            proc.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.join(timeout=5)
+        server.server_close()
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def _worker(server, parent_pid):
+    """Pre-forked worker: serve until terminated, or until the parent process is gone"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # Ctrl+C: the parent stops the workers
+    def watchdog():
+        while os.getppid() == parent_pid:
+            time.sleep(PARENT_CHECK_S)
+        os._exit(0)   # parent killed (SIGKILL): no stale workers left on the port
+    threading.Thread(target=watchdog, daemon=True).start()
+    server.serve_forever()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="SYS beam / connection JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (pre-forked)")
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW_MS["shear_tab"],
+                        help="micro-batch window for connection capacity checks (0 = no batching)")
+    parser.add_argument("--beam-window-ms", type=float, default=BATCH_WINDOW_MS["beam"],
+                        help="micro-batch window for single beam checks (0 = no batching)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="flush a micro-batch at this many items")
+    parser.add_argument("--log", action="store_true", help="log every request to stderr")
+    args = parser.parse_args()
+    ApiHandler.log_requests = args.log
+    BATCH_WINDOW_MS = {"beam": args.beam_window_ms, "shear_tab": args.batch_window_ms}
+    BATCH_SIZE = args.batch_size
+    serve(args.host, args.port, args.workers)
@@ -1,6 +1,8 @@
+import os
 import streamlit as st
-from database import SYS_H_BEAMS
+from database import sorted_sections
 from calculator import core_calculation
+from catalog import available_catalogs, get_catalog, import_catalog, CatalogError, BUILTIN_KEY
 
 # Import Modules
 from tab1_details import render_tab1
@@ -10,13 +12,47 @@ from tab4_summary import render_tab4
 from tab5_saved import render_tab5    # Timeline/List Analysis (Tab 5 เดิม)
 from tab6_design import render_tab6   # Manual Check
 from tab7_typical import render_tab7  # [NEW] Typical Detail Summary
+from tab8_design_space import render_tab8  # Span × Load Utilization Map
+from tab9_framing import render_tab9  # Floor Framing Optimizer
+from tab10_analysis import render_tab10  # Point / partial / linear load analysis
 
 # --- Config ---
 st.set_page_config(page_title="SYS Structural Report", layout="wide")
 st.title("🏗️  H-Beam: Professional Design Tool")
 
+def import_uploaded_catalog():
+    """Button callback: compile the uploaded CSV/JSON and select it"""
+    up = st.session_state.get("catalog_upload")
+    if up is None:
+        return
+    label = st.session_state.get("catalog_label") or os.path.splitext(up.name)[0]
+    fmt = "json" if up.name.lower().endswith(".json") else "csv"
+    try:
+        cat = import_catalog(up.getvalue(), label=label, fmt=fmt)
+        st.session_state["catalog_key"] = cat.key
+        st.session_state["catalog_msg"] = ("success", f"Imported {len(cat)} sections into '{cat.label}'")
+    except CatalogError as e:
+        st.session_state["catalog_msg"] = ("error", str(e))
+
 # --- Sidebar ---
 with st.sidebar:
+    st.header("0. Section Catalog")
+    catalogs = available_catalogs()
+    if st.session_state.get("catalog_key") not in catalogs:
+        st.session_state["catalog_key"] = BUILTIN_KEY
+    cat_key = st.selectbox("Catalog", list(catalogs), format_func=catalogs.get, key="catalog_key")
+    with st.expander("📥 Import Catalog (CSV / JSON)"):
+        st.caption("Columns: name, D, B, tw, tf [mm]; optional W [kg/m], Ix, Iy [cm4], Zx, Zy [cm3], r [mm] "
+                   "(blanks are computed from the plates, r = 0 for welded sections). "
+                   "Units may be given in headers, e.g. `Ix [mm4]`.")
+        st.file_uploader("Catalog file", type=["csv", "json"], key="catalog_upload")
+        st.text_input("Catalog name", key="catalog_label")
+        st.button("Import", on_click=import_uploaded_catalog)
+        if "catalog_msg" in st.session_state:
+            kind, msg = st.session_state.pop("catalog_msg")
+            (st.success if kind == "success" else st.error)(msg)
+    catalog = get_catalog(cat_key)
+
     st.header("1. Design Criteria")
     method = st.radio("Method", ["ASD", "LRFD"])
     Fy = st.number_input("Fy (Yield Strength) [ksc]", value=2400)
@@ -30,34 +66,37 @@ with st.sidebar:
     def_val = int(def_option.split('/')[1].split()[0])
     
     st.header("2. Single Section Analysis")
-    sort_list = sorted(SYS_H_BEAMS.keys(), key=lambda x: int(x.split('x')[0].split('-')[1]))
-    section = st.selectbox("Select Size to Analyze", sort_list, index=8)
+    sort_list = sorted_sections(catalog)
+    section = st.selectbox("Select Size to Analyze", sort_list, index=min(8, len(sort_list) - 1))
     L_input = st.slider("Span Length (m)", 2.0, 30.0, 6.0, 0.5)
 
 # --- Process ---
-props = SYS_H_BEAMS[section]
+props = catalog[section]
 c = core_calculation(L_input, Fy, E_gpa, props, method, def_val)
 final_w = min(c['ws'], c['wm'], c['wd'])
 
 # --- Display Tabs ---
 # [UPDATE] เพิ่ม Tab 7
-t1, t2, t3, t4, t5, t6, t7 = st.tabs([
+t1, t2, t3, t4, t5, t6, t7, t8, t9, t10 = st.tabs([
     "📝 Detail Report", 
     "📊 Behavior Graph", 
     "📋 Capacity Table",
     "📚 Master Catalog",
     "📊 Timeline Analysis",
     "🛠️ Manual Check",
-    "🔩 Typical Detail" # [NEW] Tab 7
+    "🔩 Typical Detail", # [NEW] Tab 7
+    "🗺️ Design Space",
+    "🏢 Framing Optimizer",
+    "📉 Load Analysis"
 ])
 
 # Render Tab 1: Details
 with t1:
-    render_tab1(c, props, method, Fy, section)
+    render_tab1(c, props, method, Fy, section, L_input, E_gpa, def_val)
 
 # Render Tab 2: Graph
 with t2:
-    render_tab2(c, props, section, L_input, def_val, final_w)
+    render_tab2(c, props, section, L_input, def_val, final_w, method, Fy, E_gpa, catalog)
 
 # Render Tab 3: Capacity
 with t3:
@@ -65,16 +104,28 @@ with t3:
 
 # Render Tab 4: Catalog
 with t4:
-    render_tab4(method, Fy, E_gpa, def_val)
+    render_tab4(method, Fy, E_gpa, def_val, catalog)
 
 # Render Tab 5: Timeline Analysis (Original Logic)
 with t5:
-    render_tab5(method, Fy, E_gpa, def_val)
+    render_tab5(method, Fy, E_gpa, def_val, catalog)
 
 # Render Tab 6: Manual Connection Design
 with t6:
-    render_tab6(method, Fy, E_gpa, def_val)
+    render_tab6(method, Fy, E_gpa, def_val, catalog)
 
 # Render Tab 7: Typical Detail Summary (Auto Run 75%)
 with t7:
-    render_tab7(method, Fy, E_gpa, def_val)
+    render_tab7(method, Fy, E_gpa, def_val, catalog)
+
+# Render Tab 8: Design Space (Span × Load Utilization)
+with t8:
+    render_tab8(section, method, Fy, E_gpa, def_val, catalog)
+
+# Render Tab 9: Floor Framing Optimizer (lightest sections for a layout)
+with t9:
+    render_tab9(method, Fy, E_gpa, def_val, catalog)
+
+# Render Tab 10: General Load Analysis (V / M / deflection diagrams, Cb)
+with t10:
+    render_tab10(section, props, L_input, method, Fy, E_gpa, def_val, catalog)
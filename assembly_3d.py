@@ -0,0 +1,116 @@
+import numpy as np
+import plotly.graph_objects as go
+from drawer_3d import geometry_key, connection_meshes, group_trace
+
+# ==============================================================================
+# 🏢 FRAME-LEVEL ASSEMBLY: MANY CONNECTIONS IN ONE SCENE
+# ==============================================================================
+# หน่วย: mm
+# A placement is a dict:
+#   {'geometry': (beam_dims, plate_dims, bolt_dims, config),   # same as create_connection_figure
+#    'origin': (x, y, z), 'rotation': deg about z, 'name': hover label}
+# Placements with identical geometry share one mesh (drawer_3d.connection_meshes);
+# all instances are transformed in one vectorized pass and merged into one Mesh3d
+# trace per material group.
+
+GROUP_ORDER = ["Beam", "Shear Plate", "Weld", "Bolts"]
+
+# Level of detail: simplified bolts past this many parts, beam + plate only past 4x
+LOD_PART_THRESHOLD = 2000
+
+def count_parts(n_rows):
+    """Beam (3) + plate (1) + welds (2) + 3 parts per bolt"""
+    return 6 + 3 * n_rows
+
+def choose_lod(total_parts, threshold=LOD_PART_THRESHOLD):
+    if total_parts > 4 * threshold: return 2
+    if total_parts > threshold: return 1
+    return 0
+
+def _rotation_z(deg):
+    t = np.radians(np.asarray(deg, dtype=float))
+    c, s = np.cos(t), np.sin(t)
+    R = np.zeros(t.shape + (3, 3))
+    R[..., 0, 0] = c; R[..., 0, 1] = -s
+    R[..., 1, 0] = s; R[..., 1, 1] = c
+    R[..., 2, 2] = 1.0
+    return R
+
+def build_assembly_meshes(placements, lod=None, threshold=LOD_PART_THRESHOLD):
+    """
+    Merge every placement into {group: (verts, faces, face_colors, vertex_labels)}.
+    lod=None picks the level of detail from the total part count.
+    """
+    # Group placements by geometry so identical connections share mesh data
+    by_key = {}
+    for p in placements:
+        key = geometry_key(*p['geometry'])
+        by_key.setdefault(key, []).append(p)
+
+    if lod is None:
+        total = sum(count_parts(key[9]) * len(items) for key, items in by_key.items())
+        lod = choose_lod(total, threshold)
+
+    # Pass 1: sizes for preallocation
+    chunks = {g: [] for g in GROUP_ORDER}
+    sizes = {g: [0, 0] for g in GROUP_ORDER}
+    for key, items in by_key.items():
+        meshes = connection_meshes(key, lod)
+        origins = np.array([p.get('origin', (0, 0, 0)) for p in items], dtype=float)
+        rots = _rotation_z([p.get('rotation', 0.0) for p in items])
+        names = [p.get('name', '') for p in items]
+        for group, mesh in meshes.items():
+            chunks[group].append((mesh, origins, rots, names))
+            sizes[group][0] += len(mesh[0]) * len(items)
+            sizes[group][1] += len(mesh[1]) * len(items)
+
+    # Pass 2: instance into preallocated buffers
+    merged = {}
+    for group in GROUP_ORDER:
+        n_verts, n_faces = sizes[group]
+        if n_verts == 0: continue
+        verts = np.empty((n_verts, 3))
+        faces = np.empty((n_faces, 3), dtype=np.int64)
+        colors = np.empty(n_faces, dtype=object)
+        labels = np.empty(n_verts, dtype=object)
+        v0 = f0 = 0
+        for (m_verts, m_faces, m_colors, m_labels), origins, rots, names in chunks[group]:
+            m = len(origins)
+            nv, nf = len(m_verts), len(m_faces)
+            inst = np.matmul(m_verts[None, :, :], np.transpose(rots, (0, 2, 1))) + origins[:, None, :]
+            verts[v0:v0 + m * nv] = inst.reshape(-1, 3)
+            faces[f0:f0 + m * nf] = (m_faces[None, :, :] + (v0 + np.arange(m) * nv)[:, None, None]).reshape(-1, 3)
+            colors[f0:f0 + m * nf] = np.tile(m_colors, m)
+            labels[v0:v0 + m * nv] = np.repeat(np.array(names, dtype=object), nv)
+            v0 += m * nv; f0 += m * nf
+        merged[group] = (verts, faces, colors, labels)
+    return merged, lod
+
+def create_assembly_figure(placements, lod=None, threshold=LOD_PART_THRESHOLD):
+    """One scene with every placed connection (one Mesh3d trace per material group)"""
+    merged, lod = build_assembly_meshes(placements, lod, threshold)
+    fig = go.Figure()
+    fig.add_traces([group_trace(group, *arrays) for group, arrays in merged.items()])
+    fig.update_layout(
+        scene=dict(
+            aspectmode='data',
+            xaxis=dict(visible=False), yaxis=dict(visible=False), zaxis=dict(visible=False),
+            camera=dict(eye=dict(x=1.2, y=-1.2, z=0.9))
+        ),
+        margin=dict(l=0, r=0, t=0, b=0),
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)'
+    )
+    return fig, lod
+
+def grid_placements(geometries, names, per_row=6, spacing=(1500.0, 2500.0)):
+    """Lay geometries out on a plan grid (x along rows, y between rows)"""
+    placements = []
+    for i, (geom, name) in enumerate(zip(geometries, names)):
+        r, c = divmod(i, per_row)
+        placements.append({
+            'geometry': geom,
+            'origin': (c * spacing[0], r * spacing[1], 0.0),
+            'rotation': 0.0,
+            'name': name,
+        })
+    return placements
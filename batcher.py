@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+from calculator import METHOD_TERMS, core_calculation, core_calculation_vec, core_rows
+from calculator_tab import MODES, calculate_shear_tab_vec, shear_tab_columns
+from section_props import PROPERTY_KEYS
+
+# ==============================================================================
+# 🧺 REQUEST-COALESCING MICRO-BATCHER
+# ==============================================================================
+# Single-item checks arriving from many clients are collected on an asyncio loop
+# (own thread) for at most `window_ms` or until `max_size` items are waiting, then
+# evaluated as ONE vectorized call and the results are fanned back out to the
+# callers. Callers are either threads (call) or coroutines (submit).
+#
+#   batcher = MicroBatcher(beam_batch, window_ms=2, max_size=256)
+#   c = batcher.call((props, L_m, Fy, E_gpa, method, def_limit))
+
+METRIC_SAMPLES = 10_000   # recent samples kept for the percentiles
+VEC_MIN = 8               # smaller beam groups: scalar core_calculation is cheaper than NumPy setup
+
+class BatchMetrics:
+    """Counters + recent queue-latency / batch-size / compute-time samples"""
+    def __init__(self):
+        self.items = 0
+        self.batches = 0
+        self.errors = 0
+        self.flush_full = 0       # batches sent because max_size was reached
+        self.flush_window = 0     # ... because the window expired
+        self.queue_ms = deque(maxlen=METRIC_SAMPLES)
+        self.exec_ms = deque(maxlen=METRIC_SAMPLES)
+        self.sizes = deque(maxlen=METRIC_SAMPLES)
+
+    def snapshot(self):
+        def pct(samples):
+            if not samples:
+                return {"p50": None, "p95": None, "p99": None, "max": None}
+            a = np.array(list(samples), dtype=float)
+            p50, p95, p99 = np.percentile(a, [50, 95, 99])
+            return {"p50": p50, "p95": p95, "p99": p99, "max": a.max()}
+        return {
+            "items": self.items, "batches": self.batches, "errors": self.errors,
+            "mean_batch": self.items / self.batches if self.batches else 0.0,
+            "flush_full": self.flush_full, "flush_window": self.flush_window,
+            "queue_ms": pct(self.queue_ms), "exec_ms": pct(self.exec_ms),
+            "batch_size": pct(self.sizes),
+        }
+
+class MicroBatcher:
+    """
+    fn(list of items) -> list of results (same order). If a batch raises, its items
+    are retried one by one so a single bad request only fails its own caller.
+    """
+    def __init__(self, fn, window_ms=2.0, max_size=256, name="batch"):
+        self.fn = fn
+        self.window = window_ms / 1000.0
+        self.max_size = max(1, int(max_size))
+        self.name = name
+        self.metrics = BatchMetrics()
+        self._pending = []
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"batcher-{name}", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    # --- Event loop thread ---
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._nonempty = asyncio.Event()
+        self._full = asyncio.Event()
+        self._ready.set()
+        self._loop.run_until_complete(self._collect())
+
+    def _enqueue(self, item, fut, t_submit):
+        self._pending.append((item, fut, t_submit))
+        self._nonempty.set()
+        if len(self._pending) >= self.max_size:
+            self._full.set()
+
+    async def _collect(self):
+        while True:
+            await self._nonempty.wait()
+            if len(self._pending) < self.max_size:
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.window)
+                except asyncio.TimeoutError:
+                    pass
+            batch, self._pending = self._pending[:self.max_size], self._pending[self.max_size:]
+            if len(batch) == self.max_size:
+                self.metrics.flush_full += 1
+            else:
+                self.metrics.flush_window += 1
+            if not self._pending:
+                self._nonempty.clear()
+            if len(self._pending) < self.max_size:
+                self._full.clear()
+            self._execute(batch)
+
+    def _execute(self, batch):
+        t0 = time.perf_counter()
+        for _, _, t_submit in batch:
+            self.metrics.queue_ms.append((t0 - t_submit) * 1000)
+        items = [item for item, _, _ in batch]
+        try:
+            results = self.fn(items)
+            for (_, fut, _), res in zip(batch, results):
+                fut.set_result(res)
+        except Exception:
+            for item, fut, _ in batch:
+                try:
+                    fut.set_result(self.fn([item])[0])
+                except Exception as e:
+                    self.metrics.errors += 1
+                    fut.set_exception(e)
+        m = self.metrics
+        m.exec_ms.append((time.perf_counter() - t0) * 1000)
+        m.sizes.append(len(batch))
+        m.items += len(batch)
+        m.batches += 1
+
+    # --- Callers ---
+    def call(self, item, timeout=30.0):
+        """Blocking submit from any thread; returns the item's result"""
+        fut = Future()
+        self._loop.call_soon_threadsafe(self._enqueue, item, fut, time.perf_counter())
+        return fut.result(timeout)
+
+    async def submit(self, item):
+        """Submit from a coroutine running on any event loop"""
+        fut = Future()
+        self._loop.call_soon_threadsafe(self._enqueue, item, fut, time.perf_counter())
+        return await asyncio.wrap_future(fut)
+
+# ==========================================
+# 🏗️ BATCH FUNCTIONS (list of single requests -> list of results)
+# ==========================================
+def beam_batch(items):
+    """
+    items: (props, L_m, Fy, E_gpa, method, def_limit) -> core_calculation dicts.
+    One core_calculation_vec call per design method present in the batch.
+    """
+    results = [None] * len(items)
+    for method in {it[4] for it in items}:
+        idx = [i for i, it in enumerate(items) if it[4] == method]
+        group = [items[i] for i in idx]
+        if len(group) < VEC_MIN:
+            for i, (props, L_m, Fy, E_gpa, _, def_limit) in zip(idx, group):
+                results[i] = core_calculation(L_m, Fy, E_gpa, props, method, def_limit)
+            continue
+        keys = [k for k in PROPERTY_KEYS if all(k in it[0] for it in group)]
+        props = {k: np.array([float(it[0][k]) for it in group]) for k in keys}
+        L, Fy, E, limit = (np.array([it[j] for it in group], dtype=float) for j in (1, 2, 3, 5))
+        c = core_calculation_vec(L, Fy, E, props, method, limit)
+        rows = core_rows(c, props, Fy, method)
+        for i, row in zip(idx, rows):
+            row["def_limit"] = int(items[i][5])
+            results[i] = row
+    return results
+
+def check_beam_keys(props, L_m=6.0, Fy=2400, E_gpa=200, def_limit=360):
+    """Raise if batched rows (core_rows) and scalar core_calculation differ in keys"""
+    for method in METHOD_TERMS:
+        scalar = core_calculation(L_m, Fy, E_gpa, props, method, def_limit)
+        arrays = {k: np.array([float(v)]) for k, v in props.items() if k in PROPERTY_KEYS}
+        c = core_calculation_vec(np.array([L_m]), Fy, E_gpa, arrays, method, def_limit)
+        diff = set(scalar) ^ set(core_rows(c, arrays, Fy, method)[0])
+        if diff:
+            raise RuntimeError(f"beam_batch rows differ from core_calculation ({method}): {sorted(diff)}")
+
+def shear_tab_batch(items):
+    """items: calculate_shear_tab inputs -> capacity rows (phi_Rn per mode, governing mode, ...)"""
+    r = calculate_shear_tab_vec(shear_tab_columns(items))
+    caps = np.stack([r[m] for m in MODES], axis=-1).tolist()
+    gov, mode = r["gov_capacity"].tolist(), r["gov_mode"].tolist()
+    util, ok = r["utilization"].tolist(), r["ok"].tolist()
+    return [{**dict(zip(MODES, caps[i])), "gov_capacity": gov[i], "gov_mode": MODES[mode[i]],
+             "utilization": util[i], "ok": ok[i]} for i in range(len(items))]
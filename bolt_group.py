@@ -0,0 +1,131 @@
+import os
+import numpy as np
+
+# ==============================================================================
+# 🔩 ECCENTRIC BOLT GROUP: INSTANTANEOUS CENTER OF ROTATION (AISC Manual Part 7)
+# ==============================================================================
+# หน่วย: cm
+# Single vertical line of bolts, vertical load at eccentricity e from the bolt line.
+# Bolt load-deformation (Crawford-Kulak): R = Rult (1 - e^(-10Δ))^0.55, Δ in inches,
+# Δmax = 0.34 in at the bolt farthest from the IC.
+#
+# The coefficient C is normalized so that a concentric load gives C = n, i.e.
+#   Rn (group) = C × Fnv × Ab
+# Solving for the IC is iterative, so C is tabulated once on a (rows, pitch, e)
+# grid, saved to disk and interpolated at check time.
+
+DELTA_MAX = 0.34 * 2.54     # cm
+K_DEFORM = 10.0 / 2.54      # 1/cm (10 per inch)
+
+TABLE_ROWS = np.arange(1, 17)                 # 1 - 16 bolts
+TABLE_PITCH = np.arange(2.5, 15.01, 0.5)      # cm
+TABLE_ECC = np.arange(0.0, 40.01, 0.5)        # cm
+TABLE_VERSION = 1
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ic_coefficients.npz")
+
+def _bolt_response(delta):
+    return (1.0 - np.exp(-K_DEFORM * delta)) ** 0.55
+
+R_AT_DELTA_MAX = float(_bolt_response(DELTA_MAX))
+
+def solve_ic_coefficient(n_rows, pitch, ecc, iterations=80):
+    """
+    Direct IC solution (vectorized bisection on the IC offset r0).
+    n_rows, pitch [cm], ecc [cm] broadcast against each other.
+    """
+    n_rows, pitch, ecc = np.broadcast_arrays(np.asarray(n_rows, dtype=int),
+                                             np.asarray(pitch, dtype=float),
+                                             np.asarray(ecc, dtype=float))
+    shape = n_rows.shape
+    n = n_rows.ravel(); s = pitch.ravel(); e = ecc.ravel()
+
+    # Bolt coordinates about the group centroid (padded to the largest group)
+    n_max = max(1, int(n.max())) if n.size else 1
+    idx = np.arange(n_max)[None, :]
+    active = idx < n[:, None]
+    y = (idx - (n[:, None] - 1) / 2.0) * s[:, None]
+    y = np.where(active, y, 0.0)
+
+    def unbalance(r0):
+        d = np.sqrt(r0[:, None]**2 + y**2)
+        d_max = np.max(np.where(active, d, 0.0), axis=1)
+        R = np.where(active, _bolt_response(DELTA_MAX * d / d_max[:, None]), 0.0)
+        Fv = np.sum(R * r0[:, None] / d, axis=1)           # vertical equilibrium
+        P = np.sum(R * d, axis=1) / (e + r0)               # moment about the IC
+        return P - Fv, Fv
+
+    # Bisection in log space: P - Fv > 0 near the centroid, < 0 far away
+    lo = np.full(n.shape, -4.0)
+    hi = np.full(n.shape, 6.0)
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        f, _ = unbalance(10.0 ** mid)
+        lo = np.where(f > 0, mid, lo)
+        hi = np.where(f > 0, hi, mid)
+    _, Fv = unbalance(10.0 ** ((lo + hi) / 2))
+
+    C = Fv / R_AT_DELTA_MAX
+    # Concentric load or single bolt: every bolt at full strength
+    C = np.where((e <= 0) | (n <= 1), n.astype(float), C)
+    return C.reshape(shape)
+
+def build_ic_table():
+    """C on the full (rows × pitch × e) grid"""
+    n, s, e = np.meshgrid(TABLE_ROWS, TABLE_PITCH, TABLE_ECC, indexing='ij')
+    return solve_ic_coefficient(n, s, e)
+
+_TABLE = None
+
+def load_ic_table(path=TABLE_PATH):
+    """Load the persisted table, building and saving it on first use"""
+    global _TABLE
+    if _TABLE is not None:
+        return _TABLE
+    try:
+        with np.load(path) as data:
+            if int(data['version']) == TABLE_VERSION and data['C'].shape == (len(TABLE_ROWS), len(TABLE_PITCH), len(TABLE_ECC)):
+                _TABLE = data['C']
+                return _TABLE
+    except (OSError, KeyError, ValueError):
+        pass
+
+    _TABLE = build_ic_table()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez(path, C=_TABLE, version=TABLE_VERSION,
+                 rows=TABLE_ROWS, pitch=TABLE_PITCH, ecc=TABLE_ECC)
+    except OSError:
+        pass # Read-only install: keep the in-memory table
+    return _TABLE
+
+def ic_coefficient(n_rows, pitch, ecc):
+    """
+    Bolt group coefficient C by interpolation in the cached table.
+    Points outside the table grid fall back to the direct IC solution.
+    """
+    n_rows, pitch, ecc = np.broadcast_arrays(np.asarray(n_rows, dtype=int),
+                                             np.asarray(pitch, dtype=float),
+                                             np.asarray(ecc, dtype=float))
+    table = load_ic_table()
+    inside = ((n_rows >= TABLE_ROWS[0]) & (n_rows <= TABLE_ROWS[-1]) &
+              (pitch >= TABLE_PITCH[0]) & (pitch <= TABLE_PITCH[-1]) &
+              (ecc >= TABLE_ECC[0]) & (ecc <= TABLE_ECC[-1]))
+
+    # Bilinear interpolation in (pitch, e) on the matching rows slice
+    n_i = np.clip(n_rows - TABLE_ROWS[0], 0, len(TABLE_ROWS) - 1)
+    s_f = np.clip((pitch - TABLE_PITCH[0]) / (TABLE_PITCH[1] - TABLE_PITCH[0]), 0, len(TABLE_PITCH) - 1)
+    e_f = np.clip((ecc - TABLE_ECC[0]) / (TABLE_ECC[1] - TABLE_ECC[0]), 0, len(TABLE_ECC) - 1)
+    s_i = np.minimum(s_f.astype(int), len(TABLE_PITCH) - 2)
+    e_i = np.minimum(e_f.astype(int), len(TABLE_ECC) - 2)
+    ts = s_f - s_i
+    te = e_f - e_i
+    C = (table[n_i, s_i, e_i] * (1 - ts) * (1 - te) +
+         table[n_i, s_i + 1, e_i] * ts * (1 - te) +
+         table[n_i, s_i, e_i + 1] * (1 - ts) * te +
+         table[n_i, s_i + 1, e_i + 1] * ts * te)
+
+    if not np.all(inside):
+        C = np.where(inside, C, 0.0)
+        C[~inside] = solve_ic_coefficient(n_rows[~inside], pitch[~inside], ecc[~inside])
+    return C if C.ndim else float(C)
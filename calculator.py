@@ -1,6 +1,8 @@
 import math
+import numpy as np
+from section_props import complete_props
 
-def core_calculation(L_m, Fy_ksc, E_gpa, props, method, def_limit=360):
+def core_calculation(L_m, Fy_ksc, E_gpa, props, method, def_limit=360, Cb=1.0):
     """
     Core Structural Calculation Function
     Rechecked: Validated against AISC 360-16 Formulas
@@ -11,35 +13,32 @@ def core_calculation(L_m, Fy_ksc, E_gpa, props, method, def_limit=360):
     L_cm = L_m * 100.0
     
     # Section Properties (Convert mm to cm)
+    # J, Cw, ry, r_ts ... come from the property engine (stored in the catalog;
+    # computed here only for ad-hoc props dicts)
+    props = complete_props(props)
     D = props['D'] / 10.0
-    B = props.get('B', 100) / 10.0 
     tw = props['tw'] / 10.0
-    tf = props.get('tf', 10) / 10.0
+    tf = props['tf'] / 10.0
     
     # Area for Shear (Web Area)
     Aw = D * tw 
     
-    # Calculate Iy if missing (simplify approximation for I-shape)
-    if 'Iy' in props: Iy = props['Iy']
-    else: Iy = (2 * tf * B**3 / 12) + ((D - 2*tf) * tw**3 / 12)
-    
     Sx = props['Ix'] / (D/2)
     
-    # --- 2. LTB Parameters (Calculation) ---
-    # Torsional Constant (J) - Approximation for Open Section
-    J = (1/3) * (2 * B * tf**3 + (D - tf) * tw**3)
+    # --- 2. LTB Parameters ---
+    # Torsional Constant (J) - El Darwish & Johnston incl. root fillets
+    J = props['J']
     
-    # Warping Constant (Cw)
+    # Warping Constant (Cw) = Iy h0^2 / 4
     h0 = D - tf
-    Cw = (Iy * h0**2) / 4
+    Cw = props['Cw']
     
-    # Radius of gyration (ry) - Approx
-    A_sec = (2 * B * tf) + ((D - 2*tf) * tw)
-    ry = math.sqrt(Iy / A_sec)
+    # Radius of gyration (ry) - on the gross area incl. fillets
+    ry = props['ry']
     
     # r_ts (Effective radius of gyration)
     # AISC Eq. F2-7: r_ts^2 = sqrt(Iy * Cw) / Sx
-    r_ts = math.sqrt(math.sqrt(Iy * Cw) / Sx)
+    r_ts = props['rts']
     
     # Lp (Limit for Plastic Yielding) - AISC Eq. F2-5
     Lp_cm = 1.76 * ry * math.sqrt(E_ksc / Fy_ksc)
@@ -53,7 +52,7 @@ def core_calculation(L_m, Fy_ksc, E_gpa, props, method, def_limit=360):
     
     # --- 3. Moment Capacity (Mn) ---
     Mp = Fy_ksc * props['Zx']
-    Cb = 1.0 # Conservative assumption for simply supported uniform load
+    # Cb = 1.0: conservative for simply supported uniform load (beam_analysis derives it from the moment diagram)
     Lb = L_cm # Assume unbraced length = span length
     
     if Lb <= Lp_cm:
@@ -133,5 +132,123 @@ def core_calculation(L_m, Fy_ksc, E_gpa, props, method, def_limit=360):
         "ws": ws, "wm": wm, "wd": wd, 
         "delta": delta_allow, "def_limit": def_limit,
         "L_vm": L_vm_cm/100.0, "L_md": L_md_cm/100.0,
-        "Lp": Lp_cm/100.0, "Lr": Lr_cm/100.0, "Zone": zone, "Lb": Lb/100.0
+        "Lp": Lp_cm/100.0, "Lr": Lr_cm/100.0, "Zone": zone, "Lb": Lb/100.0, "Cb": Cb
+    }
+
+def core_calculation_vec(L_m, Fy_ksc, E_gpa, props, method, def_limit=360, Cb=1.0):
+    """
+    Vectorized core_calculation (same formulas, AISC 360-16).
+    L_m and any value in props may be NumPy arrays; they broadcast against each
+    other, e.g. sections shaped (n, 1) with spans shaped (1, m); so may Cb
+    (lateral-torsional buckling modification factor, 1.0 = uniform moment).
+    Zone is returned as an int code (1, 2, 3) and the governing mode as
+    'mode' (0 = Shear, 1 = Moment, 2 = Deflection).
+    """
+    # --- 1. Unit Setup ---
+    E_ksc = E_gpa * 10197.162
+    L_cm = np.asarray(L_m, dtype=float) * 100.0
+    
+    props = complete_props(props)  # no-op for catalog columns (derived values stored)
+    D = np.asarray(props['D'], dtype=float) / 10.0
+    tw = np.asarray(props['tw'], dtype=float) / 10.0
+    tf = np.asarray(props['tf'], dtype=float) / 10.0
+    Ix = np.asarray(props['Ix'], dtype=float)
+    Zx = np.asarray(props['Zx'], dtype=float)
+    
+    Aw = D * tw
+    Sx = Ix / (D/2)
+    
+    # --- 2. LTB Parameters ---
+    J = np.asarray(props['J'], dtype=float)
+    h0 = D - tf
+    Cw = np.asarray(props['Cw'], dtype=float)
+    ry = np.asarray(props['ry'], dtype=float)
+    r_ts = np.asarray(props['rts'], dtype=float)
+    
+    Lp_cm = 1.76 * ry * np.sqrt(E_ksc / Fy_ksc)
+    c_factor = 1.0
+    term1 = 1.95 * r_ts * (E_ksc / (0.7 * Fy_ksc))
+    term2 = (J * c_factor) / (Sx * h0)
+    term3 = np.sqrt(1 + np.sqrt(1 + 6.76 * ((0.7 * Fy_ksc / E_ksc) * (Sx * h0 / (J * c_factor)))**2))
+    Lr_cm = term1 * np.sqrt(term2 + term3)
+    
+    # --- 3. Moment Capacity (Mn) ---
+    Mp = Fy_ksc * Zx
+    Cb = np.asarray(Cb, dtype=float)
+    Lb = L_cm
+    
+    factor = (Lb - Lp_cm) / (Lr_cm - Lp_cm)
+    Mn_inelastic = np.minimum(Mp, Cb * (Mp - (Mp - 0.7 * Fy_ksc * Sx) * factor))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Fcr = ((Cb * np.pi**2 * E_ksc) / (Lb / r_ts)**2) * \
+              np.sqrt(1 + 0.078 * (J * c_factor / (Sx * h0)) * (Lb / r_ts)**2)
+    Mn_elastic = np.minimum(Mp, Fcr * Sx)
+    zone = np.where(Lb <= Lp_cm, 1, np.where(Lb <= Lr_cm, 2, 3))
+    Mn = np.where(zone == 1, Mp, np.where(zone == 2, Mn_inelastic, Mn_elastic))
+    
+    # --- 4. Shear Capacity (Vn) ---
+    Vn = 0.60 * Fy_ksc * Aw
+    
+    # --- 5. Design Values (ASD/LRFD) ---
+    if method == "ASD":
+        V_des = Vn / 1.50
+        M_des = Mn / 1.67
+        M_des_full = Mp / 1.67
+    else:
+        V_des = Vn * 1.00
+        M_des = Mn * 0.90
+        M_des_full = Mp * 0.90
+    
+    # --- 6. Uniform Load Capacities ---
+    with np.errstate(divide='ignore'):
+        ws = (2 * V_des / L_cm) * 100
+        wm = (8 * M_des / L_cm**2) * 100
+        delta_allow = L_cm / def_limit
+        wd = ((384 * E_ksc * Ix * delta_allow) / (5 * L_cm**4)) * 100
+    
+    w_gov = np.minimum(np.minimum(ws, wm), wd)
+    mode = np.where(w_gov == ws, 0, np.where(w_gov == wm, 1, 2))
+    
+    # --- 7. Critical Transition Lengths ---
+    L_vm_cm = (4 * M_des_full) / V_des
+    L_md_cm = (384 * E_ksc * Ix) / (40 * M_des_full * def_limit)
+    
+    return {
+        "Aw": Aw, "Sx": Sx, "L_cm": L_cm, "E_ksc": E_ksc,
+        "Vn": Vn, "Mn": Mn, "Mp": Mp,
+        "V_des": V_des, "M_des": M_des, "M_des_full": M_des_full,
+        "ws": ws, "wm": wm, "wd": wd, "w_gov": w_gov, "mode": mode,
+        "delta": delta_allow, "def_limit": def_limit,
+        "L_vm": L_vm_cm/100.0, "L_md": L_md_cm/100.0,
+        "Lp": Lp_cm/100.0, "Lr": Lr_cm/100.0, "zone": zone, "Lb": Lb/100.0, "Cb": Cb
     }
+
+# --- Vectorized result -> core_calculation dicts (API / micro-batching) ---
+ZONE_NAMES = {1: "Zone 1 (Yielding)", 2: "Zone 2 (Inelastic LTB)", 3: "Zone 3 (Elastic LTB)"}
+METHOD_TERMS = {
+    "ASD": {"omega_v": 1.50, "omega_b": 1.67, "phi_v": 0.0, "phi_b": 0.0,
+            "txt_v_method": r"V_{design} = \frac{V_n}{\Omega_v} (\Omega_v=1.50)",
+            "txt_m_method": r"M_{design} = \frac{M_n}{\Omega_b} (\Omega_b=1.67)"},
+    "LRFD": {"omega_v": 1.0, "omega_b": 1.0, "phi_v": 1.00, "phi_b": 0.90,
+             "txt_v_method": r"V_{design} = \phi_v V_n (\phi_v=1.00)",
+             "txt_m_method": r"M_{design} = \phi_b M_n (\phi_b=0.90)"},
+}
+ROW_KEYS = ("Aw", "Sx", "L_cm", "Vn", "Mn", "Mp", "V_des", "M_des", "M_des_full",
+            "ws", "wm", "wd", "delta", "L_vm", "L_md", "Lp", "Lr", "Lb")
+
+def core_rows(c, props, Fy_ksc, method):
+    """
+    Split a 1-D core_calculation_vec result into one core_calculation-style dict per
+    item (same keys, plain floats), so batched callers get the scalar API's output.
+    """
+    n = np.shape(c['w_gov'])[0]
+    cols = {k: np.broadcast_to(c[k], (n,)).tolist() for k in ROW_KEYS}
+    cols["Ix"] = np.broadcast_to(props['Ix'], (n,)).tolist()
+    cols["Zx"] = np.broadcast_to(props['Zx'], (n,)).tolist()
+    cols["Fy"] = np.broadcast_to(Fy_ksc, (n,)).tolist()
+    cols["E_ksc"] = np.broadcast_to(c['E_ksc'], (n,)).tolist()
+    cols["def_limit"] = np.broadcast_to(c['def_limit'], (n,)).tolist()
+    cols["Cb"] = np.broadcast_to(c['Cb'], (n,)).tolist()
+    zones = np.broadcast_to(c['zone'], (n,)).tolist()
+    terms = METHOD_TERMS[method]
+    return [{**{k: v[i] for k, v in cols.items()}, **terms, "Zone": ZONE_NAMES[zones[i]]} for i in range(n)]
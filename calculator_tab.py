@@ -1,4 +1,6 @@
 import math
+import numpy as np
+from bolt_group import ic_coefficient
 
 # ==============================================================================
 # 🧠 CALCULATOR MODULE: SHEAR TAB (DETAILED REPORT VERSION)
@@ -30,6 +32,9 @@ def calculate_shear_tab(inputs):
     pitch = inputs['pitch'] / 10.0
     lev = inputs['lev'] / 10.0
     n_rows = int(inputs['n_rows'])
+    # Bolt group: "Concentric" (Fnv·Ab·n) or "IC" (Instantaneous Center, eccentric)
+    bolt_group = inputs.get('bolt_group', 'Concentric')
+    ecc = (inputs.get('setback', 0) + inputs.get('leh', 0)) / 10.0
     
     mat_bm = MATERIALS.get(inputs.get('beam_mat', 'A36'), MATERIALS['A36'])
     mat_pl = MATERIALS.get(inputs.get('plate_mat', 'A36'), MATERIALS['A36'])
@@ -43,19 +48,38 @@ def calculate_shear_tab(inputs):
     # ==========================================================================
     Ab = math.pi * (d_b**2) / 4
     Fnv = mat_bolt['Fnv']
-    Rn_bolt = Fnv * Ab * n_rows
-    phi_Rn_bolt = PHI['bolt_shear'] * Rn_bolt
     
-    results['bolt_shear'] = {
-        "title": "1. Bolt Shear Strength (แรงเฉือนสลักเกลียว)",
-        "phi_Rn": phi_Rn_bolt,
-        "ratio": Vu / phi_Rn_bolt if phi_Rn_bolt > 0 else 999,
-        "latex_eq": r"\phi R_n = \phi \times F_{nv} \times A_b \times N_{rows}",
-        "calcs": [
+    if bolt_group == 'IC':
+        # Eccentricity e = Setback + Leh (weld line to bolt line)
+        C_ic = ic_coefficient(n_rows, pitch, ecc)
+        Rn_bolt = Fnv * Ab * C_ic
+        phi_Rn_bolt = PHI['bolt_shear'] * Rn_bolt
+        bolt_title = "1. Bolt Shear Strength - Eccentric IC Method (แรงเฉือนสลักเกลียว)"
+        bolt_eq = r"\phi R_n = \phi \times F_{nv} \times A_b \times C"
+        bolt_calcs = [
+            f"Bolt Area (Ab) = π × ({d_b:.2f})² / 4 = {Ab:.2f} cm²",
+            f"Eccentricity (e) = Setback + Leh = {ecc:.2f} cm",
+            f"IC Coefficient (C) @ {n_rows} rows, s = {pitch:.1f} cm, e = {ecc:.2f} cm = {C_ic:.3f}",
+            f"Nominal Shear (Rn) = {mat_bolt['Fnv']} × {Ab:.2f} × {C_ic:.3f} = {Rn_bolt:.0f} kg",
+            f"Design Strength (φRn) = {PHI['bolt_shear']} × {Rn_bolt:.0f} = {phi_Rn_bolt:.0f} kg"
+        ]
+    else:
+        Rn_bolt = Fnv * Ab * n_rows
+        phi_Rn_bolt = PHI['bolt_shear'] * Rn_bolt
+        bolt_title = "1. Bolt Shear Strength (แรงเฉือนสลักเกลียว)"
+        bolt_eq = r"\phi R_n = \phi \times F_{nv} \times A_b \times N_{rows}"
+        bolt_calcs = [
             f"Bolt Area (Ab) = π × ({d_b:.2f})² / 4 = {Ab:.2f} cm²",
             f"Nominal Shear (Rn) = {mat_bolt['Fnv']} × {Ab:.2f} × {n_rows} = {Rn_bolt:.0f} kg",
             f"Design Strength (φRn) = {PHI['bolt_shear']} × {Rn_bolt:.0f} = {phi_Rn_bolt:.0f} kg"
         ]
+    
+    results['bolt_shear'] = {
+        "title": bolt_title,
+        "phi_Rn": phi_Rn_bolt,
+        "ratio": Vu / phi_Rn_bolt if phi_Rn_bolt > 0 else 999,
+        "latex_eq": bolt_eq,
+        "calcs": bolt_calcs
     }
 
     # ==========================================================================
@@ -175,3 +199,84 @@ def calculate_shear_tab(inputs):
     }
     
     return results
+
+# ==============================================================================
+# ⚡ VECTORIZED CAPACITY CHECK (batch / API)
+# ==============================================================================
+# Same limit states as calculate_shear_tab, without the report text. Every input
+# may be a scalar or an array (broadcast together), so thousands of connections
+# are checked in one NumPy pass.
+
+MODES = ("bolt_shear", "bearing", "shear_yield", "shear_rupture", "weld")
+REQUIRED_INPUTS = ("beam_tw", "plate_t", "plate_h", "bolt_dia", "weld_sz", "pitch", "lev", "n_rows")
+# Text inputs default like calculate_shear_tab; numeric optional inputs default to 0
+TEXT_DEFAULTS = {"beam_mat": "A36", "plate_mat": "A36", "bolt_grade": "A325", "bolt_group": "Concentric"}
+
+def shear_tab_columns(items):
+    """List of calculate_shear_tab input dicts -> columns for calculate_shear_tab_vec"""
+    for i, it in enumerate(items):
+        missing = [k for k in REQUIRED_INPUTS if k not in it]
+        if missing:
+            raise KeyError(f"item {i}: {', '.join(missing)}")
+    keys = set(REQUIRED_INPUTS).union(*items)
+    return {k: [it.get(k, TEXT_DEFAULTS.get(k, 0.0)) for it in items] for k in keys}
+
+def _material_prop(names, default, prop):
+    """Per-item material property (unknown names fall back like calculate_shear_tab)"""
+    names = np.asarray(names)
+    uniq, inv = np.unique(names, return_inverse=True)
+    vals = np.array([MATERIALS.get(str(n), MATERIALS[default])[prop] for n in uniq], dtype=float)
+    return vals[inv].reshape(names.shape)
+
+def calculate_shear_tab_vec(inputs):
+    """
+    Vectorized calculate_shear_tab (capacities only).
+    Returns phi_Rn per mode (keys of MODES), 'gov_capacity', 'gov_mode' (index into
+    MODES), 'utilization' and 'ok' (gov_capacity >= load).
+    """
+    f = lambda key, default=0.0: np.asarray(inputs.get(key, default), dtype=float)
+    Vu = f('load')
+    t_w = f('beam_tw') / 10.0
+    t_p = f('plate_t') / 10.0
+    h_p = f('plate_h') / 10.0
+    d_b = f('bolt_dia') / 10.0
+    w_sz = f('weld_sz') / 10.0
+    pitch = f('pitch') / 10.0
+    lev = f('lev') / 10.0
+    n_rows = np.asarray(inputs['n_rows']).astype(int)
+    is_ic = np.asarray(inputs.get('bolt_group', 'Concentric')) == 'IC'
+    ecc = (f('setback') + f('leh')) / 10.0
+
+    Fu_bm = _material_prop(inputs.get('beam_mat', 'A36'), 'A36', 'Fu')
+    Fy_pl = _material_prop(inputs.get('plate_mat', 'A36'), 'A36', 'Fy')
+    Fu_pl = _material_prop(inputs.get('plate_mat', 'A36'), 'A36', 'Fu')
+    Fnv = _material_prop(inputs.get('bolt_grade', 'A325'), 'A325', 'Fnv')
+    d_hole = d_b + 0.2
+
+    # 1. Bolt shear (IC coefficient only where requested)
+    Ab = np.pi * d_b**2 / 4
+    n_eff = n_rows.astype(float)
+    if np.any(is_ic):
+        n_eff = np.where(is_ic, ic_coefficient(n_rows, pitch, ecc), n_eff)
+    phi_bolt = PHI['bolt_shear'] * Fnv * Ab * n_eff
+
+    # 2. Bearing: edge bolt + (n-1) inner bolts, plate vs. beam web
+    def bearing(t, Fu):
+        cap = 2.4 * d_b * t * Fu
+        edge = np.minimum(1.2 * (lev - d_hole / 2) * t * Fu, cap)
+        inner = np.minimum(1.2 * (pitch - d_hole) * t * Fu, cap) * np.maximum(n_rows - 1, 0)
+        return PHI['bearing'] * (edge + inner)
+    phi_bear = np.minimum(bearing(t_p, Fu_pl), bearing(t_w, Fu_bm))
+
+    # 3-5. Plate yielding / rupture, weld (E70)
+    phi_yield = PHI['yield'] * 0.60 * Fy_pl * h_p * t_p
+    phi_rupt = PHI['rupture'] * 0.60 * Fu_pl * (h_p - n_rows * d_hole) * t_p
+    phi_weld = PHI['weld'] * 0.707 * w_sz * h_p * 0.60 * 4900 * 2
+
+    caps = np.stack(np.broadcast_arrays(phi_bolt, phi_bear, phi_yield, phi_rupt, phi_weld), axis=-1)
+    gov = caps.min(axis=-1)
+    out = {mode: caps[..., i] for i, mode in enumerate(MODES)}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        util = np.where(gov > 0, Vu / gov, 0.0)
+    out.update(gov_capacity=gov, gov_mode=caps.argmin(axis=-1), utilization=util, ok=gov >= Vu)
+    return out
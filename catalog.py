@@ -0,0 +1,349 @@
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+from collections.abc import Mapping
+from functools import lru_cache
+import numpy as np
+from database import SYS_H_BEAMS
+from section_props import DERIVED, fill_columns, section_properties
+
+# ==============================================================================
+# 📚 SECTION CATALOGS: IMPORT, VALIDATE, COMPILE, MEMORY-MAP
+# ==============================================================================
+# A catalog source (CSV or JSON) is parsed and validated once, then compiled to
+# a directory of .npy columns (one file per property, rows sorted by depth).
+# Loading a compiled catalog only memory-maps those files, so no tab or engine
+# parses text at startup. SectionCatalog behaves like SYS_H_BEAMS (a mapping of
+# name -> {D, B, tw, tf, W, Ix, Zx, ...}) and also hands out whole columns via
+# .arrays() for the vectorized engines.
+# Only D, B, tw, tf are mandatory: blank W / Ix / Zx / Iy / Zy / r and the derived
+# columns (A, J, Cw, r_ts, ...) are filled by section_props at compile time, so a
+# list of welded plate girders imports as-is.
+#
+# หน่วยภายใน (same as database.py): Dimension=mm, Weight=kg/m, Inertia=cm4, Modulus=cm3
+
+SCHEMA_VERSION = 2
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "catalogs")
+BUILTIN_KEY = "builtin"
+BUILTIN_LABEL = "SYS H-Beams (JIS/TIS)"
+
+# Column -> internal unit. REQUIRED must be present; OPTIONAL may be blank (computed when compiled).
+UNITS = {
+    "D": "mm", "B": "mm", "tw": "mm", "tf": "mm", "r": "mm",
+    "W": "kg/m", "Ix": "cm4", "Zx": "cm3", "Iy": "cm4", "Zy": "cm3",
+}
+REQUIRED = ("D", "B", "tw", "tf")
+OPTIONAL = ("W", "Ix", "Zx", "Iy", "Zy", "r")
+COLUMNS = REQUIRED + OPTIONAL
+STORED = COLUMNS + DERIVED
+DERIVED_UNITS = {"A": "cm2", "Sx": "cm3", "Sy": "cm3", "rx": "cm", "ry": "cm", "J": "cm4", "Cw": "cm6", "rts": "cm"}
+
+# Accepted source units -> factor to the internal unit
+CONVERSIONS = {
+    "mm": {"mm": 1.0, "cm": 10.0, "m": 1000.0, "in": 25.4},
+    "kg/m": {"kg/m": 1.0, "kn/m": 101.97162, "n/m": 0.10197162, "lb/ft": 1.4881639},
+    "cm4": {"cm4": 1.0, "mm4": 1e-4, "m4": 1e8, "in4": 41.623143},
+    "cm3": {"cm3": 1.0, "mm3": 1e-3, "m3": 1e6, "in3": 16.387064},
+}
+
+UNIT_TOL = np.log(3.0)  # |log(value / plate estimate)| above this is reported as a unit error
+
+# Header aliases (case-insensitive) -> column
+ALIASES = {
+    "name": "name", "section": "name", "designation": "name", "shape": "name",
+    "d": "D", "depth": "D", "h": "D",
+    "b": "B", "bf": "B", "width": "B",
+    "tw": "tw", "tf": "tf",
+    "r": "r", "r1": "r", "fillet": "r",
+    "w": "W", "weight": "W", "mass": "W",
+    "ix": "Ix", "iy": "Iy", "zx": "Zx", "zy": "Zy",
+    "series": "series",
+}
+
+class CatalogError(ValueError):
+    """Validation failure; .errors lists every problem found (row numbers are 1-based)"""
+    def __init__(self, errors):
+        self.errors = list(errors)
+        shown = "\n".join(self.errors[:20])
+        more = f"\n... and {len(self.errors) - 20} more" if len(self.errors) > 20 else ""
+        super().__init__(f"{len(self.errors)} catalog error(s):\n{shown}{more}")
+
+# ==========================================
+# 🧩 PARSING
+# ==========================================
+_HEADER = re.compile(r"^\s*([^\[\(]+?)\s*(?:[\[\(]\s*([^\]\)]+?)\s*[\]\)])?\s*$")
+
+def _parse_header(header, units=None):
+    """'Ix [mm4]' -> ('Ix', 'mm4'); unknown headers map to None"""
+    units = {k: v for k, v in (units or {}).items()}
+    cols = []
+    for h in header:
+        m = _HEADER.match(str(h))
+        raw, unit = (m.group(1), m.group(2)) if m else (str(h), None)
+        col = ALIASES.get(raw.strip().lower())
+        if col is not None and unit is None:
+            unit = units.get(col) or units.get(raw.strip())
+        cols.append((col, unit))
+    return cols
+
+def _records_from_json(data):
+    """JSON forms: {name: {props}} (like SYS_H_BEAMS), [{name, props}], or {"units": {}, "sections": ...}"""
+    units = {}
+    if isinstance(data, dict) and "sections" in data:
+        units = data.get("units", {})
+        data = data["sections"]
+    if isinstance(data, dict):
+        data = [dict(props, name=name) for name, props in data.items()]
+    if not isinstance(data, list) or not all(isinstance(r, dict) for r in data):
+        raise CatalogError(["JSON must be a {name: props} object, a list of records or {'units', 'sections'}"])
+    header = list(dict.fromkeys(k for r in data for k in r))
+    rows = [[r.get(k, "") for k in header] for r in data]
+    return header, rows, units
+
+def _records_from_csv(text, units=None):
+    reader = csv.reader(io.StringIO(text))
+    rows = [r for r in reader if r and any(cell.strip() for cell in r)]
+    if not rows:
+        raise CatalogError(["CSV is empty"])
+    return rows[0], rows[1:], units or {}
+
+def parse_catalog(source, fmt=None, units=None):
+    """
+    Parse + validate a catalog source (path, text or bytes).
+    Returns (names, columns, series) with columns in internal units.
+    """
+    name_hint = ""
+    if isinstance(source, (str, os.PathLike)) and os.path.exists(source):
+        name_hint = str(source)
+        with open(source, "rb") as f:
+            source = f.read()
+    if isinstance(source, bytes):
+        source = source.decode("utf-8-sig")
+    if fmt is None:
+        fmt = "json" if name_hint.lower().endswith(".json") or source.lstrip()[:1] in "[{" else "csv"
+
+    if fmt == "json":
+        try:
+            header, rows, file_units = _records_from_json(json.loads(source))
+        except json.JSONDecodeError as e:
+            raise CatalogError([f"Invalid JSON: {e}"])
+    else:
+        header, rows, file_units = _records_from_csv(source)
+    return validate_records(header, rows, {**file_units, **(units or {})})
+
+def validate_records(header, rows, units=None):
+    """Schema, unit and plausibility checks; raises CatalogError listing every problem"""
+    errors = []
+    cols = _parse_header(header, units)
+    found = [c for c, _ in cols if c]
+    if "name" not in found:
+        errors.append("Missing column: name (or section / designation)")
+    for col in REQUIRED:
+        if col not in found:
+            errors.append(f"Missing column: {col} [{UNITS[col]}]")
+    dupes = {c for c in found if found.count(c) > 1}
+    if dupes:
+        errors.append(f"Duplicate columns: {', '.join(sorted(dupes))}")
+
+    factors = {}
+    for col, unit in cols:
+        if col in UNITS:
+            table = CONVERSIONS[UNITS[col]]
+            unit_key = (unit or UNITS[col]).strip().lower().replace(" ", "")
+            if unit_key not in table:
+                errors.append(f"Column {col}: unsupported unit '{unit}' (use one of {', '.join(table)})")
+            else:
+                factors[col] = table[unit_key]
+    if errors:
+        raise CatalogError(errors)
+
+    n = len(rows)
+    names = []
+    data = {col: np.full(n, np.nan) for col in COLUMNS}
+    series = np.full(n, "", dtype=object)
+    for i, row in enumerate(rows):
+        for (col, _), cell in zip(cols, row):
+            if col is None:
+                continue
+            text = str(cell).strip()
+            if col == "name":
+                names.append(text)
+            elif col == "series":
+                series[i] = text
+            elif text != "":
+                try:
+                    data[col][i] = float(text) * factors[col]
+                except ValueError:
+                    errors.append(f"Row {i + 1}: {col} = '{text}' is not a number")
+        if len(names) < i + 1:
+            names.append("")
+
+    names = np.array(names, dtype=object)
+    # --- Row checks (vectorized) ---
+    def flag(mask, message):
+        for i in np.nonzero(mask)[0][:50]:
+            errors.append(f"Row {i + 1} ({names[i] or '?'}): {message}")
+
+    flag(names == "", "empty name")
+    uniq, counts = np.unique(names[names != ""].astype(str), return_counts=True)
+    for dup in uniq[counts > 1]:
+        errors.append(f"Duplicate section name: {dup}")
+    for col in REQUIRED:
+        flag(~np.isfinite(data[col]), f"{col} is missing")
+        flag(np.isfinite(data[col]) & (data[col] <= 0), f"{col} must be > 0")
+    for col in OPTIONAL:
+        if col == "r":
+            flag(data[col] < 0, "r must be >= 0 (0 = welded)")
+        else:
+            flag(np.isfinite(data[col]) & (data[col] <= 0), f"{col} must be > 0 when given")
+
+    D, B, tw, tf = data["D"], data["B"], data["tw"], data["tf"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        flag(2 * tf >= D, "flanges (2·tf) do not fit in the depth D")
+        flag(tw >= B, "web thickness tw >= flange width B")
+        # Unit sanity: catalog values vs. plate-model estimates. The tolerance (×3) is wide
+        # enough for fillets and tapered flanges; a wrong unit is off by ×10 or more.
+        est = section_properties(D, B, tw, tf)
+        flag(np.abs(np.log(data["W"] / est["W"])) > UNIT_TOL, "W does not match the plate area (check units)")
+        flag(np.abs(np.log(data["Zx"] / est["Zx"])) > UNIT_TOL, "Zx does not match D/B/tw/tf (check units)")
+        flag(np.abs(np.log(data["Ix"] / est["Ix"])) > UNIT_TOL, "Ix does not match D/B/tw/tf (check units)")
+    if errors:
+        raise CatalogError(errors)
+    return names.astype(str), data, series.astype(str)
+
+# ==========================================
+# 💾 COMPILE / LOAD
+# ==========================================
+def _catalog_key(label, names, data):
+    h = hashlib.sha1()
+    h.update(str(SCHEMA_VERSION).encode())
+    h.update("\0".join(names).encode())
+    for col in COLUMNS:
+        h.update(np.ascontiguousarray(data[col]).tobytes())
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", label).strip("-").lower()[:40] or "catalog"
+    return f"{slug}-{h.hexdigest()[:12]}"
+
+def compile_catalog(names, data, series=None, label="Catalog", cache_dir=CACHE_DIR):
+    """
+    Write the columnar cache (rows sorted by depth, then weight) and return its key.
+    Blank and derived properties are computed here, once, by the property engine.
+    """
+    key = _catalog_key(label, names, data)
+    path = os.path.join(cache_dir, key)
+    if os.path.exists(os.path.join(path, "meta.json")):
+        return key
+
+    data = fill_columns(data)
+    order = np.lexsort((data["W"], data["D"]))
+    tmp = path + ".tmp"
+    os.makedirs(tmp, exist_ok=True)
+    np.save(os.path.join(tmp, "name.npy"), np.asarray(names, dtype=str)[order])
+    np.save(os.path.join(tmp, "series.npy"),
+            np.asarray(series if series is not None else [""] * len(names), dtype=str)[order])
+    for col in STORED:
+        np.save(os.path.join(tmp, f"{col}.npy"), np.asarray(data[col], dtype=np.float64)[order])
+    meta = {"schema": SCHEMA_VERSION, "label": label, "count": int(len(names)),
+            "columns": list(STORED), "units": {**UNITS, **DERIVED_UNITS}}
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+    return key
+
+def import_catalog(source, label=None, fmt=None, units=None, cache_dir=CACHE_DIR):
+    """Parse + validate + compile a CSV/JSON catalog; returns the loaded SectionCatalog"""
+    names, data, series = parse_catalog(source, fmt, units)
+    if label is None:
+        label = os.path.splitext(os.path.basename(str(source)))[0] if isinstance(source, (str, os.PathLike)) \
+            and os.path.exists(source) else "Imported Catalog"
+    key = compile_catalog(names, data, series, label, cache_dir)
+    return load_catalog(key, cache_dir)
+
+class SectionCatalog(Mapping):
+    """Read-only mapping over memory-mapped catalog columns (iterates by depth)"""
+    def __init__(self, key, label, names, columns, series):
+        self.key = key
+        self.label = label
+        self._names = names
+        self._columns = columns
+        self._series = series
+        self._index = None
+
+    def _lookup(self):
+        if self._index is None:
+            self._index = {str(n): i for i, n in enumerate(self._names)}
+        return self._index
+
+    def __getitem__(self, name):
+        i = self._lookup()[name]
+        props = {col: float(v[i]) for col, v in self._columns.items() if np.isfinite(v[i])}
+        if self._series[i]:
+            props["series"] = str(self._series[i])
+        return props
+
+    def __iter__(self):
+        return (str(n) for n in self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._lookup()
+
+    def __repr__(self):
+        return f"SectionCatalog({self.label!r}, {len(self)} sections)"
+
+    def arrays(self, names=None):
+        """
+        Property columns (NumPy), for all sections or the given names in that order.
+        Optional columns that are blank for every section are left out.
+        """
+        cols = {col: v for col, v in self._columns.items() if col in REQUIRED or not np.isnan(v).all()}
+        if names is None:
+            return {col: np.asarray(v) for col, v in cols.items()}
+        idx = np.fromiter((self._lookup()[n] for n in names), dtype=np.intp, count=len(names))
+        return {col: np.asarray(v)[idx] for col, v in cols.items()}
+
+def _catalog_path(key, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, key)
+
+@lru_cache(maxsize=16)
+def load_catalog(key, cache_dir=CACHE_DIR):
+    """Memory-map a compiled catalog (no parsing: .npy headers only)"""
+    path = _catalog_path(key, cache_dir)
+    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("schema") != SCHEMA_VERSION:
+        raise CatalogError([f"Catalog '{key}' was compiled with schema {meta.get('schema')}; re-import it"])
+    mm = lambda name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+    columns = {col: mm(col) for col in meta["columns"]}
+    return SectionCatalog(key, meta["label"], mm("name"), columns, mm("series"))
+
+def get_catalog(key=BUILTIN_KEY, cache_dir=CACHE_DIR):
+    """The built-in SYS_H_BEAMS dict or a compiled catalog"""
+    return SYS_H_BEAMS if key == BUILTIN_KEY else load_catalog(key, cache_dir)
+
+def available_catalogs(cache_dir=CACHE_DIR):
+    """{key: label} of the built-in catalog and every compiled catalog on disk"""
+    found = {BUILTIN_KEY: BUILTIN_LABEL}
+    if os.path.isdir(cache_dir):
+        for key in sorted(os.listdir(cache_dir)):
+            meta_path = os.path.join(cache_dir, key, "meta.json")
+            if key.endswith(".tmp") or not os.path.exists(meta_path):
+                continue
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("schema") == SCHEMA_VERSION:
+                found[key] = f"{meta['label']} ({meta['count']})"
+    return found
+
+def catalog_token(catalog):
+    """Hashable identity of a catalog for st.cache_data (SectionCatalog by key, dicts by content)"""
+    if isinstance(catalog, SectionCatalog):
+        return catalog.key
+    return json.dumps(catalog, sort_keys=True, default=float)
+
+# st.cache_data(hash_funcs=CACHE_HASH): hash a SectionCatalog by key instead of its columns
+CACHE_HASH = {SectionCatalog: catalog_token}
@@ -0,0 +1,70 @@
+from database import SYS_H_BEAMS
+
+# ==============================================================================
+# 📐 GEOMETRIC FEASIBILITY: BOLT ROWS IN A BEAM WEB
+# ==============================================================================
+# หน่วย: mm
+# Row limits depend only on geometry (section depth/flange, bolt size, pitch/edge
+# rule), so they are tabulated once and shared by the manual check (tab6) and the
+# typical-detail solver (tab7).
+
+MIN_ROWS = 2        # Minimum rows for a shear tab
+FLANGE_MARGIN = 10  # Clearance between plate and flange (top & bottom)
+
+BOLT_DIAS = [12.0, 16.0, 20.0, 22.0, 24.0, 27.0, 30.0]
+
+# Pitch / vertical edge distance as multiples of the bolt diameter
+ROW_RULES = {
+    "standard": {"pitch": 3.0, "lev": 1.5},
+    "minimum":  {"pitch": 2.67, "lev": 1.25},
+}
+
+def row_limits(D, tf, pitch, lev, margin_top=FLANGE_MARGIN, margin_bot=FLANGE_MARGIN):
+    """
+    Valid bolt-row range and plate height limits for one web depth.
+    Returns dict: clear_h, min_rows, max_rows, feasible, plate_h_min, plate_h_max
+    """
+    clear_h = D - (2 * tf) - margin_top - margin_bot
+    if clear_h <= (2 * lev):
+        max_rows = 0
+    else:
+        max_rows = int(((clear_h - (2 * lev)) / pitch) + 1)
+
+    feasible = max_rows >= MIN_ROWS
+    return {
+        "clear_h": clear_h,
+        "min_rows": MIN_ROWS,
+        "max_rows": max(0, max_rows),
+        "feasible": feasible,
+        "plate_h_min": (2 * lev) + ((MIN_ROWS - 1) * pitch),
+        "plate_h_max": (2 * lev) + ((max_rows - 1) * pitch) if feasible else 0.0,
+    }
+
+def build_feasibility_table(catalog=SYS_H_BEAMS, bolt_dias=BOLT_DIAS, rules=ROW_RULES):
+    """Precompute row_limits for every section depth × bolt diameter × rule"""
+    table = {}
+    for props in catalog.values():
+        for dia in bolt_dias:
+            for rule_name, rule in rules.items():
+                key = (float(props['D']), float(props['tf']), float(dia), rule_name)
+                if key not in table:
+                    table[key] = row_limits(props['D'], props['tf'], rule['pitch'] * dia, rule['lev'] * dia)
+    return table
+
+FEASIBILITY_TABLE = build_feasibility_table()
+
+def get_row_limits(props, dia, rule="standard", pitch=None, lev=None):
+    """
+    Look up the row limits for a section (uses 'D' and 'tf' keys).
+    A custom pitch/lev (e.g. from the manual check) is computed directly.
+    """
+    rule_pitch = ROW_RULES[rule]['pitch'] * dia
+    rule_lev = ROW_RULES[rule]['lev'] * dia
+    if (pitch is None or pitch == rule_pitch) and (lev is None or lev == rule_lev):
+        key = (float(props['D']), float(props['tf']), float(dia), rule)
+        if key not in FEASIBILITY_TABLE:
+            FEASIBILITY_TABLE[key] = row_limits(props['D'], props['tf'], rule_pitch, rule_lev)
+        return FEASIBILITY_TABLE[key]
+    return row_limits(props['D'], props['tf'],
+                      rule_pitch if pitch is None else pitch,
+                      rule_lev if lev is None else lev)
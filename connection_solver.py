@@ -0,0 +1,230 @@
+from database import SYS_H_BEAMS, sorted_sections
+from calculator import core_calculation
+from calculator_tab import calculate_shear_tab
+from connection_geometry import get_row_limits
+
+# ==============================================================================
+# 🔩 TYPICAL SHEAR-TAB SOLVER (no UI: used by tab7, the API, job queue and PDF reports)
+# ==============================================================================
+# หน่วย: mm, kg
+
+# Bolt Options: (Dia, Min_Plate_T, Min_Weld) เรียงจากเล็กไปใหญ่
+BOLT_OPTIONS = [
+    {'dia': 12.0, 'p_t': 6.0,  'w_sz': 4.0}, # สำหรับคานเล็กมาก
+    {'dia': 16.0, 'p_t': 9.0,  'w_sz': 6.0},
+    {'dia': 20.0, 'p_t': 10.0, 'w_sz': 6.0},
+    {'dia': 22.0, 'p_t': 12.0, 'w_sz': 8.0},
+    {'dia': 24.0, 'p_t': 12.0, 'w_sz': 8.0},
+    {'dia': 27.0, 'p_t': 16.0, 'w_sz': 10.0},
+    {'dia': 30.0, 'p_t': 19.0, 'w_sz': 12.0}
+]
+
+SETBACK = 12 # Standard gap (mm), used for the bolt group eccentricity
+
+def build_candidates(beam_props):
+    """
+    Enumerate every connection the solver may try, in solver order:
+    Bolt Size (แนะนำ -> ใหญ่สุด) -> Rows (2 -> Max) -> Plate/Weld (Normal -> Heavy)
+    """
+    # --- 1. Geometry Constraints ---
+    D = beam_props['D']
+    Tw = beam_props['tw']
+    
+    # เลือกจุดเริ่มต้นตามขนาดคาน (Best Practice)
+    start_idx = 0
+    if D >= 600: start_idx = 4 # Start M24
+    elif D >= 400: start_idx = 2 # Start M20
+    elif D >= 200: start_idx = 1 # Start M16
+    
+    candidates = []
+    max_rows_geo = 2
+    for b_idx in range(start_idx, len(BOLT_OPTIONS)):
+        opt = BOLT_OPTIONS[b_idx]
+        bolt_dia = opt['dia']
+        
+        # Geometry Parameters
+        pitch = 3 * bolt_dia
+        lev = 1.5 * bolt_dia
+        leh = 35 # Standard edge
+        
+        # Max Rows ที่ใส่ได้ในหน้าตัดนี้ (จากตาราง Geometric Feasibility)
+        limits = get_row_limits(beam_props, bolt_dia, "standard")
+        max_rows_geo = max(2, limits['max_rows']) # อย่างน้อย 2
+        if not limits['feasible']:
+            continue # Prune: ใส่ 2 แถวไม่ได้ ไม่ต้องเช็คกำลัง
+        
+        for rows in range(limits['min_rows'], limits['max_rows'] + 1):
+            # กรณีที่น็อตผ่าน แต่เพลทฉีก หรือรอยเชื่อมไม่พอ เราจะลองเพิ่มความหนาดู
+            plate_steps = [
+                {'t': opt['p_t'],      'w': opt['w_sz']},       # Standard
+                {'t': opt['p_t'] + 3,  'w': opt['w_sz'] + 2},   # Stronger
+                {'t': opt['p_t'] + 6,  'w': opt['w_sz'] + 4},   # Extra Strong
+                {'t': 25.0,            'w': 14.0}               # Maximum Limit
+            ]
+            for p_step in plate_steps:
+                candidates.append({
+                    'beam_tw': Tw,
+                    'bolt_dia': bolt_dia, 'n_rows': rows,
+                    'pitch': pitch, 'lev': lev, 'leh': leh,
+                    'plate_t': p_step['t'], 'weld_sz': p_step['w'],
+                    'plate_h': (2 * lev) + ((rows - 1) * pitch)
+                })
+    return candidates, max_rows_geo
+
+def typical_inputs(cand, method, bolt_group="Concentric", load=0.0):
+    """calculate_shear_tab inputs of one candidate (typical materials and setback)"""
+    return {
+        'load': load,
+        'method': method,
+        'beam_tw': cand['beam_tw'], 'beam_mat': "SS400", 
+        'plate_t': cand['plate_t'], 'plate_h': cand['plate_h'], 'plate_mat': "SS400",
+        'bolt_dia': cand['bolt_dia'], 'bolt_grade': "A325",
+        'n_rows': cand['n_rows'], 'pitch': cand['pitch'],
+        'lev': cand['lev'], 'leh': cand['leh'], 
+        'setback': SETBACK, 'bolt_group': bolt_group,
+        'weld_sz': cand['weld_sz']
+    }
+
+def candidate_capacity(cand, method, bolt_group="Concentric"):
+    """Governing capacity of one candidate (independent of the target load)"""
+    try:
+        return calculate_shear_tab(typical_inputs(cand, method, bolt_group))['summary']['gov_capacity']
+    except Exception:
+        return None
+
+def solve_connection(beam_props, Vu_target, method, warm=None, bolt_group="Concentric"):
+    """
+    Super Solver Algorithm:
+    พยายามหา Connection ที่ 'เล็กที่สุด' ที่ผ่านเงื่อนไข
+    โดยการปรับตัวแปร: Rows -> Plate/Weld -> Bolt Size
+    
+    `warm` is an optional per-section dict that is updated in place. It keeps the
+    candidate list, the capacities already evaluated and the previous answer, so a
+    small change of `Vu_target` is answered by searching outward from the previous
+    solution instead of restarting from the smallest bolt.
+    """
+    if warm is None: warm = {}
+    if warm.get('mode') != (method, bolt_group) or 'candidates' not in warm:
+        warm.clear()
+        warm['candidates'], warm['max_rows_geo'] = build_candidates(beam_props)
+        warm['caps'] = {}
+        warm['mode'] = (method, bolt_group)
+    
+    candidates = warm['candidates']
+    caps = warm['caps']
+    
+    def cap_of(idx):
+        if idx not in caps:
+            caps[idx] = candidate_capacity(candidates[idx], method, bolt_group)
+        return caps[idx]
+    
+    def passes(idx):
+        cap = cap_of(idx)
+        return cap is not None and cap >= Vu_target
+    
+    # --- Warm Start ---
+    # คำตอบเดิมยังใช้ได้ถ้าเป้าหมายอยู่ในช่วง (lo, hi] ของคำตอบเดิม
+    # lo = กำลังสูงสุดของตัวเลือกก่อนหน้าคำตอบ, hi = กำลังของคำตอบ
+    prev = warm.get('idx')
+    found = None
+    if prev is not None and warm['lo'] < Vu_target <= warm['hi']:
+        # Target stayed inside the previous boundaries: reuse the answer
+        found = None if prev < 0 else prev
+    elif prev is not None and Vu_target <= warm['lo']:
+        # Target crossed the lower boundary: search down for a smaller candidate
+        for idx in range((len(candidates) if prev < 0 else prev) - 1, -1, -1):
+            if passes(idx): found = idx
+    else:
+        # Cold start, or target crossed the upper boundary (every earlier candidate fails too)
+        first = 0 if prev is None else prev + 1
+        for idx in range(first, len(candidates)):
+            if passes(idx):
+                found = idx
+                break
+    
+    # --- Record Boundaries for the next call ---
+    stop = len(candidates) if found is None else found
+    lo = max([c for c in (cap_of(i) for i in range(stop)) if c is not None], default=0.0)
+    warm['idx'] = -1 if found is None else found
+    warm['lo'] = lo
+    warm['hi'] = float('inf') if found is None else caps[found]
+    
+    if found is not None:
+        # เย้! เจอแล้ว ส่งคำตอบกลับทันที (เพราะเราเริ่มจากตัวเล็กสุดเสมอ)
+        cand = candidates[found]
+        cap = caps[found]
+        return {
+            "Rows": cand['n_rows'],
+            "Bolt": f"M{int(cand['bolt_dia'])}",
+            "Plate": f"{int(cand['plate_t'])}x{int(cand['plate_h'])}",
+            "Weld": f"{int(cand['weld_sz'])}",
+            "Ratio": Vu_target / cap if cap > 0 else 0.0,
+            "Note": "Optimized",
+            "Status": "✅ PASS",
+            "Detail": cand
+        }
+                    
+    # --- 3. Fallback (ถ้าหาทางไม่ได้จริงๆ) ---
+    # จะเกิดขึ้นยากมาก นอกจากคานเล็กจิ๋วแต่รับแรงมหาศาล
+    return {
+        "Rows": warm['max_rows_geo'],
+        "Bolt": f"M{int(BOLT_OPTIONS[-1]['dia'])}", # ใช้ใหญ่สุด
+        "Plate": "Check Detail",
+        "Weld": "Check Detail",
+        "Ratio": 9.99,
+        "Note": "Exceed Capacity" if warm['candidates'] else "No Geometric Fit",
+        "Status": "❌ FAIL"
+    }
+
+def typical_geometry(props, detail):
+    """Drawer inputs (beam, plate, bolt, config) for a solved typical detail"""
+    d_b = detail['bolt_dia']
+    beam_dims = {'H': props['D'], 'B': props['B'], 'Tw': props['tw'], 'Tf': props['tf']}
+    plate_dims = {'t': detail['plate_t'], 'w': SETBACK + detail['leh'] + int(1.25 * d_b),
+                  'h': detail['plate_h'], 'weld_sz': detail['weld_sz']}
+    bolt_dims = {'dia': d_b, 'n_rows': detail['n_rows'], 'pitch': detail['pitch'],
+                 'lev': detail['lev'], 'leh_beam': detail['leh']}
+    config = {'setback': SETBACK, 'L_beam_show': props['D'] * 1.5}
+    return beam_dims, plate_dims, bolt_dims, config
+
+def solve_typical(method, Fy, E_gpa, def_val, catalog=SYS_H_BEAMS, bolt_group="Concentric",
+                  warm_store=None, progress=None):
+    """
+    Solve the typical detail (75% of V_des) for every section of the catalog, by depth.
+    Rows are plain values (JSON-able) plus 'Detail' = solved candidate or None.
+    progress(i, total, row) is called after each section.
+    """
+    if warm_store is None: warm_store = {}
+    beams = sorted_sections(catalog)
+    total = len(beams)
+    results = []
+    for i, section_name in enumerate(beams):
+        props = catalog[section_name]
+        
+        # 1. Core Calculation
+        c = core_calculation(6.0, Fy, E_gpa, props, method, def_val)
+        V_full = float(c['V_des'])
+        V_target = 0.75 * V_full # Target 75%
+        
+        # 2. AI Solver Design
+        conn = solve_connection(props, V_target, method, warm=warm_store.setdefault(section_name, {}), bolt_group=bolt_group)
+        
+        # 3. Collect Data
+        row = {
+            "Section": section_name,
+            "D": props['D'],
+            "Shear (100%)": V_full,
+            "Design (75%)": V_target,
+            "Zone (m)": f"{c['L_vm']:.2f}-{c['L_md']:.2f}",
+            "Bolt": conn['Bolt'],
+            "Rows": int(conn['Rows']),
+            "Plate (mm)": conn['Plate'],
+            "Weld (mm)": conn['Weld'],
+            "Ratio": float(conn['Ratio']),
+            "Status": conn['Status'],
+            "Detail": conn.get('Detail'),
+        }
+        results.append(row)
+        if progress is not None:
+            progress(i, total, row)
+    return results
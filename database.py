@@ -1,8 +1,11 @@
 # database.py
 
+import numpy as np
+
 # Dictionary เก็บคุณสมบัติหน้าตัดเหล็ก H-Beam (JIS/TIS Standard)
 # หน่วย: Dimension=mm, Weight=kg/m, Area=cm2, Inertia=cm4, Modulus=cm3
 # เพิ่ม keys: 'B' (Width), 'tf' (Flange Thickness) สำหรับคำนวณ LTB
+# Derived keys (r, A, Sx, Sy, rx, ry, J, Cw, rts) are added once at import by section_props
 
 SYS_H_BEAMS = {
     "H-100x50x5x7": { 
@@ -138,3 +141,23 @@ SYS_H_BEAMS = {
         "W": 243.0, "Ix": 404000, "Zx": 8980, "Iy": 12600, "Zy": 841 
     }
 }
+
+# ==========================================
+# 📐 DERIVED PROPERTIES (computed once, read by the calculators)
+# ==========================================
+from section_props import PROPERTY_KEYS, complete_props
+
+SYS_H_BEAMS = {name: complete_props(props) for name, props in SYS_H_BEAMS.items()}
+
+def sorted_sections(catalog=SYS_H_BEAMS):
+    """Section names ordered by depth D (catalog order kept for equal depths)"""
+    if hasattr(catalog, 'arrays'):
+        return list(catalog)  # compiled catalogs are stored sorted by depth
+    return sorted(catalog.keys(), key=lambda name: catalog[name]['D'])
+
+def section_arrays(names, catalog=SYS_H_BEAMS):
+    """Stack the properties of `names` into NumPy columns (for vectorized engines)"""
+    if hasattr(catalog, 'arrays'):
+        return catalog.arrays(names)
+    keys = [k for k in PROPERTY_KEYS if all(k in catalog[n] for n in names)]
+    return {k: np.array([float(catalog[n][k]) for n in names]) for k in keys}
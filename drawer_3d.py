@@ -1,99 +1,184 @@
 import plotly.graph_objects as go
 import numpy as np
+from functools import lru_cache
 
 # ==========================================
 # 1. GEOMETRY HELPERS
 # ==========================================
+# Primitives return raw (verts, faces) arrays; MeshBuilder merges them into
+# one Mesh3d trace per material group. Every primitive is an instance of a
+# cached unit mesh, placed by one vectorized scale/rotate/translate.
 
-def make_cuboid(center, size, color, name, opacity=1.0):
-    """สร้างกล่องสี่เหลี่ยม"""
-    # Auto-convert inputs to simple variables
-    x, y, z = center
-    dx, dy, dz = size
-    
-    return go.Mesh3d(
-        x=[x-dx/2, x-dx/2, x+dx/2, x+dx/2, x-dx/2, x-dx/2, x+dx/2, x+dx/2],
-        y=[y-dy/2, y+dy/2, y+dy/2, y-dy/2, y-dy/2, y+dy/2, y+dy/2, y-dy/2],
-        z=[z-dz/2, z-dz/2, z-dz/2, z-dz/2, z+dz/2, z+dz/2, z+dz/2, z+dz/2],
-        i=[7, 0, 0, 0, 4, 4, 6, 6, 4, 0, 3, 2],
-        j=[3, 4, 1, 2, 5, 6, 5, 2, 0, 1, 6, 3],
-        k=[0, 7, 2, 3, 6, 7, 1, 1, 5, 5, 7, 6],
-        color=color, opacity=opacity, flatshading=True, name=name,
-        lighting=dict(ambient=0.7, diffuse=0.8, specular=0.2)
-    )
+CUBOID_FACES = np.array([
+    [7, 3, 0], [0, 4, 7], [0, 1, 2], [0, 2, 3], [4, 5, 6], [4, 6, 7],
+    [6, 5, 1], [6, 2, 1], [4, 0, 5], [0, 1, 5], [3, 6, 7], [2, 3, 6]
+])
 
-def make_cylinder(p1, p2, r, color, name="Cylinder"):
-    """สร้างทรงกระบอก"""
-    # 🛠️ FIX: Force convert to numpy array to avoid List Math Error
+@lru_cache(maxsize=None)
+def unit_cuboid():
+    """Unit cube centered at the origin"""
+    verts = np.array([
+        [-1, -1, -1], [-1, 1, -1], [1, 1, -1], [1, -1, -1],
+        [-1, -1, 1], [-1, 1, 1], [1, 1, 1], [1, -1, 1],
+    ], dtype=float) / 2
+    return verts, CUBOID_FACES
+
+def _prism_faces(n, caps):
+    idx = np.arange(n)
+    nxt = (idx + 1) % n
+    faces = [np.stack([idx, nxt, idx + n], axis=1),
+             np.stack([nxt, nxt + n, idx + n], axis=1)]
+    if caps:
+        cap = np.arange(1, n - 1)
+        faces.append(np.stack([np.zeros_like(cap), cap, cap + 1], axis=1))
+        faces.append(np.stack([np.full_like(cap, n), n + cap + 1, n + cap], axis=1))
+    return np.vstack(faces)
+
+@lru_cache(maxsize=None)
+def unit_cylinder(n_sides=16):
+    """Radius 1, local z from 0 to 1 (side surface only)"""
+    theta = np.linspace(0, 2*np.pi, n_sides, endpoint=False)
+    ring = np.stack([np.cos(theta), np.sin(theta)], axis=1)
+    verts = np.zeros((2 * n_sides, 3))
+    verts[:n_sides, :2] = ring
+    verts[n_sides:, :2] = ring
+    verts[n_sides:, 2] = 1.0
+    return verts, _prism_faces(n_sides, caps=False)
+
+@lru_cache(maxsize=None)
+def unit_hex_prism():
+    """Circumradius 1, local z from -0.5 to 0.5 (with end caps)"""
+    theta = np.linspace(0, 2*np.pi, 7)[:-1]
+    ring = np.stack([np.cos(theta), np.sin(theta)], axis=1)
+    verts = np.zeros((12, 3))
+    verts[:6, :2] = ring
+    verts[6:, :2] = ring
+    verts[:6, 2] = -0.5
+    verts[6:, 2] = 0.5
+    return verts, _prism_faces(6, caps=True)
+
+def axis_rotation(axis, not_v):
+    """Rotation matrix taking local z onto `axis` (local x, y -> n1, n2)"""
+    v = np.array(axis, dtype=float)
+    v = v / np.linalg.norm(v)
+    n1 = np.cross(v, not_v); n1 /= np.linalg.norm(n1)
+    n2 = np.cross(v, n1)
+    return np.stack([n1, n2, v], axis=1)
+
+def instance_mesh(unit, scales, rotation, offsets):
+    """
+    Place N copies of a unit mesh in one pass.
+    scales (N,3) or (3,), rotation (3,3) or (N,3,3), offsets (N,3) -> (N*V,3) verts, (N*F,3) faces
+    """
+    u_verts, u_faces = unit
+    offsets = np.atleast_2d(np.asarray(offsets, dtype=float))
+    n = len(offsets)
+    scales = np.broadcast_to(np.asarray(scales, dtype=float), (n, 3))
+    nv, nf = len(u_verts), len(u_faces)
+
+    verts = np.empty((n, nv, 3))
+    np.multiply(u_verts[None, :, :], scales[:, None, :], out=verts)
+    rotation = np.asarray(rotation, dtype=float)
+    if rotation.ndim == 2:
+        verts = np.matmul(verts, rotation.T, out=np.empty_like(verts))
+    else:
+        verts = np.matmul(verts, np.transpose(rotation, (0, 2, 1)), out=np.empty_like(verts))
+    verts += offsets[:, None, :]
+
+    faces = np.empty((n, nf, 3), dtype=np.int64)
+    np.add(u_faces[None, :, :], (np.arange(n) * nv)[:, None, None], out=faces)
+    return verts.reshape(-1, 3), faces.reshape(-1, 3)
+
+def cuboid_mesh(center, size):
+    """กล่องสี่เหลี่ยม -> (verts, faces)"""
+    return instance_mesh(unit_cuboid(), size, np.eye(3), center)
+
+def cylinder_mesh(p1, p2, r, n_sides=16):
+    """ทรงกระบอก (ผิวข้าง) -> (verts, faces)"""
     p1 = np.array(p1, dtype=float)
     p2 = np.array(p2, dtype=float)
     
     v = p2 - p1
     mag = np.linalg.norm(v)
-    if mag == 0: return go.Mesh3d()
-    v = v / mag
+    if mag == 0: return np.zeros((0, 3)), np.zeros((0, 3), dtype=int)
     
     not_v = np.array([1, 0, 0])
-    if np.abs(np.dot(v, not_v)) > 0.9: not_v = np.array([0, 1, 0])
-    n1 = np.cross(v, not_v); n1 /= np.linalg.norm(n1)
-    n2 = np.cross(v, n1)
-    
-    n_sides = 16 
-    theta = np.linspace(0, 2*np.pi, n_sides, endpoint=False)
-    x_circ = r * np.cos(theta)
-    y_circ = r * np.sin(theta)
-    
-    verts = []
-    for x, y in zip(x_circ, y_circ): verts.append(p1 + x*n1 + y*n2)
-    for x, y in zip(x_circ, y_circ): verts.append(p2 + x*n1 + y*n2)
-    verts = np.array(verts)
-    
-    i, j, k = [], [], []
-    for idx in range(n_sides):
-        nxt = (idx + 1) % n_sides
-        i.extend([idx, nxt, idx+n_sides])
-        j.extend([nxt, nxt+n_sides, nxt+n_sides])
-        k.extend([idx+n_sides, idx+n_sides, idx])
+    if np.abs(np.dot(v / mag, not_v)) > 0.9: not_v = np.array([0, 1, 0])
+    return instance_mesh(unit_cylinder(n_sides), [r, r, mag], axis_rotation(v, not_v), p1)
 
-    return go.Mesh3d(x=verts[:,0], y=verts[:,1], z=verts[:,2], 
-                     i=i, j=j, k=k, color=color, flatshading=False, name=name)
-
-def make_hex_prism(center, normal, width, thick, color, name="Hex"):
-    """สร้างปริซึมหกเหลี่ยม"""
-    # 🛠️ FIX: Force convert inputs
-    center = np.array(center, dtype=float)
+def hex_prism_mesh(center, normal, width, thick):
+    """ปริซึมหกเหลี่ยม -> (verts, faces)"""
     normal = np.array(normal, dtype=float)
-    
     v = normal / np.linalg.norm(normal)
     not_v = np.array([0, 1, 0]) if np.abs(v[1]) < 0.9 else np.array([1, 0, 0])
-    n1 = np.cross(v, not_v); n1 /= np.linalg.norm(n1)
-    n2 = np.cross(v, n1)
-    
     r = width / np.sqrt(3) 
-    theta = np.linspace(0, 2*np.pi, 7)[:-1]
-    x_c = r * np.cos(theta)
-    y_c = r * np.sin(theta)
-    
-    p_start = center - (v * thick / 2)
-    p_end = center + (v * thick / 2)
-    
-    verts = []
-    for x, y in zip(x_c, y_c): verts.append(p_start + x*n1 + y*n2)
-    for x, y in zip(x_c, y_c): verts.append(p_end + x*n1 + y*n2)
-    verts = np.array(verts)
-    
-    n = 6
-    i, j, k = [], [], []
-    for idx in range(n):
-        nxt = (idx + 1) % n
-        i.extend([idx, nxt, idx+n]); j.extend([nxt, nxt+n, nxt+n]); k.extend([idx+n, idx+n, idx])
-    
-    for idx in range(1, n-1):
-        i.extend([0, 0]); j.extend([idx, idx+1]); k.extend([idx+1, idx]) 
-        i.extend([n, n]); j.extend([n+idx, n+idx+1]); k.extend([n+idx+1, n+idx]) 
+    return instance_mesh(unit_hex_prism(), [r, r, thick], axis_rotation(v, not_v), center)
+
+def _mesh_trace(verts, faces, color, name, opacity=1.0, flatshading=True):
+    return go.Mesh3d(
+        x=verts[:, 0], y=verts[:, 1], z=verts[:, 2],
+        i=faces[:, 0], j=faces[:, 1], k=faces[:, 2],
+        color=color, opacity=opacity, flatshading=flatshading, name=name,
+        lighting=dict(ambient=0.7, diffuse=0.8, specular=0.2)
+    )
+
+def make_cuboid(center, size, color, name, opacity=1.0):
+    """สร้างกล่องสี่เหลี่ยม"""
+    return _mesh_trace(*cuboid_mesh(center, size), color, name, opacity)
+
+def make_cylinder(p1, p2, r, color, name="Cylinder"):
+    """สร้างทรงกระบอก"""
+    return _mesh_trace(*cylinder_mesh(p1, p2, r), color, name, flatshading=False)
+
+def make_hex_prism(center, normal, width, thick, color, name="Hex"):
+    """สร้างปริซึมหกเหลี่ยม"""
+    return _mesh_trace(*hex_prism_mesh(center, normal, width, thick), color, name)
+
+class MeshBuilder:
+    """
+    Collects vertices, faces, per-face colors and per-vertex part labels, grouped by
+    material. Each group becomes a single Mesh3d trace (one legend entry), so the
+    trace count does not grow with the number of bolts.
+    """
+    def __init__(self):
+        self.groups = {}
+
+    def add(self, group, verts, faces, color, label):
+        g = self.groups.setdefault(group, {'verts': [], 'faces': [], 'colors': [], 'labels': [], 'n': 0})
+        g['verts'].append(verts)
+        g['faces'].append(faces + g['n'])
+        g['colors'].append(np.full(len(faces), color, dtype=object))
+        g['labels'].append(np.full(len(verts), label, dtype=object))
+        g['n'] += len(verts)
 
-    return go.Mesh3d(x=verts[:,0], y=verts[:,1], z=verts[:,2], 
-                     i=i, j=j, k=k, color=color, flatshading=True, name=name)
+    def arrays(self, group):
+        """Merged (verts, faces, face_colors, vertex_labels) of one group"""
+        g = self.groups[group]
+        n_faces = sum(len(f) for f in g['faces'])
+        verts = np.empty((g['n'], 3))
+        faces = np.empty((n_faces, 3), dtype=np.int64)
+        v0 = f0 = 0
+        for v, f in zip(g['verts'], g['faces']):
+            verts[v0:v0 + len(v)] = v
+            faces[f0:f0 + len(f)] = f
+            v0 += len(v); f0 += len(f)
+        return verts, faces, np.concatenate(g['colors']), np.concatenate(g['labels'])
+
+    def to_traces(self, opacity=None):
+        opacity = opacity or {}
+        return [group_trace(group, *self.arrays(group), opacity=opacity.get(group, 1.0))
+                for group in self.groups]
+
+def group_trace(group, verts, faces, colors, labels, opacity=1.0):
+    """One Mesh3d trace (one legend entry) for a whole material group"""
+    return go.Mesh3d(
+        x=verts[:, 0], y=verts[:, 1], z=verts[:, 2],
+        i=faces[:, 0], j=faces[:, 1], k=faces[:, 2],
+        facecolor=colors, opacity=opacity, flatshading=True,
+        name=group, legendgroup=group, showlegend=True,
+        text=labels, hovertemplate="<b>%{text}</b><extra>" + group + "</extra>",
+        lighting=dict(ambient=0.7, diffuse=0.8, specular=0.2)
+    )
 
 def add_dim_line(fig, p1, p2, text, color="black", offset_z=0, offset_vec=None):
     """วาดเส้นบอกระยะ"""
@@ -123,98 +208,213 @@ def add_dim_line(fig, p1, p2, text, color="black", offset_z=0, offset_vec=None):
 # ==========================================
 # 2. REAL BOLT BUILDER
 # ==========================================
-def add_real_bolt(fig, center, axis_vec, dia, grip_length):
-    # Ensure numpy arrays
-    center = np.array(center, dtype=float)
+def add_bolt_group(builder, centers, axis_vec, dia, grip_length):
+    """Heads, shanks and nuts for all bolts at once (one instancing pass per part)"""
+    centers = np.atleast_2d(np.asarray(centers, dtype=float))
     axis_vec = np.array(axis_vec, dtype=float)
+    axis_vec = axis_vec / np.linalg.norm(axis_vec)
     
     head_w = dia * 1.6; head_h = dia * 0.65; nut_h = dia * 0.85
     washer_t = 3.0; washer_d = dia * 2.1; stick_out = dia * 0.5 
     total_shank_len = grip_length + washer_t + nut_h + stick_out
     
+    not_hex = np.array([0, 1, 0]) if np.abs(axis_vec[1]) < 0.9 else np.array([1, 0, 0])
+    not_cyl = np.array([0, 1, 0]) if np.abs(axis_vec[0]) > 0.9 else np.array([1, 0, 0])
+    rot_hex = axis_rotation(axis_vec, not_hex)
+    rot_cyl = axis_rotation(axis_vec, not_cyl)
+    r_hex = head_w / np.sqrt(3)
+    
     # Head
-    fig.add_trace(make_hex_prism(center - (axis_vec*head_h/2), axis_vec, head_w, head_h, '#2c3e50', "Head"))
+    builder.add("Bolts", *instance_mesh(unit_hex_prism(), [r_hex, r_hex, head_h], rot_hex,
+                                        centers - (axis_vec*head_h/2)), '#2c3e50', "Head")
     # Shank
-    fig.add_trace(make_cylinder(center, center + (axis_vec*total_shank_len), dia/2, '#7f8c8d', "Shank"))
+    builder.add("Bolts", *instance_mesh(unit_cylinder(), [dia/2, dia/2, total_shank_len], rot_cyl,
+                                        centers), '#7f8c8d', "Shank")
     # Nut
-    nut_pos = center + (axis_vec * (grip_length + washer_t + nut_h/2))
-    fig.add_trace(make_hex_prism(nut_pos, axis_vec, head_w, nut_h, '#2c3e50', "Nut"))
+    nut_pos = centers + (axis_vec * (grip_length + washer_t + nut_h/2))
+    builder.add("Bolts", *instance_mesh(unit_hex_prism(), [r_hex, r_hex, nut_h], rot_hex,
+                                        nut_pos), '#2c3e50', "Nut")
+
+def add_simple_bolt_group(builder, centers, axis_vec, dia, grip_length):
+    """Level-of-detail bolt: one hex prism from head to nut (12 verts instead of 56)"""
+    centers = np.atleast_2d(np.asarray(centers, dtype=float))
+    axis_vec = np.array(axis_vec, dtype=float)
+    axis_vec = axis_vec / np.linalg.norm(axis_vec)
+    
+    head_w = dia * 1.6; head_h = dia * 0.65; nut_h = dia * 0.85
+    length = head_h + grip_length + 3.0 + nut_h
+    not_hex = np.array([0, 1, 0]) if np.abs(axis_vec[1]) < 0.9 else np.array([1, 0, 0])
+    r_hex = head_w / np.sqrt(3)
+    mid = centers + axis_vec * (length / 2 - head_h)
+    builder.add("Bolts", *instance_mesh(unit_hex_prism(), [r_hex, r_hex, length],
+                                        axis_rotation(axis_vec, not_hex), mid), '#2c3e50', "Bolt")
+
+def add_real_bolt(builder, center, axis_vec, dia, grip_length):
+    add_bolt_group(builder, [center], axis_vec, dia, grip_length)
 
 # ==========================================
-# 3. MAIN LOGIC
+# 3. SCENE LAYERS (CACHED)
 # ==========================================
-def create_connection_figure(beam_dims, plate_dims, bolt_dims, config):
-    H, B, Tw, Tf = beam_dims['H'], beam_dims['B'], beam_dims['Tw'], beam_dims['Tf']
-    pl_t, pl_w, pl_h = plate_dims['t'], plate_dims['w'], plate_dims['h']
-    weld_sz = plate_dims.get('weld_sz', 6)
-    d_b, n_rows, pitch = bolt_dims['dia'], bolt_dims['n_rows'], bolt_dims['pitch']
-    lev, leh_beam = bolt_dims['lev'], bolt_dims['leh_beam']
-    setback, L_beam = config['setback'], config['L_beam_show']
-    
-    fig = go.Figure()
+# The scene is assembled from independent layers. Each layer is cached on only the
+# parameters it depends on, so changing e.g. the weld size rebuilds the weld layer
+# and reuses the support, beam, plate and bolt traces.
+
+LAYER_CACHE_SIZE = 64
 
+@lru_cache(maxsize=LAYER_CACHE_SIZE)
+def _support_layer(B, H, setback):
     # --- 0. SUPPORT COLUMN (THE WALL) ---
     col_thick = 20
     col_face_loc = -setback
     col_center_y = col_face_loc - (col_thick / 2)
     
     # Draw huge vertical plate (Column Flange)
-    fig.add_trace(make_cuboid(
+    builder = MeshBuilder()
+    builder.add("Support Column", *cuboid_mesh(
         [0, col_center_y, 0],        
-        [B*2.5, col_thick, H*2.0],  
-        '#bdc3c7', "Support Column", opacity=0.6
-    ))
+        [B*2.5, col_thick, H*2.0]),  
+        '#bdc3c7', "Column Flange"
+    )
+    return tuple(builder.to_traces(opacity={"Support Column": 0.6}))
 
+def add_beam(builder, H, B, Tw, Tf, L_beam):
     # --- A. BEAM ---
     beam_cy = L_beam / 2
     web_h = H - (2 * Tf)
-    fig.add_trace(make_cuboid([0, beam_cy, 0], [Tw, L_beam, web_h], '#95a5a6', "Web"))
+    builder.add("Beam", *cuboid_mesh([0, beam_cy, 0], [Tw, L_beam, web_h]), '#95a5a6', "Web")
     z_flange = (web_h/2) + (Tf/2)
-    fig.add_trace(make_cuboid([0, beam_cy, z_flange], [B, L_beam, Tf], '#7f8c8d', "Top Flange"))
-    fig.add_trace(make_cuboid([0, beam_cy, -z_flange], [B, L_beam, Tf], '#7f8c8d', "Bot Flange"))
+    builder.add("Beam", *cuboid_mesh([0, beam_cy, z_flange], [B, L_beam, Tf]), '#7f8c8d', "Top Flange")
+    builder.add("Beam", *cuboid_mesh([0, beam_cy, -z_flange], [B, L_beam, Tf]), '#7f8c8d', "Bot Flange")
 
+def add_plate(builder, Tw, pl_t, pl_w, pl_h, setback, z_pl_center):
     # --- B. SHEAR PLATE ---
     pl_y_center = -setback + (pl_w / 2)
     pl_x_center = (Tw/2) + (pl_t/2)
-    
-    z_top_bolt = ((n_rows - 1) * pitch) / 2
-    z_pl_top = z_top_bolt + lev
-    z_pl_center = z_pl_top - (pl_h / 2)
-    
-    fig.add_trace(make_cuboid([pl_x_center, pl_y_center, z_pl_center], [pl_t, pl_w, pl_h], '#f1c40f', "Shear Plate"))
+    builder.add("Shear Plate", *cuboid_mesh([pl_x_center, pl_y_center, z_pl_center], [pl_t, pl_w, pl_h]), '#f1c40f', "Shear Plate")
 
+def add_welds(builder, Tw, pl_t, pl_h, weld_sz, setback, z_pl_center):
     # --- C. WELD (DOUBLE FILLET) ---
     weld_y = -setback + (weld_sz/2) 
     weld_x_base = (Tw/2) 
     
     # Side 1
-    fig.add_trace(make_cuboid(
+    builder.add("Weld", *cuboid_mesh(
         [weld_x_base + pl_t + weld_sz/2, weld_y, z_pl_center], 
-        [weld_sz, weld_sz, pl_h], '#e67e22', "Weld R"
-    ))
+        [weld_sz, weld_sz, pl_h]), '#e67e22', "Weld R"
+    )
     # Side 2
-    fig.add_trace(make_cuboid(
+    builder.add("Weld", *cuboid_mesh(
         [weld_x_base - weld_sz/2, weld_y, z_pl_center], 
-        [weld_sz, weld_sz, pl_h], '#e67e22', "Weld L"
-    ))
+        [weld_sz, weld_sz, pl_h]), '#e67e22', "Weld L"
+    )
 
+def add_bolts(builder, Tw, pl_t, d_b, n_rows, pitch, leh_beam, simplified=False):
     # --- D. BOLTS ---
     grip = Tw + pl_t
     bolt_start_x = -Tw/2 
-    bolt_y = leh_beam
+    z_top_bolt = ((n_rows - 1) * pitch) / 2
     
-    for i in range(n_rows):
-        bz = z_top_bolt - (i * pitch)
-        add_real_bolt(fig, [bolt_start_x, bolt_y, bz], [1, 0, 0], d_b, grip)
+    bz = z_top_bolt - (np.arange(n_rows) * pitch)
+    centers = np.column_stack([np.full(n_rows, bolt_start_x), np.full(n_rows, leh_beam), bz])
+    if simplified:
+        add_simple_bolt_group(builder, centers, [1, 0, 0], d_b, grip)
+    else:
+        add_bolt_group(builder, centers, [1, 0, 0], d_b, grip)
+
+@lru_cache(maxsize=LAYER_CACHE_SIZE)
+def _beam_layer(H, B, Tw, Tf, L_beam):
+    builder = MeshBuilder()
+    add_beam(builder, H, B, Tw, Tf, L_beam)
+    return tuple(builder.to_traces())
 
+@lru_cache(maxsize=LAYER_CACHE_SIZE)
+def _plate_layer(Tw, pl_t, pl_w, pl_h, setback, z_pl_center):
+    builder = MeshBuilder()
+    add_plate(builder, Tw, pl_t, pl_w, pl_h, setback, z_pl_center)
+    return tuple(builder.to_traces())
+
+@lru_cache(maxsize=LAYER_CACHE_SIZE)
+def _weld_layer(Tw, pl_t, pl_h, weld_sz, setback, z_pl_center):
+    builder = MeshBuilder()
+    add_welds(builder, Tw, pl_t, pl_h, weld_sz, setback, z_pl_center)
+    return tuple(builder.to_traces())
+
+@lru_cache(maxsize=LAYER_CACHE_SIZE)
+def _bolt_layer(Tw, pl_t, d_b, n_rows, pitch, leh_beam):
+    builder = MeshBuilder()
+    add_bolts(builder, Tw, pl_t, d_b, n_rows, pitch, leh_beam)
+    return tuple(builder.to_traces())
+
+@lru_cache(maxsize=LAYER_CACHE_SIZE)
+def _dims_layer(B, Tw, pl_t, lev, leh_beam, setback, z_top_bolt):
     # --- E. DIMS ---
+    dims = go.Figure()
     # Lev
-    dim_x = pl_x_center + pl_t + 30
-    add_dim_line(fig, [dim_x, bolt_y, z_top_bolt], [dim_x, bolt_y, z_pl_top], f"Lev={lev}", "blue")
+    dim_x = (Tw/2) + (pl_t/2) + pl_t + 30
+    add_dim_line(dims, [dim_x, leh_beam, z_top_bolt], [dim_x, leh_beam, z_top_bolt + lev], f"Lev={lev}", "blue")
     
     # Setback (Gap)
     dim_gap_x = -B/2 - 50
-    add_dim_line(fig, [dim_gap_x, -setback, 0], [dim_gap_x, 0, 0], f"Gap={setback}", "red")
+    add_dim_line(dims, [dim_gap_x, -setback, 0], [dim_gap_x, 0, 0], f"Gap={setback}", "red")
+    return tuple(dims.data)
+
+# ==========================================
+# 4. MAIN LOGIC
+# ==========================================
+def geometry_key(beam_dims, plate_dims, bolt_dims, config):
+    """Hashable key of every input that affects the drawn geometry"""
+    return (
+        beam_dims['H'], beam_dims['B'], beam_dims['Tw'], beam_dims['Tf'],
+        plate_dims['t'], plate_dims['w'], plate_dims['h'], plate_dims.get('weld_sz', 6),
+        bolt_dims['dia'], int(bolt_dims['n_rows']), bolt_dims['pitch'],
+        bolt_dims['lev'], bolt_dims['leh_beam'],
+        config['setback'], config['L_beam_show'],
+    )
+
+def _plate_levels(n_rows, pitch, lev, pl_h):
+    z_top_bolt = ((n_rows - 1) * pitch) / 2
+    z_pl_top = z_top_bolt + lev
+    z_pl_center = z_pl_top - (pl_h / 2)
+    return z_top_bolt, z_pl_center
+
+@lru_cache(maxsize=LAYER_CACHE_SIZE)
+def connection_meshes(key, lod=0):
+    """
+    Raw merged meshes of one connection (no support column), keyed by geometry_key.
+    Returns {group: (verts, faces, face_colors, vertex_labels)}.
+    lod: 0 = full detail, 1 = simplified bolts, 2 = beam and plate only
+    """
+    H, B, Tw, Tf, pl_t, pl_w, pl_h, weld_sz, d_b, n_rows, pitch, lev, leh_beam, setback, L_beam = key
+    z_top_bolt, z_pl_center = _plate_levels(n_rows, pitch, lev, pl_h)
+    
+    builder = MeshBuilder()
+    add_beam(builder, H, B, Tw, Tf, L_beam)
+    add_plate(builder, Tw, pl_t, pl_w, pl_h, setback, z_pl_center)
+    if lod < 2:
+        add_welds(builder, Tw, pl_t, pl_h, weld_sz, setback, z_pl_center)
+        add_bolts(builder, Tw, pl_t, d_b, n_rows, pitch, leh_beam, simplified=(lod == 1))
+    return {group: builder.arrays(group) for group in builder.groups}
+
+def create_connection_figure(beam_dims, plate_dims, bolt_dims, config):
+    """
+    3D model of a beam-to-support shear tab.
+    Built once per geometry_key (cached); each call returns its own copy.
+    """
+    return go.Figure(_cached_figure(geometry_key(beam_dims, plate_dims, bolt_dims, config)))
+
+@lru_cache(maxsize=32)
+def _cached_figure(key):
+    H, B, Tw, Tf, pl_t, pl_w, pl_h, weld_sz, d_b, n_rows, pitch, lev, leh_beam, setback, L_beam = key
+    z_top_bolt, z_pl_center = _plate_levels(n_rows, pitch, lev, pl_h)
+    
+    fig = go.Figure()
+    # One Mesh3d trace per material group
+    fig.add_traces(list(_support_layer(B, H, setback)))
+    fig.add_traces(list(_beam_layer(H, B, Tw, Tf, L_beam)))
+    fig.add_traces(list(_plate_layer(Tw, pl_t, pl_w, pl_h, setback, z_pl_center)))
+    fig.add_traces(list(_weld_layer(Tw, pl_t, pl_h, weld_sz, setback, z_pl_center)))
+    fig.add_traces(list(_bolt_layer(Tw, pl_t, d_b, n_rows, pitch, leh_beam)))
+    fig.add_traces(list(_dims_layer(B, Tw, pl_t, lev, leh_beam, setback, z_top_bolt)))
 
     fig.update_layout(
         scene=dict(
@@ -0,0 +1,91 @@
+import numpy as np
+from calculator import core_calculation_vec
+
+# ==============================================================================
+# 📈 CAPACITY ENVELOPE: SPAN-DEPENDENT, ADAPTIVELY SAMPLED
+# ==============================================================================
+# The envelope is evaluated with the vectorized core_calculation, so the moment
+# curve follows Mn(L) through the LTB zones instead of a single M_des.
+# Sampling starts from a coarse geometric grid plus the exact breakpoints
+# (Lp, Lr and every governing-mode change) and is refined only where linear
+# interpolation between points misses the curve by more than `tol`.
+
+CURVES = ('ws', 'wm', 'wd')
+MODE_NAMES = ("Shear", "Moment", "Deflection")
+
+def _find_transitions(x, mode, evaluate, iterations=40):
+    """Bisect every change of governing mode on the grid x down to machine precision"""
+    cuts = np.nonzero(np.diff(mode))[0]
+    if len(cuts) == 0:
+        return np.array([])
+    lo, hi = x[cuts].copy(), x[cuts + 1].copy()
+    m_lo = mode[cuts]
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        same = evaluate(mid)['mode'] == m_lo
+        lo = np.where(same, mid, lo)
+        hi = np.where(same, hi, mid)
+    return (lo + hi) / 2
+
+def adaptive_envelope(Fy, E_gpa, props, method, def_limit, x_min, x_max,
+                      n_start=48, tol=0.002, max_iter=10):
+    """
+    Capacity curves on an adaptive span grid.
+    Returns dict with 'x' and the arrays ws, wm, wd, w_gov, mode, zone,
+    plus 'breaks' (Lp, Lr) and 'transitions' (governing-mode changes).
+    """
+    def evaluate(L):
+        return core_calculation_vec(L, Fy, E_gpa, props, method, def_limit)
+
+    x = np.geomspace(x_min, x_max, n_start)
+    c0 = evaluate(x)
+    ltb = [float(c0['Lp']), float(c0['Lr'])]
+    transitions = _find_transitions(x, c0['mode'], evaluate)
+
+    # Exact breakpoints plus a tight pair around each kink
+    marks = np.array(ltb + list(transitions))
+    marks = marks[(marks > x_min) & (marks < x_max)]
+    eps = 1e-6 * (x_max - x_min)
+    x = np.unique(np.concatenate([x, marks, marks - eps, marks + eps]))
+
+    c = evaluate(x)
+    for _ in range(max_iter):
+        mid = np.sqrt(x[:-1] * x[1:])
+        cm = evaluate(mid)
+        # Linear interpolation error of every curve at the midpoints
+        t = (mid - x[:-1]) / (x[1:] - x[:-1])
+        err = np.zeros(len(mid))
+        for key in CURVES + ('w_gov',):
+            y = np.broadcast_to(c[key], x.shape)
+            y_lin = y[:-1] + t * (y[1:] - y[:-1])
+            y_mid = np.broadcast_to(cm[key], mid.shape)
+            err = np.maximum(err, np.abs(y_lin - y_mid) / np.maximum(np.abs(y_mid), 1e-9))
+        split = err > tol
+        if not split.any():
+            break
+        x = np.sort(np.concatenate([x, mid[split]]))
+        c = evaluate(x)
+
+    out = {key: np.broadcast_to(c[key], x.shape) for key in CURVES + ('w_gov', 'mode', 'zone')}
+    out['x'] = x
+    out['breaks'] = {'Lp': ltb[0], 'Lr': ltb[1]}
+    out['transitions'] = transitions
+    return out
+
+def mode_segments(x, mode):
+    """[(x_start, x_end, mode), ...] of contiguous governing-mode ranges"""
+    cuts = np.nonzero(np.diff(mode))[0]
+    starts = np.concatenate([[0], cuts + 1])
+    ends = np.concatenate([cuts, [len(x) - 1]])
+    return [(float(x[s]), float(x[e] if e + 1 >= len(x) else x[e + 1]), int(mode[s]))
+            for s, e in zip(starts, ends)]
+
+def batch_envelopes(Fy, E_gpa, sections, method, def_limit, x):
+    """
+    Governing envelopes of many sections in one broadcast pass.
+    sections: dict of property arrays (database.section_arrays), x: spans (m).
+    Returns (w_gov, mode), each shaped (n_sections, len(x)).
+    """
+    props = {k: np.asarray(v)[:, None] for k, v in sections.items()}
+    c = core_calculation_vec(np.asarray(x)[None, :], Fy, E_gpa, props, method, def_limit)
+    return c['w_gov'], c['mode']
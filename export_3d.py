@@ -0,0 +1,125 @@
+import json
+import struct
+import numpy as np
+
+# ==============================================================================
+# 📦 3D EXPORT: BINARY glTF (.glb) & STL
+# ==============================================================================
+# Input is the mesh dict produced by drawer_3d.connection_meshes or
+# assembly_3d.build_assembly_meshes: {group: (verts, faces, face_colors, labels)}
+# in mm, z-up. Buffers are written straight from NumPy arrays.
+
+STL_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('verts', '<f4', (3, 3)),
+    ('attr', '<u2'),
+])
+
+def _merge(meshes):
+    """All groups into one (verts, faces) pair"""
+    groups = list(meshes.values())
+    n_verts = sum(len(m[0]) for m in groups)
+    n_faces = sum(len(m[1]) for m in groups)
+    verts = np.empty((n_verts, 3))
+    faces = np.empty((n_faces, 3), dtype=np.int64)
+    v0 = f0 = 0
+    for m_verts, m_faces, *_ in groups:
+        verts[v0:v0 + len(m_verts)] = m_verts
+        faces[f0:f0 + len(m_faces)] = m_faces + v0
+        v0 += len(m_verts); f0 += len(m_faces)
+    return verts, faces
+
+def stl_bytes(meshes, header=b"SYS Structural connection export (mm)"):
+    """Binary STL of every group (STL carries no color)"""
+    verts, faces = _merge(meshes)
+    tri = verts[faces]                                   # (n, 3, 3)
+    normal = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    length = np.linalg.norm(normal, axis=1, keepdims=True)
+    normal = np.divide(normal, length, out=np.zeros_like(normal), where=length > 0)
+
+    records = np.zeros(len(faces), dtype=STL_DTYPE)
+    records['normal'] = normal
+    records['verts'] = tri
+    return header[:80].ljust(80, b'\0') + struct.pack('<I', len(faces)) + records.tobytes()
+
+def _linear_rgb(hex_color):
+    """'#rrggbb' (sRGB) -> linear RGB for glTF baseColorFactor"""
+    c = np.array([int(hex_color[i:i + 2], 16) for i in (1, 3, 5)]) / 255.0
+    c = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    return [float(x) for x in c]
+
+def glb_bytes(meshes, opacity=None):
+    """
+    Binary glTF 2.0: one mesh, one primitive per (group, color) sharing the group's
+    vertex buffer. The root node converts mm/z-up to the glTF m/y-up convention.
+    """
+    opacity = opacity or {}
+    chunks, views, accessors, materials, primitives = [], [], [], [], []
+    offset = 0
+
+    def add_view(data, target):
+        nonlocal offset
+        raw = data.tobytes()
+        views.append({"buffer": 0, "byteOffset": offset, "byteLength": len(raw), "target": target})
+        chunks.append(raw)
+        offset += len(raw)  # float32 / uint32 keep 4-byte alignment
+        return len(views) - 1
+
+    for group, (verts, faces, colors, _labels) in meshes.items():
+        pos = np.ascontiguousarray(verts, dtype='<f4')
+        accessors.append({
+            "bufferView": add_view(pos, 34962), "componentType": 5126, "count": len(pos),
+            "type": "VEC3", "min": pos.min(axis=0).tolist(), "max": pos.max(axis=0).tolist(),
+        })
+        pos_acc = len(accessors) - 1
+
+        uniq, code = np.unique(np.asarray(colors, dtype='U9'), return_inverse=True)
+        for c_i, color in enumerate(uniq):
+            idx = np.ascontiguousarray(faces[code == c_i], dtype='<u4').ravel()
+            accessors.append({
+                "bufferView": add_view(idx, 34963), "componentType": 5125,
+                "count": len(idx), "type": "SCALAR",
+            })
+            alpha = opacity.get(group, 1.0)
+            material = {
+                "name": f"{group} {color}",
+                "pbrMetallicRoughness": {"baseColorFactor": _linear_rgb(color) + [alpha],
+                                         "metallicFactor": 0.3, "roughnessFactor": 0.6},
+                "doubleSided": True,
+            }
+            if alpha < 1.0: material["alphaMode"] = "BLEND"
+            materials.append(material)
+            primitives.append({"attributes": {"POSITION": pos_acc},
+                               "indices": len(accessors) - 1, "material": len(materials) - 1})
+
+    gltf = {
+        "asset": {"version": "2.0", "generator": "SYS Structural export_3d"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0, "rotation": [-0.7071068, 0.0, 0.0, 0.7071068], "scale": [0.001, 0.001, 0.001]}],
+        "meshes": [{"name": "Connection", "primitives": primitives}],
+        "materials": materials,
+        "accessors": accessors,
+        "bufferViews": views,
+        "buffers": [{"byteLength": offset}],
+    }
+
+    json_chunk = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+    json_chunk += b' ' * (-len(json_chunk) % 4)
+    bin_chunk = b''.join(chunks)
+    bin_chunk += b'\0' * (-len(bin_chunk) % 4)
+
+    total = 12 + 8 + len(json_chunk) + 8 + len(bin_chunk)
+    return b''.join([
+        struct.pack('<4sII', b'glTF', 2, total),
+        struct.pack('<I4s', len(json_chunk), b'JSON'), json_chunk,
+        struct.pack('<I4s', len(bin_chunk), b'BIN\0'), bin_chunk,
+    ])
+
+def write_stl(path, meshes):
+    with open(path, 'wb') as f:
+        f.write(stl_bytes(meshes))
+
+def write_glb(path, meshes, opacity=None):
+    with open(path, 'wb') as f:
+        f.write(glb_bytes(meshes, opacity))
@@ -0,0 +1,165 @@
+import io
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from database import SYS_H_BEAMS, section_arrays, sorted_sections
+from calculator import core_calculation_vec
+from envelope import MODE_NAMES
+
+# ==============================================================================
+# 📦 BULK CATALOG EXPORT: PARQUET / ARROW IPC / XLSX
+# ==============================================================================
+# Rows = section × span × method × deflection limit.
+# Results are produced in Arrow record batches (one batch per method, limit and
+# chunk of sections) and streamed to the writer, so the full table is never held
+# in memory. Every batch shares one schema with fixed dictionaries (section,
+# method, mode), which keeps the Arrow IPC file valid for memory mapping.
+
+METHODS = ("ASD", "LRFD")
+DEF_LIMITS = (360, 240, 180)
+DEFAULT_SPANS = np.round(np.arange(1.0, 30.0 + 1e-9, 0.1), 2)
+CHUNK_SECTIONS = 64
+XLSX_MAX_ROWS = 1_048_575  # excluding the header row
+
+FLOAT_COLUMNS = ["span_m", "W", "ws", "wm", "wd", "w_gov", "w_net", "Lp", "Lr", "L_vm", "L_md"]
+
+def catalog_schema(Fy, E_gpa):
+    """Column types of the export (criteria stored as schema metadata)"""
+    fields = [
+        pa.field("section", pa.dictionary(pa.int32(), pa.string())),
+        pa.field("method", pa.dictionary(pa.int8(), pa.string())),
+        pa.field("def_limit", pa.int16()),
+    ]
+    fields += [pa.field(name, pa.float64()) for name in FLOAT_COLUMNS[:7]]
+    fields += [
+        pa.field("mode", pa.dictionary(pa.int8(), pa.string())),
+        pa.field("zone", pa.int8()),
+    ]
+    fields += [pa.field(name, pa.float64()) for name in FLOAT_COLUMNS[7:]]
+    meta = {"Fy_ksc": str(Fy), "E_gpa": str(E_gpa),
+            "units": "span/L in m, loads in kg/m, W = beam self-weight"}
+    return pa.schema(fields, metadata=meta)
+
+def iter_batches(Fy, E_gpa, spans=DEFAULT_SPANS, methods=METHODS, def_limits=DEF_LIMITS,
+                 sections=None, catalog=SYS_H_BEAMS, chunk_sections=CHUNK_SECTIONS):
+    """Yield pyarrow RecordBatches of the export, one per (method, limit, section chunk)"""
+    sections = list(sections) if sections is not None else sorted_sections(catalog)
+    spans = np.asarray(spans, dtype=float)
+    schema = catalog_schema(Fy, E_gpa)
+    m = len(spans)
+
+    # Fixed dictionaries: identical in every batch
+    section_dict = pa.array(sections, pa.string())
+    method_dict = pa.array(list(methods), pa.string())
+    mode_dict = pa.array(list(MODE_NAMES), pa.string())
+
+    for i_method, method in enumerate(methods):
+        for def_limit in def_limits:
+            for start in range(0, len(sections), chunk_sections):
+                names = sections[start:start + chunk_sections]
+                k = len(names)
+                arr = section_arrays(names, catalog)
+                props = {key: v[:, None] for key, v in arr.items()}
+                c = core_calculation_vec(spans[None, :], Fy, E_gpa, props, method, def_limit)
+
+                def flat(v):
+                    return np.broadcast_to(v, (k, m)).ravel()
+
+                w_gov = flat(c['w_gov'])
+                W = flat(props['W'])
+                columns = [
+                    pa.DictionaryArray.from_arrays(
+                        pa.array(np.repeat(np.arange(start, start + k, dtype=np.int32), m)), section_dict),
+                    pa.DictionaryArray.from_arrays(
+                        pa.array(np.full(k * m, i_method, dtype=np.int8)), method_dict),
+                    pa.array(np.full(k * m, def_limit, dtype=np.int16)),
+                    pa.array(np.tile(spans, k)),
+                    pa.array(W),
+                    pa.array(flat(c['ws'])),
+                    pa.array(flat(c['wm'])),
+                    pa.array(flat(c['wd'])),
+                    pa.array(w_gov),
+                    pa.array(np.maximum(0, w_gov - W)),
+                    pa.DictionaryArray.from_arrays(
+                        pa.array(flat(c['mode']).astype(np.int8)), mode_dict),
+                    pa.array(flat(c['zone']).astype(np.int8)),
+                    pa.array(flat(c['Lp'])),
+                    pa.array(flat(c['Lr'])),
+                    pa.array(flat(c['L_vm'])),
+                    pa.array(flat(c['L_md'])),
+                ]
+                yield pa.RecordBatch.from_arrays(columns, schema=schema)
+
+# --- Writers (sink = file path or writable stream) ---
+def write_parquet(sink, batches, schema, compression="zstd"):
+    with pq.ParquetWriter(sink, schema, compression=compression) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+def write_arrow(sink, batches, schema):
+    """Arrow IPC file format (uncompressed, so readers can memory-map it)"""
+    with ipc.new_file(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+
+def write_xlsx(sink, batches, schema):
+    """Streaming XLSX (openpyxl write-only); rolls over to a new sheet past Excel's row limit"""
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    header = schema.names
+    ws, n_rows, n_sheets = None, XLSX_MAX_ROWS, 0
+    for batch in batches:
+        # Column-wise conversion to native Python values (dictionaries decoded to str)
+        cols = [col.to_pylist() for col in batch.columns]
+        for row in zip(*cols):
+            if n_rows >= XLSX_MAX_ROWS:
+                n_sheets += 1
+                ws = wb.create_sheet(f"Catalog_{n_sheets}" if n_sheets > 1 else "Catalog")
+                ws.append(header)
+                n_rows = 0
+            ws.append(row)
+            n_rows += 1
+    if ws is None:
+        wb.create_sheet("Catalog").append(header)
+    wb.save(sink)
+
+FORMATS = {
+    "Parquet": (write_parquet, ".parquet", "application/vnd.apache.parquet"),
+    "Arrow IPC": (write_arrow, ".arrow", "application/vnd.apache.arrow.file"),
+    "XLSX": (write_xlsx, ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+def export_catalog(sink, fmt, Fy, E_gpa, **kwargs):
+    """Stream the full export to `sink` in one of FORMATS"""
+    writer = FORMATS[fmt][0]
+    writer(sink, iter_batches(Fy, E_gpa, **kwargs), catalog_schema(Fy, E_gpa))
+
+def export_bytes(fmt, Fy, E_gpa, **kwargs):
+    """Export into memory (for download buttons)"""
+    if fmt == "XLSX":
+        buf = io.BytesIO()
+        export_catalog(buf, fmt, Fy, E_gpa, **kwargs)
+        return buf.getvalue()
+    sink = pa.BufferOutputStream()
+    export_catalog(sink, fmt, Fy, E_gpa, **kwargs)
+    return sink.getvalue().to_pybytes()
+
+def open_arrow(path):
+    """Zero-copy read of an exported Arrow IPC file (memory-mapped)"""
+    return ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    parser = argparse.ArgumentParser(description="Export the full capacity catalog")
+    parser.add_argument("output", help="output file (.parquet, .arrow or .xlsx)")
+    parser.add_argument("--fy", type=float, default=2400, help="Fy [ksc]")
+    parser.add_argument("--e", type=float, default=200, help="E [GPa]")
+    parser.add_argument("--step", type=float, default=0.1, help="span step [m]")
+    args = parser.parse_args()
+
+    ext = os.path.splitext(args.output)[1].lower()
+    fmt = next(name for name, (_, e, _) in FORMATS.items() if e == ext)
+    spans = np.round(np.arange(1.0, 30.0 + 1e-9, args.step), 2)
+    export_catalog(args.output, fmt, args.fy, args.e, spans=spans)
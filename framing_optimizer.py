@@ -0,0 +1,245 @@
+import numpy as np
+from database import SYS_H_BEAMS, section_arrays, sorted_sections
+from calculator import core_calculation_vec
+from envelope import MODE_NAMES
+from load_combos import COMPONENTS, SERVICE, combo_check, combo_matrix
+
+# ==============================================================================
+# 🏢 FLOOR-FRAMING OPTIMIZER (lightest sections for a whole beam layout)
+# ==============================================================================
+# A layout is a list of beam lines: span, tributary width, area load and how many
+# identical beams share them. Every beam is checked against every catalog section
+# in ONE core_calculation_vec call (beams (n, 1) × sections (1, m)); the feasible
+# matrix then drives the choice:
+#   1. free choice   - each beam takes its lightest passing section
+#   2. grouping      - at most N distinct sizes: greedy removal of the size whose
+#                      loss costs least, then 1-for-1 swaps until no swap saves weight
+# Loads are in kg/m² / kg/m on the basis of the design method (service loads for
+# ASD, factored for LRFD); the section self-weight is added to the line load, as
+# in the Design Space tab.
+# With combos=True the beams carry component area loads q_D, q_L, q_Lr, ... instead
+# (w_line = superimposed dead line load) and load_combos picks the governing
+# ASCE 7 combination per beam × section.
+
+COMBO_FIELDS = tuple(f"q_{k}" for k in COMPONENTS)
+BEAM_FIELDS = ("mark", "L_m", "trib_m", "q", "w_line", "count", "def_limit", "D_max")
+DEFAULTS = {"trib_m": 0.0, "q": 0.0, "w_line": 0.0, "count": 1, "def_limit": None, "D_max": None,
+            **{f: 0.0 for f in COMBO_FIELDS}}
+MAX_SWAP_ROUNDS = 20
+
+def grid_layout(bays_x, bays_y, spacing, q, w_line=0.0, def_limit=None, **area_loads):
+    """
+    Infill beams of a rectangular grid: in each bay (Lx, Ly) beams span Ly at about
+    `spacing` m across Lx; the beam on a grid line takes half of each adjacent spacing.
+    Beams with equal span and width are merged into one line with a count.
+    area_loads: component loads for combos, e.g. q_D=300, q_L=250 [kg/m²].
+    """
+    s = [Lx / max(1, int(round(Lx / spacing))) for Lx in bays_x]
+    tribs = []   # (width, beams per span) across x
+    for i, Lx in enumerate(bays_x):
+        tribs.append((s[i], int(round(Lx / s[i])) - 1))
+    for k in range(len(bays_x) + 1):
+        tribs.append(((s[k - 1] if k > 0 else 0) / 2 + (s[k] if k < len(s) else 0) / 2, 1))
+
+    lines = {}
+    for Ly in bays_y:
+        for trib, count in tribs:
+            if count <= 0:
+                continue
+            key = (round(float(Ly), 3), round(float(trib), 3))
+            if key not in lines:
+                lines[key] = {"mark": f"B{len(lines) + 1}", "L_m": key[0], "trib_m": key[1],
+                              "q": q, "w_line": w_line, "count": 0, "def_limit": def_limit, **area_loads}
+            lines[key]["count"] += count
+    return list(lines.values())
+
+def layout_columns(beams, def_limit=360):
+    """Beam list -> NumPy columns (blank optional fields take DEFAULTS)"""
+    def col(key, default=None):
+        vals = [b.get(key) for b in beams]
+        d = DEFAULTS.get(key) if default is None else default
+        return np.array([d if v is None or v != v else v for v in vals], dtype=float)
+    missing = [i for i, b in enumerate(beams) if not b.get("L_m") or b.get("L_m") <= 0]
+    if missing:
+        raise ValueError(f"Beams {missing} need a span L_m > 0")
+    return {
+        "mark": [str(b.get("mark") or f"B{i + 1}") for i, b in enumerate(beams)],
+        "L_m": col("L_m"), "trib_m": col("trib_m"), "q": col("q"), "w_line": col("w_line"),
+        "count": col("count"), "def_limit": col("def_limit", def_limit),
+        "D_max": col("D_max", np.inf), **{f: col(f) for f in COMBO_FIELDS},
+    }
+
+def evaluate_layout(beams, Fy, E_gpa, method, def_limit=360, catalog=SYS_H_BEAMS,
+                    sections=None, D_min=0.0, D_max=np.inf, combos=False):
+    """
+    Beams × sections check matrices.
+    Returns {'names', 'weight' (kg/m per section), 'w' (line load incl. self-weight;
+    governing combination with combos), 'util', 'mode', 'zone', 'ok', 'combo'
+    ((n, m) arrays; combo = combination name or None), 'cost' (kg of steel per
+    beam line and section)}.
+    """
+    cols = layout_columns(beams, def_limit)
+    names = list(sections) if sections is not None else sorted_sections(catalog)
+    arr = section_arrays(names, catalog)
+    props = {k: v[None, :] for k, v in arr.items()}
+
+    L = cols["L_m"][:, None]
+    c = core_calculation_vec(L, Fy, E_gpa, props, method, cols["def_limit"][:, None])
+    if combos:
+        loads = np.stack([cols[f] for f in COMBO_FIELDS], axis=1) * cols["trib_m"][:, None]
+        loads[:, COMPONENTS.index("D")] += cols["w_line"]
+        r = combo_check(c, loads, props["W"], method)
+        util, mode, w = r["util"], r["mode"], r["w"]
+        # Deflection governs -> the service combination, otherwise the strength one
+        names_s, names_d = np.array(combo_matrix(method)[0]), np.array(combo_matrix(SERVICE)[0])
+        combo = np.where(mode == 2, names_d[r["combo_service"]], names_s[r["combo_strength"]])
+    else:
+        w = cols["q"] * cols["trib_m"] + cols["w_line"]        # superimposed line load, kg/m
+        util = (w[:, None] + props["W"]) / c["w_gov"]
+        w, mode, combo = w[:, None] + props["W"], c["mode"], None
+    depth_ok = ((arr["D"] >= D_min) & (arr["D"] <= D_max))[None, :] & (arr["D"][None, :] <= cols["D_max"][:, None])
+    ok = (util <= 1.0) & depth_ok
+    shape = util.shape
+    return {
+        "cols": cols, "names": names, "weight": arr["W"], "depth": arr["D"], "w": np.broadcast_to(w, shape),
+        "combo": combo, "util": util, "ok": ok, "mode": np.broadcast_to(mode, shape),
+        "zone": np.broadcast_to(c["zone"], shape),
+        "cost": cols["count"][:, None] * L * props["W"],
+    }
+
+def _set_cost(masked, chosen):
+    """Total weight when each beam takes its lightest passing section of `chosen`"""
+    return masked[:, chosen].min(axis=1).sum()
+
+def group_sections(masked, max_sizes):
+    """
+    Pick at most `max_sizes` columns of `masked` (cost, inf = fails) covering every row.
+    Greedy removal from the free-choice set, then improving 1-for-1 swaps.
+    Returns the chosen column indices, or None if no such set exists.
+    """
+    best_free = np.argmin(masked, axis=1)
+    chosen = sorted(set(best_free.tolist()))
+    cost = _set_cost(masked, chosen)
+    if not np.isfinite(cost):
+        return None
+
+    def replace(rest):
+        """Best single size added to `rest` -> (cost, column)"""
+        base = masked[:, rest].min(axis=1) if rest else np.full(masked.shape[0], np.inf)
+        trial = np.minimum(base[:, None], masked).sum(axis=0)
+        trial[rest] = np.inf
+        j = int(np.argmin(trial))
+        return trial[j], j
+
+    # 1. Greedy removal: drop the size whose loss adds the least weight
+    while len(chosen) > max_sizes:
+        trials = [(_set_cost(masked, [k for k in chosen if k != drop]), drop) for drop in chosen]
+        cost, drop = min(trials)
+        if np.isfinite(cost):
+            chosen.remove(drop)
+            continue
+        # Every size is needed by some beam: merge two sizes into one stronger size
+        merges = []
+        for a in range(len(chosen)):
+            for b in range(a + 1, len(chosen)):
+                rest = [k for i, k in enumerate(chosen) if i not in (a, b)]
+                merges.append((*replace(rest), rest))
+        cost, j, rest = min(merges, key=lambda t: t[0])
+        if not np.isfinite(cost):
+            return None
+        chosen = rest + [j]
+
+    # 2. Swap improvement (a size outside the set may cover two groups better)
+    for _ in range(MAX_SWAP_ROUNDS):
+        improved = False
+        for out in list(chosen):
+            rest = [k for k in chosen if k != out]
+            trial, j = replace(rest)   # every candidate replacing `out`, all at once
+            if trial < cost - 1e-9:
+                chosen = rest + [j]
+                cost = trial
+                improved = True
+        if not improved:
+            break
+    return sorted(chosen)
+
+def optimize_layout(beams, Fy, E_gpa, method, def_limit=360, max_sizes=None, catalog=SYS_H_BEAMS,
+                    sections=None, D_min=0.0, D_max=np.inf, combos=False):
+    """
+    Lightest section per beam line (optionally limited to `max_sizes` distinct sizes).
+    combos=True: component loads q_D, q_L, ... with ASCE 7 combinations (see load_combos).
+    Returns {'rows': per-beam dicts, 'sizes': sections used, 'total_kg', 'free_kg'
+    (unlimited sizes), 'modes': {mode: count of beams}, 'failed': marks with no section}.
+    """
+    ev = evaluate_layout(beams, Fy, E_gpa, method, def_limit, catalog, sections, D_min, D_max, combos)
+    cols, names = ev["cols"], ev["names"]
+    masked = np.where(ev["ok"], ev["cost"], np.inf)
+    # Ties in weight (equal cost): prefer the shallower section
+    masked = masked + ev["depth"][None, :] * 1e-9
+
+    feasible = np.isfinite(masked).any(axis=1)
+    free = np.argmin(masked, axis=1)
+    choice = free.copy()
+    if max_sizes and feasible.any():
+        chosen = group_sections(masked[feasible], int(max_sizes))
+        if chosen is None:
+            raise ValueError(f"No set of {max_sizes} sizes passes every beam")
+        choice[feasible] = np.array(chosen)[np.argmin(masked[feasible][:, chosen], axis=1)]
+
+    n = len(cols["mark"])
+    idx = np.arange(n)
+    rows = []
+    for i in range(n):
+        j = choice[i]
+        rows.append({
+            "Mark": cols["mark"][i], "Count": int(cols["count"][i]), "Span (m)": float(cols["L_m"][i]),
+            "Trib. (m)": float(cols["trib_m"][i]),
+            "Load (kg/m)": float(ev["w"][i, j]) if feasible[i] else np.nan,
+            "L/": int(cols["def_limit"][i]),
+            "Section": names[j] if feasible[i] else "❌ None passes",
+            "Lightest": names[free[i]] if feasible[i] else "",
+            "W (kg/m)": float(ev["weight"][j]) if feasible[i] else np.nan,
+            "Util.": float(ev["util"][i, j]) if feasible[i] else np.nan,
+            "Governs": MODE_NAMES[ev["mode"][i, j]] if feasible[i] else "",
+            "Zone": int(ev["zone"][i, j]) if feasible[i] else 0,
+            "Weight (kg)": float(ev["cost"][i, j]) if feasible[i] else np.nan,
+        })
+        if combos:
+            rows[-1]["Combination"] = str(ev["combo"][i, j]) if feasible[i] else ""
+
+    used = feasible
+    total = float(ev["cost"][idx[used], choice[used]].sum())
+    free_total = float(ev["cost"][idx[used], free[used]].sum())
+    modes = {name: int(cols["count"][used][ev["mode"][idx[used], choice[used]] == k].sum())
+             for k, name in enumerate(MODE_NAMES)}
+    return {
+        "rows": rows,
+        "sizes": sorted({names[j] for j in choice[used]}, key=names.index),
+        "total_kg": total, "free_kg": free_total, "modes": modes,
+        "failed": [cols["mark"][i] for i in np.nonzero(~feasible)[0]],
+        "n_beams": int(cols["count"].sum()),
+    }
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Size the infill beams of a rectangular grid")
+    parser.add_argument("--bays-x", type=float, nargs="+", default=[8.0, 8.0, 8.0], help="bay widths [m]")
+    parser.add_argument("--bays-y", type=float, nargs="+", default=[6.0, 9.0, 6.0], help="beam spans [m]")
+    parser.add_argument("--spacing", type=float, default=2.5, help="beam spacing [m]")
+    parser.add_argument("--q", type=float, default=500, help="area load [kg/m2]")
+    parser.add_argument("--sizes", type=int, default=None, help="max distinct sizes")
+    parser.add_argument("--method", default="ASD", choices=["ASD", "LRFD"])
+    parser.add_argument("--fy", type=float, default=2400)
+    parser.add_argument("--e", type=float, default=200)
+    parser.add_argument("--limit", type=int, default=360)
+    parser.add_argument("--d-max", type=float, default=np.inf, help="max depth [mm]")
+    args = parser.parse_args()
+
+    beams = grid_layout(args.bays_x, args.bays_y, args.spacing, args.q)
+    res = optimize_layout(beams, args.fy, args.e, args.method, args.limit, args.sizes, D_max=args.d_max)
+    print(f"{'Mark':<6}{'n':>4}{'L':>7}{'trib':>7}{'w':>8}  {'Section':<22}{'Util':>6}  Governs")
+    for r in res["rows"]:
+        print(f"{r['Mark']:<6}{r['Count']:>4}{r['Span (m)']:>7.2f}{r['Trib. (m)']:>7.2f}{r['Load (kg/m)']:>8.0f}  "
+              f"{r['Section']:<22}{r['Util.']:>6.2f}  {r['Governs']}")
+    print(f"\n{res['n_beams']} beams, sizes: {', '.join(res['sizes'])}")
+    print(f"Total {res['total_kg'] / 1000:.2f} t (free choice {res['free_kg'] / 1000:.2f} t) | modes {res['modes']}")
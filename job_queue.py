@@ -0,0 +1,403 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+# ==============================================================================
+# ⏳ BACKGROUND JOB QUEUE (process pool + SQLite job table)
+# ==============================================================================
+# Long runs (whole-catalog typical-detail solve, bulk export) are submitted here
+# instead of running inside the Streamlit script. A worker process executes the
+# job and writes progress / partial results into the SQLite table, so any session
+# (or another server process) that knows the job ID can poll it, and a rerun or a
+# closed browser tab no longer kills the run.
+#
+# Jobs are keyed by a hash of (kind, parameters, catalog content): submitting the
+# same work again returns the running job, or the finished one with its stored
+# artifact, so one user's completed run is reused by everyone else.
+#
+#   job_id = submit("typical", {"method": "ASD", "Fy": 2400, ...})
+#   job = get_job(job_id)   # status, progress 0-1, message, partial, result
+
+JOB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "jobs")
+DB_NAME = "jobs.sqlite"
+JOB_VERSION = 1            # bump when a job function's output changes (old results are not reused)
+JOB_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+REPORT_INTERVAL = 0.5      # s between progress writes from a worker
+KEEP_DAYS = 30             # purge(): finished jobs / artifacts older than this
+
+STATUSES = ("queued", "running", "done", "failed", "cancelled")
+ACTIVE = ("queued", "running")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    params_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    partial TEXT,
+    result TEXT,
+    artifact TEXT,
+    error TEXT,
+    owner_pid INTEGER,
+    worker_pid INTEGER,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_hash ON jobs (params_hash, status);
+CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created);
+"""
+
+class JobCancelled(Exception):
+    """Raised inside a worker by JobContext.report once the job was cancelled"""
+
+# ==========================================
+# 🗄️ SQLITE TABLE
+# ==========================================
+def _db_path(job_dir=JOB_DIR):
+    return os.path.join(job_dir, DB_NAME)
+
+def _connect(job_dir=JOB_DIR):
+    os.makedirs(os.path.join(job_dir, "artifacts"), exist_ok=True)
+    conn = sqlite3.connect(_db_path(job_dir), timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")   # readers (pollers) never block the writing worker
+    conn.executescript(_SCHEMA)
+    return conn
+
+def _update(job_id, job_dir=JOB_DIR, only_from=None, **fields):
+    """Set `fields`; with `only_from` (statuses) only while the job is in one of them. Returns rows changed."""
+    cols = ", ".join(f"{k} = ?" for k in fields)
+    where = "id = ?"
+    args = [*fields.values(), job_id]
+    if only_from:
+        where += f" AND status IN ({', '.join('?' * len(only_from))})"
+        args += list(only_from)
+    conn = _connect(job_dir)
+    try:
+        return conn.execute(f"UPDATE jobs SET {cols} WHERE {where}", args).rowcount
+    finally:
+        conn.close()
+
+def _row_to_job(row):
+    job = dict(row)
+    for k in ("params", "partial", "result"):
+        job[k] = json.loads(job[k]) if job[k] else None
+    return job
+
+def _pid_alive(pid):
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+# ==========================================
+# 🛠️ WORKER SIDE
+# ==========================================
+class JobContext:
+    """Handed to the job function: progress reporting + artifact file for this job"""
+    def __init__(self, job_id, params_hash, job_dir=JOB_DIR):
+        self.job_id = job_id
+        self.params_hash = params_hash
+        self.job_dir = job_dir
+        self.artifact = None
+        self._last = 0.0
+
+    def report(self, progress, message="", partial=None, force=False):
+        """
+        Store progress (0-1), a status line and optional JSON-able partial results.
+        Throttled to REPORT_INTERVAL; raises JobCancelled when a poller cancelled the job.
+        """
+        now = time.time()
+        if not force and now - self._last < REPORT_INTERVAL:
+            return
+        self._last = now
+        fields = {"progress": float(progress), "message": message}
+        if partial is not None:
+            fields["partial"] = json.dumps(partial)
+        conn = _connect(self.job_dir)
+        try:
+            status = conn.execute("SELECT status FROM jobs WHERE id = ?", (self.job_id,)).fetchone()
+            if status is None or status["status"] == "cancelled":
+                raise JobCancelled(self.job_id)
+            cols = ", ".join(f"{k} = ?" for k in fields)
+            conn.execute(f"UPDATE jobs SET {cols} WHERE id = ?", (*fields.values(), self.job_id))
+        finally:
+            conn.close()
+
+    def artifact_path(self, ext):
+        """Temporary path to write the artifact to (renamed into place when the job succeeds)"""
+        self.artifact = os.path.join(self.job_dir, "artifacts", f"{self.params_hash}{ext}")
+        return self.artifact + ".tmp"
+
+def _run_job(job_id, kind, params, params_hash, job_dir=JOB_DIR):
+    """Worker process entry point: run JOB_KINDS[kind] and record the outcome"""
+    ctx = JobContext(job_id, params_hash, job_dir)
+    conn = _connect(job_dir)
+    try:
+        cur = conn.execute("UPDATE jobs SET status = 'running', started = ?, worker_pid = ? "
+                           "WHERE id = ? AND status = 'queued'", (time.time(), os.getpid(), job_id))
+    finally:
+        conn.close()
+    if cur.rowcount == 0:
+        return   # cancelled while waiting for a worker
+    try:
+        ctx.report(0.0, "Started", force=True)
+        result = JOB_KINDS[kind][0](params, ctx)
+        if ctx.artifact:
+            os.replace(ctx.artifact + ".tmp", ctx.artifact)
+        # terminal updates only from 'running': a cancel after the last report must stick
+        if not _update(job_id, job_dir, ("running",), status="done", progress=1.0, message="Done",
+                       finished=time.time(), result=json.dumps(result), artifact=ctx.artifact):
+            if ctx.artifact and os.path.exists(ctx.artifact):
+                os.remove(ctx.artifact)
+    except JobCancelled:
+        _update(job_id, job_dir, ("running",), status="cancelled", finished=time.time())
+    except Exception as e:
+        _update(job_id, job_dir, ("running",), status="failed", finished=time.time(), message=str(e),
+                error="".join(traceback.format_exception(type(e), e, e.__traceback__))[-4000:])
+    finally:
+        if ctx.artifact and os.path.exists(ctx.artifact + ".tmp"):
+            os.remove(ctx.artifact + ".tmp")
+
+# ==========================================
+# 🧾 JOB KINDS: fn(params, ctx) -> JSON-able result
+# ==========================================
+def typical_job(params, ctx):
+    """Whole-catalog typical detail solve (tab 7); partial = rows solved so far"""
+    from catalog import get_catalog
+    from connection_solver import solve_typical
+    catalog = get_catalog(params.get("catalog", "builtin"))
+    rows = []
+    def progress(i, total, row):
+        rows.append(row)
+        ctx.report((i + 1) / total, f"Solving: {row['Section']}...", partial=rows)
+    solve_typical(params["method"], params["Fy"], params["E_gpa"], params["def_val"], catalog,
+                  params.get("bolt_group", "Concentric"), progress=progress)
+    return rows
+
+def export_job(params, ctx):
+    """Bulk catalog export (tab 4) written straight to the artifact file"""
+    import numpy as np
+    from catalog import get_catalog
+    from export_catalog import FORMATS, CHUNK_SECTIONS, catalog_schema, iter_batches
+    catalog = get_catalog(params.get("catalog", "builtin"))
+    writer, ext, _ = FORMATS[params["fmt"]]
+    methods, limits = tuple(params["methods"]), tuple(params["def_limits"])
+    total = len(methods) * len(limits) * -(-len(catalog) // CHUNK_SECTIONS)
+    n_rows = 0
+    def batches():
+        nonlocal n_rows
+        it = iter_batches(params["Fy"], params["E_gpa"], spans=np.asarray(params["spans"]),
+                          methods=methods, def_limits=limits, catalog=catalog)
+        for i, batch in enumerate(it):
+            n_rows += batch.num_rows
+            ctx.report((i + 1) / total, f"{n_rows:,} rows written")
+            yield batch
+    writer(ctx.artifact_path(ext), batches(), catalog_schema(params["Fy"], params["E_gpa"]))
+    return {"rows": n_rows, "format": params["fmt"], "ext": ext}
+
+# kind -> (function, label)
+JOB_KINDS = {
+    "typical": (typical_job, "Typical Detail Solve"),
+    "export": (export_job, "Bulk Catalog Export"),
+}
+
+# ==========================================
+# 📮 SUBMIT / POLL
+# ==========================================
+_EXECUTOR = None
+_LOCK = threading.Lock()
+
+def _executor(job_dir=JOB_DIR):
+    """Process pool of this server process (created on first submit)"""
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is None:
+            recover(job_dir)
+            _EXECUTOR = ProcessPoolExecutor(max_workers=JOB_WORKERS)
+        return _EXECUTOR
+
+def _catalog_token(key):
+    """Content identity of a catalog (imported keys already hash their content)"""
+    if key != "builtin":
+        return key
+    from database import SYS_H_BEAMS
+    return hashlib.sha1(json.dumps(SYS_H_BEAMS, sort_keys=True, default=float).encode()).hexdigest()
+
+def params_hash(kind, params):
+    blob = {"kind": kind, "params": params, "version": JOB_VERSION,
+            "catalog": _catalog_token(params.get("catalog", "builtin"))}
+    return hashlib.sha1(json.dumps(blob, sort_keys=True).encode()).hexdigest()
+
+def _on_done(job_id, job_dir):
+    def callback(fut):
+        # Pool-level failures (worker killed, pickling error) never reach _run_job's handler
+        exc = fut.exception()
+        if exc is not None:
+            _update(job_id, job_dir, ACTIVE, status="failed", finished=time.time(),
+                    message=f"Worker error: {exc!r}", error=repr(exc))
+    return callback
+
+def submit(kind, params, reuse=True, job_dir=JOB_DIR):
+    """
+    Queue a job; returns its ID. With `reuse`, an identical job that is still active,
+    or finished with its artifact on disk, is returned instead of running again.
+    """
+    if kind not in JOB_KINDS:
+        raise KeyError(f"Unknown job kind '{kind}' (choose from {', '.join(JOB_KINDS)})")
+    params = json.loads(json.dumps(params))   # plain JSON types only (what the worker will see)
+    h = params_hash(kind, params)
+    conn = _connect(job_dir)
+    try:
+        if reuse:
+            rows = conn.execute("SELECT * FROM jobs WHERE params_hash = ? AND status IN ('queued', 'running', 'done') "
+                                "ORDER BY created DESC", (h,)).fetchall()
+            for row in rows:
+                if row["status"] == "done" and row["artifact"] and not os.path.exists(row["artifact"]):
+                    continue
+                if row["status"] in ACTIVE and not _pid_alive(row["owner_pid"]):
+                    continue
+                return row["id"]
+        job_id = uuid.uuid4().hex[:12]
+        conn.execute("INSERT INTO jobs (id, kind, params, params_hash, status, message, owner_pid, created) "
+                     "VALUES (?, ?, ?, ?, 'queued', 'Waiting for a worker', ?, ?)",
+                     (job_id, kind, json.dumps(params), h, os.getpid(), time.time()))
+    finally:
+        conn.close()
+    fut = _executor(job_dir).submit(_run_job, job_id, kind, params, h, job_dir)
+    fut.add_done_callback(_on_done(job_id, job_dir))
+    return job_id
+
+def get_job(job_id, job_dir=JOB_DIR):
+    """Job dict (params / partial / result decoded) or None"""
+    conn = _connect(job_dir)
+    try:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    finally:
+        conn.close()
+    return _row_to_job(row) if row else None
+
+def list_jobs(kind=None, limit=20, job_dir=JOB_DIR):
+    """Most recent jobs first (without partial results)"""
+    sql = ("SELECT id, kind, params, status, progress, message, artifact, created, started, finished "
+           "FROM jobs" + (" WHERE kind = ?" if kind else "") + " ORDER BY created DESC LIMIT ?")
+    conn = _connect(job_dir)
+    try:
+        rows = conn.execute(sql, ((kind,) if kind else ()) + (limit,)).fetchall()
+    finally:
+        conn.close()
+    return [{**dict(r), "params": json.loads(r["params"])} for r in rows]
+
+def cancel(job_id, job_dir=JOB_DIR):
+    """Mark an active job cancelled (the worker stops at its next progress report)"""
+    conn = _connect(job_dir)
+    try:
+        cur = conn.execute("UPDATE jobs SET status = 'cancelled', finished = ? "
+                           "WHERE id = ? AND status IN ('queued', 'running')", (time.time(), job_id))
+    finally:
+        conn.close()
+    return cur.rowcount > 0
+
+def artifact_bytes(job):
+    """Stored artifact of a finished job (None if it has none or it was purged)"""
+    path = job.get("artifact") if job else None
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+def recover(job_dir=JOB_DIR):
+    """Fail active jobs whose submitting process is gone (server restarted mid-run)"""
+    conn = _connect(job_dir)
+    try:
+        rows = conn.execute("SELECT id, owner_pid FROM jobs WHERE status IN ('queued', 'running')").fetchall()
+        lost = [r["id"] for r in rows if not _pid_alive(r["owner_pid"])]
+        conn.executemany("UPDATE jobs SET status = 'failed', message = 'Interrupted (server restarted)', "
+                         "finished = ? WHERE id = ?", [(time.time(), i) for i in lost])
+    finally:
+        conn.close()
+    return len(lost)
+
+def purge(max_age_days=KEEP_DAYS, job_dir=JOB_DIR):
+    """Delete finished jobs (and their artifacts) older than max_age_days"""
+    cutoff = time.time() - max_age_days * 86400
+    conn = _connect(job_dir)
+    try:
+        rows = conn.execute("SELECT id, artifact FROM jobs WHERE status NOT IN ('queued', 'running') "
+                            "AND created < ?", (cutoff,)).fetchall()
+        for r in rows:
+            # Artifacts are shared by params hash: keep files a newer job still points to
+            if r["artifact"] and os.path.exists(r["artifact"]) and not conn.execute(
+                    "SELECT 1 FROM jobs WHERE artifact = ? AND created >= ?", (r["artifact"], cutoff)).fetchone():
+                os.remove(r["artifact"])
+        conn.executemany("DELETE FROM jobs WHERE id = ?", [(r["id"],) for r in rows])
+    finally:
+        conn.close()
+    return len(rows)
+
+def wait(job_id, timeout=None, poll=0.5, job_dir=JOB_DIR):
+    """Block until the job leaves queued / running; returns the job dict"""
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+        job = get_job(job_id, job_dir)
+        if job is None or job["status"] not in ACTIVE:
+            return job
+        if deadline is not None and time.time() > deadline:
+            return job
+        time.sleep(poll)
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Inspect / run background jobs")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_list = sub.add_parser("list", help="recent jobs")
+    p_list.add_argument("--kind", choices=list(JOB_KINDS))
+    p_list.add_argument("--limit", type=int, default=20)
+    p_show = sub.add_parser("show", help="one job (status, message, error)")
+    p_show.add_argument("job_id")
+    p_cancel = sub.add_parser("cancel")
+    p_cancel.add_argument("job_id")
+    p_run = sub.add_parser("run", help="submit a typical-detail solve and wait for it")
+    p_run.add_argument("--method", default="ASD", choices=["ASD", "LRFD"])
+    p_run.add_argument("--fy", type=float, default=2400)
+    p_run.add_argument("--e", type=float, default=200)
+    p_run.add_argument("--limit", type=int, default=360)
+    p_run.add_argument("--catalog", default="builtin")
+    p_purge = sub.add_parser("purge", help="delete old finished jobs and artifacts")
+    p_purge.add_argument("--days", type=float, default=KEEP_DAYS)
+    args = parser.parse_args()
+
+    if args.cmd == "list":
+        for j in list_jobs(args.kind, args.limit):
+            stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(j["created"]))
+            print(f"{j['id']}  {stamp}  {j['kind']:<8}{j['status']:<10}{j['progress']:>5.0%}  {j['message']}")
+    elif args.cmd == "show":
+        job = get_job(args.job_id)
+        if job is None:
+            raise SystemExit(f"No job {args.job_id}")
+        print(json.dumps({k: v for k, v in job.items() if k not in ("partial", "result")}, indent=2))
+    elif args.cmd == "cancel":
+        print("cancelled" if cancel(args.job_id) else "not active")
+    elif args.cmd == "run":
+        job_id = submit("typical", {"method": args.method, "Fy": args.fy, "E_gpa": args.e,
+                                    "def_val": args.limit, "catalog": args.catalog})
+        print(f"job {job_id}")
+        job = wait(job_id)
+        print(f"{job['status']}: {len(job['result'] or [])} sections")
+    elif args.cmd == "purge":
+        print(f"{purge(args.days)} jobs removed")
@@ -0,0 +1,154 @@
+import numpy as np
+from calculator import core_calculation_vec
+from envelope import MODE_NAMES
+
+# ==============================================================================
+# ⚖️ LOAD COMBINATIONS (ASCE 7-16 §2.3.1 LRFD / §2.4.1 ASD)
+# ==============================================================================
+# Component line loads (kg/m) of many beams are stacked into a matrix
+# loads (n_beams × n_components); the combination table is a factor matrix
+# C (n_combos × n_components), so every combination of every beam is one
+# matrix product: combos = loads @ C.T.
+#
+# Strength is checked with the combinations of the design method against
+# min(ws, wm); deflection with the ASD (service-level) combinations against wd.
+# Negative totals (wind uplift) are checked by magnitude. The self-weight of the
+# section is part of D.
+
+COMPONENTS = ("D", "L", "Lr", "S", "R", "W", "E")
+COMPONENT_NAMES = {"D": "Dead", "L": "Live", "Lr": "Roof Live", "S": "Snow", "R": "Rain",
+                   "W": "Wind", "E": "Earthquake"}
+ROOF = ("Lr", "S", "R")   # "(Lr or S or R)": one combination per choice
+
+# name template, {component or ROOF: factor}; "{r}" is replaced by the roof load used
+_TABLE = {
+    "LRFD": [
+        ("1.4D", {"D": 1.4}),
+        ("1.2D + 1.6L + 0.5{r}", {"D": 1.2, "L": 1.6, ROOF: 0.5}),
+        ("1.2D + 1.6{r} + L", {"D": 1.2, ROOF: 1.6, "L": 1.0}),
+        ("1.2D + 1.6{r} + 0.5W", {"D": 1.2, ROOF: 1.6, "W": 0.5}),
+        ("1.2D + 1.0W + L + 0.5{r}", {"D": 1.2, "W": 1.0, "L": 1.0, ROOF: 0.5}),
+        ("1.2D + 1.0E + L + 0.2S", {"D": 1.2, "E": 1.0, "L": 1.0, "S": 0.2}),
+        ("0.9D + 1.0W", {"D": 0.9, "W": 1.0}),
+        ("0.9D + 1.0E", {"D": 0.9, "E": 1.0}),
+    ],
+    "ASD": [
+        ("D", {"D": 1.0}),
+        ("D + L", {"D": 1.0, "L": 1.0}),
+        ("D + {r}", {"D": 1.0, ROOF: 1.0}),
+        ("D + 0.75L + 0.75{r}", {"D": 1.0, "L": 0.75, ROOF: 0.75}),
+        ("D + 0.6W", {"D": 1.0, "W": 0.6}),
+        ("D + 0.7E", {"D": 1.0, "E": 0.7}),
+        ("D + 0.75L + 0.45W + 0.75{r}", {"D": 1.0, "L": 0.75, "W": 0.45, ROOF: 0.75}),
+        ("D + 0.75L + 0.525E + 0.75S", {"D": 1.0, "L": 0.75, "E": 0.525, "S": 0.75}),
+        ("0.6D + 0.6W", {"D": 0.6, "W": 0.6}),
+        ("0.6D + 0.7E", {"D": 0.6, "E": 0.7}),
+    ],
+}
+SERVICE = "ASD"   # combination set used for deflection
+
+def combo_table(method):
+    """[(name, {component: factor})] with every "(Lr or S or R)" choice written out"""
+    out = []
+    for template, factors in _TABLE[method]:
+        if ROOF not in factors:
+            out.append((template, factors))
+            continue
+        f_roof = factors[ROOF]
+        for r in ROOF:
+            fac = {k: v for k, v in factors.items() if k != ROOF}
+            fac[r] = fac.get(r, 0.0) + f_roof
+            out.append((template.format(r=r), fac))
+    return out
+
+def combo_matrix(method, components=COMPONENTS):
+    """(names, C) with C[k, j] = factor of component j in combination k"""
+    table = combo_table(method)
+    C = np.array([[fac.get(c, 0.0) for c in components] for _, fac in table])
+    return [name for name, _ in table], C
+
+def combine(loads, method):
+    """loads (..., n_components) -> combined loads (..., n_combos)"""
+    return np.asarray(loads, dtype=float) @ combo_matrix(method)[1].T
+
+def envelope(loads, method, capacity, self_weight=0.0):
+    """
+    Governing combination of `loads` (n, n_components) against `capacity`
+    (broadcasts with (n, 1), e.g. beams × sections (n, m)). self_weight adds to D
+    (scalar, (n, 1) or (1, m)). Loops over the ~15 combinations, so memory stays
+    at the size of `capacity`. Returns (utilization, combination index, combined load).
+    """
+    _, C = combo_matrix(method)
+    base = np.asarray(loads, dtype=float) @ C.T          # (n, k) without self-weight
+    d = C[:, COMPONENTS.index("D")]
+    shape = np.broadcast(base[:, :1], capacity, self_weight).shape
+    util = np.full(shape, -np.inf)
+    idx = np.zeros(shape, dtype=int)
+    w_gov = np.zeros(shape)
+    with np.errstate(divide='ignore'):
+        for k in range(C.shape[0]):
+            w = base[:, k:k + 1] + self_weight * d[k]
+            u = np.abs(w) / capacity
+            better = u > util
+            util = np.where(better, u, util)
+            idx = np.where(better, k, idx)
+            w_gov = np.where(better, w, w_gov)
+    return util, idx, w_gov
+
+def combo_check(capacity, loads, self_weight, method):
+    """
+    Strength + deflection utilization from core_calculation_vec capacities `capacity`
+    (dict with ws, wm, wd broadcasting against (n, 1)).
+    Returns {'util', 'mode' (0 Shear / 1 Moment / 2 Deflection), 'combo' (index into
+    the table of `mode`: method combos for strength, ASD combos for deflection),
+    'util_strength', 'util_service', 'w' (load of the governing combination), 'w_u' / 'w_s'
+    (governing strength / service load)}.
+    """
+    ws, wm, wd = capacity['ws'], capacity['wm'], capacity['wd']
+    u_s, k_s, w_u = envelope(loads, method, np.minimum(ws, wm), self_weight)
+    u_d, k_d, w_s = envelope(loads, SERVICE, wd, self_weight)
+    deflection = u_d > u_s
+    mode = np.where(deflection, 2, np.where(ws <= wm, 0, 1))
+    return {
+        "util": np.maximum(u_s, u_d), "mode": mode, "combo": np.where(deflection, k_d, k_s),
+        "util_strength": u_s, "util_service": u_d, "w": np.where(deflection, w_s, w_u), "w_u": w_u, "w_s": w_s,
+        "combo_strength": k_s, "combo_service": k_d,
+    }
+
+def check_beams(loads, L_m, props, Fy, E_gpa, method, def_limit=360):
+    """
+    One section per beam: loads (n, n_components) line loads [kg/m], spans (n,),
+    props = section columns (n,) e.g. section_arrays(names). Returns combo_check
+    plus 'combo_name' (governing combination per beam) and 'mode_name'.
+    """
+    loads = np.atleast_2d(np.asarray(loads, dtype=float))
+    col = lambda v: np.asarray(v, dtype=float).reshape(-1, 1) if np.ndim(v) else v
+    c = core_calculation_vec(col(L_m), Fy, E_gpa, {k: col(v) for k, v in props.items()}, method, def_limit)
+    r = combo_check(c, loads, col(props['W']), method)
+    r = {k: v[:, 0] for k, v in r.items()}
+    names = {m: combo_matrix(m)[0] for m in (method, SERVICE)}
+    r["combo_name"] = [names[SERVICE if m == 2 else method][k] for m, k in zip(r["mode"], r["combo"])]
+    r["mode_name"] = [MODE_NAMES[m] for m in r["mode"]]
+    return r
+
+if __name__ == "__main__":
+    import argparse
+    from database import SYS_H_BEAMS, section_arrays
+    parser = argparse.ArgumentParser(description="Governing load combination of one beam")
+    parser.add_argument("section", nargs="?", default="H-300x150x6.5x9")
+    parser.add_argument("--span", type=float, default=6.0)
+    parser.add_argument("--method", default="LRFD", choices=["ASD", "LRFD"])
+    for comp in COMPONENTS:
+        parser.add_argument(f"--{comp}", type=float, default=0.0, help=f"{COMPONENT_NAMES[comp]} line load [kg/m]")
+    parser.add_argument("--limit", type=int, default=360)
+    args = parser.parse_args()
+
+    loads = [[getattr(args, comp) for comp in COMPONENTS]]
+    props = section_arrays([args.section], SYS_H_BEAMS)
+    print(f"{'Combination':<30}{'w [kg/m]':>10}")
+    names, _ = combo_matrix(args.method)
+    for name, w in zip(names, combine(np.array(loads[0]) + np.eye(len(COMPONENTS))[0] * props['W'][0], args.method)):
+        print(f"{name:<30}{w:>10.0f}")
+    r = check_beams(loads, [args.span], props, 2400, 200, args.method, args.limit)
+    print(f"\n{args.section}, L = {args.span} m: util {r['util'][0]:.2f} ({r['mode_name'][0]}, {r['combo_name'][0]})"
+          f" | strength {r['util_strength'][0]:.2f}, deflection {r['util_service'][0]:.2f}")
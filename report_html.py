@@ -0,0 +1,154 @@
+import html
+
+# ==============================================================================
+# 🧾 SINGLE-DOCUMENT HTML CALCULATION REPORT (KaTeX)
+# ==============================================================================
+# The tab1 detail report as one HTML page. Math is written as TeX ($$ ... $$
+# display, \( ... \) inline) and typeset in the browser by KaTeX auto-render, so
+# the page is built once and can be shown in an iframe or downloaded as-is.
+# KaTeX (CSS, JS, fonts) is loaded from KATEX_CDN: opened offline or behind a
+# firewall, the downloaded file shows the raw TeX.
+
+KATEX_VERSION = "0.16.11"
+KATEX_CDN = f"https://cdn.jsdelivr.net/npm/katex@{KATEX_VERSION}/dist"
+
+STYLE = """
+body { font-family: "Source Sans Pro", "Segoe UI", Tahoma, sans-serif; color: #262730;
+       max-width: 960px; margin: 0 auto; padding: 12px 20px; line-height: 1.5; }
+h2 { margin-bottom: 0; } h3 { color: #1f3b73; border-bottom: 1px solid #ddd; padding-bottom: 4px; margin-top: 28px; }
+.sub { color: #666; font-size: 0.9em; }
+.grid { display: grid; grid-template-columns: repeat(4, 1fr); gap: 8px; }
+.grid2 { display: grid; grid-template-columns: 1fr 1fr; gap: 16px; }
+.metric { background: #f7f8fa; border-radius: 6px; padding: 6px 10px; }
+.metric .lbl { font-size: 0.8em; color: #666; } .metric .val { font-size: 1.25em; font-weight: 600; }
+.box { border: 1px solid #e0e0e0; border-radius: 8px; padding: 4px 16px 10px; margin-top: 12px; }
+.zone1 { color: #1a7f37; } .zone2 { color: #b8860b; } .zone3 { color: #d9534f; }
+.note { border-radius: 6px; padding: 8px 12px; margin: 6px 0; }
+.info { background: #e8f0fe; } .ok { background: #e6f4ea; }
+table { border-collapse: collapse; width: 100%; margin-top: 8px; }
+th, td { border: 1px solid #ddd; padding: 6px 10px; text-align: left; } th { background: #f7f8fa; }
+.katex-display { overflow-x: auto; overflow-y: hidden; }
+"""
+
+def _metric(label, value):
+    return f'<div class="metric"><div class="lbl">{label}</div><div class="val">{value}</div></div>'
+
+def build_report_html(section, props, c, method, Fy):
+    """Whole tab1 report (same content and formulas) as one HTML string"""
+    sec = html.escape(section)
+    limit_val = c.get('def_limit', 360)
+    zone_cls = "zone1" if "Zone 1" in c['Zone'] else ("zone2" if "Zone 2" in c['Zone'] else "zone3")
+
+    if method == "ASD":
+        v_factor = rf"V_{{design}} = \frac{{{c['Vn']:,.0f}}}{{{c['omega_v']:.2f}}}"
+        m_factor = rf"\Omega_b = {c['omega_b']:.2f} \quad M_{{design}} = M_n / \Omega_b"
+    else:
+        v_factor = rf"V_{{design}} = {c['phi_v']:.2f} \times {c['Vn']:,.0f}"
+        m_factor = rf"\phi_b = {c['phi_b']:.2f} \quad M_{{design}} = \phi_b \times M_n"
+
+    final_w = min(c['ws'], c['wm'], c['wd'])
+    net_w = max(0, final_w - props['W'])
+    if c['ws'] == final_w: ctrl = "Shear Control"
+    elif c['wm'] == final_w: ctrl = f"Moment Control ({c['Zone']})"
+    else: ctrl = f"Deflection Control (L/{limit_val})"
+    rows = [
+        ("Shear Strength", c['ws']),
+        (f"Moment ({c['Zone']})", c['wm']),
+        (f"Deflection (L/{limit_val})", c['wd']),
+    ]
+    summary_rows = "".join(
+        f"<tr><td>{name}</td><td>{val:,.0f}</td><td>{'Pass' if val >= final_w else '-'}</td></tr>"
+        for name, val in rows)
+
+    body = f"""
+<h2>📄 Engineering Report: {sec} ({method})</h2>
+<div class="sub">Fy = {Fy} ksc · E = {c['E_ksc']/10197.162:.0f} GPa · Span = {c['L_cm']/100:.2f} m ·
+Deflection Limit = L/{limit_val} · Section data: database key <code>{sec}</code></div>
+
+<h3>1. Geometric Properties</h3>
+<div class="grid">
+{_metric("Depth (D)", f"{props['D']} mm")}{_metric("Width (B)", f"{props.get('B', 100)} mm")}
+{_metric("Flange (tf)", f"{props.get('tf', 10)} mm")}{_metric("Web (tw)", f"{props['tw']} mm")}
+{_metric("Inertia (Ix)", f"{props['Ix']:,} cm4")}{_metric("Plastic Mod (Zx)", f"{props.get('Zx', 0):,} cm3")}
+{_metric("Self-Weight (W)", f"{props['W']} kg/m")}{_metric("Unbraced Length", f"{c['Lb']:.2f} m")}
+</div>
+
+<div class="box"><h3>2. Shear Capacity Control</h3>
+<div class="grid2"><div>
+<b>Step 2.1: Nominal Shear Strength \\(V_n\\)</b>
+$$V_n = 0.60 \\times F_y \\times A_w$$
+<ul><li>\\(F_y\\) (Input) = {Fy} ksc</li><li>\\(A_w\\) (Calc) = {c['Aw']:.2f} cm²</li></ul>
+$$\\therefore V_n = 0.60 \\times {Fy} \\times {c['Aw']:.2f} = \\mathbf{{{c['Vn']:,.0f}}} \\text{{ kg}}$$
+</div><div>
+<b>Step 2.2: Design Shear Strength \\(V_{{design}}\\)</b>
+$${c['txt_v_method']}$$
+$${v_factor}$$
+$$\\therefore V_{{design}} = \\mathbf{{{c['V_des']:,.0f}}} \\text{{ kg}}$$
+</div></div>
+<b>Step 2.3: Safe Uniform Load \\(w_s\\)</b>
+$$w_s = \\frac{{2 \\times {c['V_des']:,.0f}}}{{{c['L_cm']:.0f}}} \\times 100 = \\mathbf{{{c['ws']:,.0f}}} \\text{{ kg/m}}$$
+</div>
+
+<div class="box"><h3>3. Moment Capacity Control (Include LTB)</h3>
+<b>Step 3.1: Check Lateral-Torsional Buckling (LTB) Zone</b>
+<div class="grid">{_metric("Limit Lp (Yield)", f"{c['Lp']:.2f} m")}{_metric("Limit Lr (Elastic)", f"{c['Lr']:.2f} m")}
+{_metric("Unbraced Lb", f"{c['Lb']:.2f} m")}{_metric("Current State", f'<span class="{zone_cls}">{html.escape(c["Zone"])}</span>')}</div>
+<div class="grid2"><div>
+<b>Step 3.2: Nominal Moment Strength \\(M_n\\)</b>
+<ul><li>\\(M_p\\) (Plastic Limit) = {c['Mp']:,.0f} kg-cm</li><li>\\(M_n\\) (with LTB check) = {c['Mn']:,.0f} kg-cm</li></ul>
+$$\\therefore M_n = \\mathbf{{{c['Mn']:,.0f}}} \\text{{ kg-cm}}$$
+</div><div>
+<b>Step 3.3: Design Moment Strength \\(M_{{design}}\\)</b>
+$${c['txt_m_method']}$$
+$${m_factor}$$
+$$\\therefore M_{{design}} = \\mathbf{{{c['M_des']:,.0f}}} \\text{{ kg-cm}}$$
+</div></div>
+<b>Step 3.4: Safe Uniform Load \\(w_m\\)</b>
+$$w_m = \\frac{{8 \\times {c['M_des']:,.0f}}}{{{c['L_cm']:.0f}^2}} \\times 100 = \\mathbf{{{c['wm']:,.0f}}} \\text{{ kg/m}}$$
+</div>
+
+<h3>4. Deflection Control</h3>
+Allowable Deflection Limit (<b>L/{limit_val}</b>):
+$$\\delta_{{allow}} = \\frac{{{c['L_cm']:.0f}}}{{{limit_val}}} = \\mathbf{{{c['delta']:.2f}}} \\text{{ cm}}$$
+<b>Step 4.1: Convert to Safe Uniform Load \\(w_d\\)</b>
+$$w_d = \\frac{{384 \\cdot E \\cdot I_x \\cdot \\delta_{{allow}}}}{{5 \\cdot L^4}} \\times 100$$
+$$w_d = \\frac{{384 \\cdot {c['E_ksc']:,.0f} \\cdot {props['Ix']:,} \\cdot {c['delta']:.2f}}}{{5 \\cdot {c['L_cm']:.0f}^4}} \\times 100 = \\mathbf{{{c['wd']:,.0f}}} \\text{{ kg/m}}$$
+
+<h3>5. Summary &amp; Design Verification</h3>
+<table><tr><th>Limit State</th><th>Capacity (kg/m)</th><th>Status</th></tr>{summary_rows}</table>
+<div class="grid2">
+<div class="note info"><b>Governing Case:</b> {html.escape(ctrl)}<br>The maximum total load is limited by <b>{html.escape(ctrl)}</b>.</div>
+<div class="note ok">✅ <b>Safe Net Load Capacity:</b> <span style="font-size:1.4em;font-weight:600">{net_w:,.0f} kg/m</span><br>
+<i>Beam self-weight {props['W']} kg/m deducted.</i></div>
+</div>
+
+<h3>6. Derivation of Critical Lengths</h3>
+<b>6.1 Shear \\(\\leftrightarrow\\) Moment Transition \\(L_{{v-m}}\\)</b>
+$$\\begin{{aligned}}
+w_s &= w_m \\\\
+\\frac{{2 \\cdot V_{{des}}}}{{L}} &= \\frac{{8 \\cdot M_{{des}}}}{{L^2}} \\\\
+L_{{v-m}} &= \\frac{{4 \\cdot M_{{des}}}}{{V_{{des}}}} = \\frac{{4 \\cdot {c['M_des_full']:,.0f}}}{{{c['V_des']:,.0f}}} = \\mathbf{{{c['L_vm']:.2f}}} \\text{{ m}}
+\\end{{aligned}}$$
+<b>6.2 Moment \\(\\leftrightarrow\\) Deflection Transition \\(L_{{m-d}}\\)</b>
+$$\\begin{{aligned}}
+w_m &= w_d \\\\
+\\frac{{8 \\cdot M_{{des}}}}{{L^2}} &= \\frac{{384 \\cdot E \\cdot I \\cdot (L/{limit_val})}}{{5 \\cdot L^4}} \\\\
+L^2 &= \\frac{{384 \\cdot E \\cdot I}}{{40 \\cdot M_{{des}} \\cdot {limit_val}}} \\\\
+L_{{m-d}} &= \\sqrt{{\\frac{{384 \\cdot {c['E_ksc']:,.0f} \\cdot {props['Ix']:,} \\cdot 100}}{{40 \\cdot {c['M_des_full']:,.0f} \\cdot {limit_val}}}}} = \\mathbf{{{c['L_md']:.2f}}} \\text{{ m}}
+\\end{{aligned}}$$
+<div class="grid2">
+<div class="note info"><b>📍 Shear/Moment Switch:</b> {c['L_vm']:.2f} m</div>
+<div class="note info"><b>📍 Moment/Deflection Switch:</b> {c['L_md']:.2f} m</div>
+</div>
+"""
+
+    return f"""<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+<title>{sec} ({method}) - SYS Structural Report</title>
+<link rel="stylesheet" href="{KATEX_CDN}/katex.min.css">
+<script defer src="{KATEX_CDN}/katex.min.js"></script>
+<script defer src="{KATEX_CDN}/contrib/auto-render.min.js"
+  onload="renderMathInElement(document.body, {{delimiters: [{{left: '$$', right: '$$', display: true}}, {{left: '\\\\(', right: '\\\\)', display: false}}]}});"></script>
+<style>{STYLE}</style>
+</head><body>{body}</body></html>
+"""
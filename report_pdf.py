@@ -0,0 +1,289 @@
+import io
+import os
+import re
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from functools import lru_cache
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.patches import PathPatch
+from matplotlib.textpath import TextPath
+from matplotlib.ticker import FuncFormatter, LogLocator, NullFormatter
+from matplotlib.transforms import Affine2D
+from concurrent.futures import ProcessPoolExecutor
+from database import SYS_H_BEAMS, sorted_sections
+from calculator import core_calculation
+from calculator_tab import calculate_shear_tab
+from envelope import adaptive_envelope, mode_segments, MODE_NAMES
+from connection_solver import solve_connection, typical_inputs
+
+try:
+    from pypdf import PdfWriter, PdfReader
+except ImportError:  # optional: without pypdf the book is rendered in one process
+    PdfWriter = PdfReader = None
+
+# ==============================================================================
+# 📚 BATCH CALCULATION BOOK (VECTOR PDF, matplotlib)
+# ==============================================================================
+# One chunk of pages per section:
+#   "calc"       : tab1-style calculation sheet at the chosen span
+#   "envelope"   : capacity envelope (shear / moment with LTB / deflection)
+#   "connection" : typical shear tab at 75% V_design (tab7 solver) with the
+#                  calculate_shear_tab check steps
+# Formulas are typeset symbolically and converted to vector paths once per
+# process (shared by every section), with the numeric substitution on a
+# plain-text line below.
+# Sections are rendered in worker processes to in-memory PDFs and merged with
+# pypdf. Without pypdf (or when worker processes are unavailable) every page is
+# written sequentially into one PdfPages file instead.
+
+PAGES = ("calc", "envelope", "connection")
+PAGE_SIZE = (8.27, 11.69)  # A4 portrait, inches
+MODE_COLORS = ('#d9534f', '#f0ad4e', '#5cb85c')
+
+_THAI_NOTE = re.compile(r"\s*\([^)]*[฀-๿][^)]*\)")
+_THAI = re.compile(r"[฀-๿]+")
+
+def _plain(text):
+    """Markdown / Thai-free text for the PDF (the default PDF font has no Thai glyphs)"""
+    text = _THAI_NOTE.sub("", text)
+    return _THAI.sub("", text).replace("**", "").strip()
+
+class _Sheet:
+    """Top-down text cursor on one A4 page"""
+    def __init__(self, title, subtitle=""):
+        self.fig = plt.figure(figsize=PAGE_SIZE)
+        self.y = 0.95
+        self.fig.text(0.08, self.y, title, fontsize=15, weight='bold')
+        self.y -= 0.025
+        if subtitle:
+            self.fig.text(0.08, self.y, subtitle, fontsize=9, color='#555555')
+            self.y -= 0.015
+        self.fig.add_artist(plt.Line2D([0.08, 0.92], [self.y, self.y], color='black', lw=0.8))
+        self.y -= 0.03
+
+    def heading(self, text):
+        self.y -= 0.008
+        self.fig.text(0.08, self.y, text, fontsize=11.5, weight='bold', color='#1f3b73')
+        self.y -= 0.026
+
+    def line(self, text, indent=0.0, size=9.5, **kw):
+        self.fig.text(0.1 + indent, self.y, text, fontsize=size, **kw)
+        self.y -= 0.018
+
+    def formula(self, tex, size=11):
+        """Mathtext line drawn from a cached vector path (parsed once, not once per page)"""
+        path, height = _formula_path(tex, size)
+        x_in, y_in = 0.1 * PAGE_SIZE[0], self.y * PAGE_SIZE[1]
+        to_page = Affine2D().scale(1 / 72).translate(x_in, y_in) + self.fig.dpi_scale_trans
+        self.fig.add_artist(PathPatch(path, transform=to_page, facecolor='black', lw=0))
+        self.y -= (height / 72 + 0.12) / PAGE_SIZE[1]
+
+@lru_cache(maxsize=128)
+def _formula_path(tex, size):
+    """(path in points, height) with the top of the formula on the cursor line"""
+    path = TextPath((0, 0), tex, size=size)
+    box = path.get_extents()
+    return path.transformed(Affine2D().translate(0, -box.y1 + 0.8 * size)), box.height
+
+# --- Page builders (each returns a matplotlib Figure) ---
+def calc_sheet(section, c, props, method, Fy):
+    s = _Sheet(f"Engineering Report: {section} ({method})",
+               f"Fy = {Fy} ksc | E = {c['E_ksc']/10197.162:.0f} GPa | Span = {c['L_cm']/100:.2f} m | "
+               f"Deflection Limit = L/{c['def_limit']}")
+
+    s.heading("1. Geometric Properties")
+    s.line(f"D = {props['D']} mm    B = {props.get('B', 100)} mm    tf = {props.get('tf', 10)} mm    tw = {props['tw']} mm")
+    s.line(f"Ix = {props['Ix']:,} cm4    Zx = {props.get('Zx', 0):,} cm3    W = {props['W']} kg/m    Lb = {c['Lb']:.2f} m")
+
+    s.heading("2. Shear Capacity")
+    s.formula(r"$V_n = 0.60 \times F_y \times A_w$")
+    s.line(f"= 0.60 × {Fy} × {c['Aw']:.2f} = {c['Vn']:,.0f} kg", indent=0.02)
+    s.formula(f"${c['txt_v_method']}$")
+    s.line(f"V_design = {c['V_des']:,.0f} kg", indent=0.02)
+    s.formula(r"$w_s = \frac{2 \times V_{design}}{L} \times 100$")
+    s.line(f"= 2 × {c['V_des']:,.0f} / {c['L_cm']:.0f} × 100 = {c['ws']:,.0f} kg/m", indent=0.02, weight='bold')
+
+    s.heading("3. Moment Capacity (incl. LTB)")
+    s.line(f"Lp = {c['Lp']:.2f} m    Lr = {c['Lr']:.2f} m    Lb = {c['Lb']:.2f} m    ->  {c['Zone']}")
+    s.line(f"Mp = {c['Mp']:,.0f} kg-cm    Mn = {c['Mn']:,.0f} kg-cm")
+    s.formula(f"${c['txt_m_method']}$")
+    s.line(f"M_design = {c['M_des']:,.0f} kg-cm", indent=0.02)
+    s.formula(r"$w_m = \frac{8 \times M_{design}}{L^2} \times 100$")
+    s.line(f"= 8 × {c['M_des']:,.0f} / {c['L_cm']:.0f}² × 100 = {c['wm']:,.0f} kg/m", indent=0.02, weight='bold')
+
+    s.heading("4. Deflection Control")
+    s.line(f"δ_allow = L / {c['def_limit']} = {c['L_cm']:.0f} / {c['def_limit']} = {c['delta']:.2f} cm")
+    s.formula(r"$w_d = \frac{384 \cdot E \cdot I_x \cdot \delta_{allow}}{5 \cdot L^4} \times 100$")
+    s.line(f"= 384 × {c['E_ksc']:,.0f} × {props['Ix']:,} × {c['delta']:.2f} / (5 × {c['L_cm']:.0f}⁴) × 100 = {c['wd']:,.0f} kg/m",
+           indent=0.02, weight='bold')
+
+    s.heading("5. Summary")
+    final_w = min(c['ws'], c['wm'], c['wd'])
+    net_w = max(0, final_w - props['W'])
+    if c['ws'] == final_w: ctrl = "Shear Control"
+    elif c['wm'] == final_w: ctrl = f"Moment Control ({c['Zone']})"
+    else: ctrl = f"Deflection Control (L/{c['def_limit']})"
+    rows = [["Shear Strength", f"{c['ws']:,.0f}"],
+            [f"Moment ({c['Zone']})", f"{c['wm']:,.0f}"],
+            [f"Deflection (L/{c['def_limit']})", f"{c['wd']:,.0f}"]]
+    ax = s.fig.add_axes([0.1, s.y - 0.09, 0.8, 0.09]); ax.axis('off')
+    tbl = ax.table(cellText=rows, colLabels=["Limit State", "Capacity (kg/m)"], loc='upper left', cellLoc='left')
+    tbl.auto_set_font_size(False); tbl.set_fontsize(9)
+    s.y -= 0.11
+    s.line(f"Governing Case: {ctrl}", weight='bold')
+    s.line(f"Safe Net Load (excl. self-weight {props['W']} kg/m) = {net_w:,.0f} kg/m", weight='bold', color='#1a7f37')
+
+    s.heading("6. Critical Lengths")
+    s.formula(r"$L_{v-m} = \frac{4 \cdot M_{des}}{V_{des}}$")
+    s.line(f"= 4 × {c['M_des_full']:,.0f} / {c['V_des']:,.0f} = {c['L_vm']:.2f} m", indent=0.02)
+    s.formula(r"$L_{m-d} = \sqrt{\frac{384 \cdot E \cdot I_x}{40 \cdot M_{des} \cdot n}}$  (n = deflection limit L/n)")
+    s.line(f"= {c['L_md']:.2f} m  (n = {c['def_limit']})", indent=0.02)
+    return s.fig
+
+def envelope_sheet(section, props, method, Fy, E_gpa, def_limit, L_m):
+    env = adaptive_envelope(Fy, E_gpa, props, method, def_limit, 0.5, max(15.0, 1.5 * L_m))
+    x = env['x']
+    fig = plt.figure(figsize=PAGE_SIZE)
+    fig.text(0.08, 0.95, f"Capacity Envelope: {section} ({method}, L/{def_limit})", fontsize=15, weight='bold')
+    ax = fig.add_axes([0.12, 0.45, 0.8, 0.45])
+    for key, name, color in zip(('ws', 'wm', 'wd'), MODE_NAMES, MODE_COLORS):
+        ax.plot(x, env[key], color=color, lw=1.2, ls='--', label=name)
+    ax.plot(x, env['w_gov'], color='black', lw=2.0, label='Governing')
+    for x0, x1, m in mode_segments(x, env['mode']):
+        ax.axvspan(x0, x1, color=MODE_COLORS[m], alpha=0.08, lw=0)
+    for name, val in env['breaks'].items():
+        if x[0] < val < x[-1]:
+            ax.axvline(val, color='grey', lw=0.8, ls=':')
+            ax.text(val, 0.98, f" {name}", transform=ax.get_xaxis_transform(), fontsize=8, va='top')
+    ax.axvline(L_m, color='#0275d8', lw=1.0)
+    ax.set_yscale('log')
+    ax.yaxis.set_major_formatter(FuncFormatter(lambda v, _: f"{v:,.0f}"))
+    ax.yaxis.set_minor_locator(LogLocator(subs=(2.0, 5.0)))
+    ax.yaxis.set_minor_formatter(NullFormatter())
+    ax.set_xlim(x[0], x[-1])
+    ax.set_ylim(max(10.0, float(env['w_gov'].min()) * 0.5), float(env['w_gov'].max()) * 2.0)
+    ax.set_xlabel("Span Length (m)"); ax.set_ylabel("Uniform Load Capacity (kg/m)")
+    ax.grid(True, which='both', lw=0.3, alpha=0.5)
+    ax.legend(loc='upper right', fontsize=9)
+
+    # Key spans table
+    spans = [s for s in (2, 4, 6, 8, 10, 12, 15) if s <= x[-1]]
+    rows = []
+    for L in spans:
+        c = core_calculation(L, Fy, E_gpa, props, method, def_limit)
+        w = min(c['ws'], c['wm'], c['wd'])
+        mode = MODE_NAMES[(c['ws'], c['wm'], c['wd']).index(w)]
+        rows.append([f"{L:.1f}", f"{w:,.0f}", f"{max(0, w - props['W']):,.0f}", mode])
+    tax = fig.add_axes([0.12, 0.08, 0.8, 0.3]); tax.axis('off')
+    tbl = tax.table(cellText=rows, colLabels=["Span (m)", "Capacity (kg/m)", "Net (kg/m)", "Governing"], loc='upper center')
+    tbl.auto_set_font_size(False); tbl.set_fontsize(9); tbl.scale(1, 1.3)
+    return fig
+
+def connection_sheet(section, props, method, Fy, E_gpa, def_limit, bolt_group="Concentric"):
+    c = core_calculation(6.0, Fy, E_gpa, props, method, def_limit)
+    V_target = 0.75 * c['V_des']
+    conn = solve_connection(props, V_target, method, bolt_group=bolt_group)
+    s = _Sheet(f"Shear Tab Check: {section} ({method})",
+               f"Vu = 75% of V_design = {V_target:,.0f} kg | Bolt group: {bolt_group} | SS400 / A325")
+    if conn['Status'] != "✅ PASS":
+        s.line(f"No typical connection found ({conn['Note']}).", color='#d9534f', weight='bold')
+        return s.fig
+
+    s.line(f"Bolts: {conn['Rows']} x {conn['Bolt']}    Plate: {conn['Plate']} mm    Weld: {conn['Weld']} mm")
+    res = calculate_shear_tab(typical_inputs(conn['Detail'], method, bolt_group, load=V_target))
+    for key in ('bolt_shear', 'bearing', 'shear_yield', 'shear_rupture', 'weld'):
+        r = res[key]
+        s.heading(_plain(r['title']))
+        s.formula(f"${r['latex_eq']}$", size=10)
+        for txt in r['calcs']:
+            s.line(_plain(txt).lstrip('- '), indent=0.02, size=9)
+        ok = r['ratio'] <= 1.0
+        s.line(f"Ratio = {r['ratio']:.3f}  ->  {'OK' if ok else 'NOT OK'}", indent=0.02, size=9,
+               weight='bold', color='#1a7f37' if ok else '#d9534f')
+
+    summ = res['summary']
+    s.heading("Summary")
+    s.line(f"Governing: {_plain(summ['gov_mode'])}")
+    s.line(f"Capacity = {summ['gov_capacity']:,.0f} kg | Utilization = {summ['utilization']:.2f} | {summ['status']}",
+           weight='bold', color='#1a7f37' if summ['status'] == "PASS" else '#d9534f')
+    return s.fig
+
+# --- Rendering ---
+def _section_figures(section, props, method, Fy, E_gpa, def_limit, L_m, pages, bolt_group):
+    if "calc" in pages:
+        yield calc_sheet(section, core_calculation(L_m, Fy, E_gpa, props, method, def_limit), props, method, Fy)
+    if "envelope" in pages:
+        yield envelope_sheet(section, props, method, Fy, E_gpa, def_limit, L_m)
+    if "connection" in pages:
+        yield connection_sheet(section, props, method, Fy, E_gpa, def_limit, bolt_group)
+
+def _write_pages(pdf, section, props, *args):
+    for fig in _section_figures(section, props, *args):
+        pdf.savefig(fig)
+        plt.close(fig)
+
+def render_section_pdf(job):
+    """Worker: one section's pages as PDF bytes"""
+    section, props, args = job
+    buf = io.BytesIO()
+    with PdfPages(buf) as pdf:
+        _write_pages(pdf, section, props, *args)
+    return buf.getvalue()
+
+def _book_sequential(jobs, title):
+    buf = io.BytesIO()
+    with PdfPages(buf, metadata={"Title": title}) as pdf:
+        for section, props, args in jobs:
+            _write_pages(pdf, section, props, *args)
+    return buf.getvalue()
+
+def build_book(sections=None, method="ASD", Fy=2400, E_gpa=200, def_limit=360, L_m=6.0,
+               pages=PAGES, bolt_group="Concentric", workers=None, catalog=SYS_H_BEAMS):
+    """
+    Multi-page vector PDF for `sections` (default: the whole catalog, by depth).
+    Returns the PDF as bytes.
+    """
+    if sections is None:
+        sections = sorted_sections(catalog)
+    sections = list(sections)
+    args = (method, Fy, E_gpa, def_limit, L_m, tuple(pages), bolt_group)
+    # Workers receive plain property dicts (no catalog to pickle or re-open)
+    jobs = [(s, dict(catalog[s]), args) for s in sections]
+    title = f"SYS Calculation Book ({method}, L/{def_limit})"
+    workers = workers or min(len(sections), os.cpu_count() or 1)
+
+    if PdfWriter is None or workers <= 1 or len(sections) <= 1:
+        return _book_sequential(jobs, title)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(render_section_pdf, jobs, chunksize=2))
+    except (OSError, RuntimeError):
+        # Worker processes not available (sandbox / frozen app): same pages, one process
+        return _book_sequential(jobs, title)
+
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(io.BytesIO(part)))
+    writer.add_metadata({"/Title": title})
+    if hasattr(writer, "compress_identical_objects"):  # pypdf >= 4: share repeated fonts / resources
+        writer.compress_identical_objects()
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Render the calculation book as a PDF")
+    parser.add_argument("output")
+    parser.add_argument("--method", default="ASD", choices=["ASD", "LRFD"])
+    parser.add_argument("--fy", type=float, default=2400)
+    parser.add_argument("--e", type=float, default=200)
+    parser.add_argument("--limit", type=int, default=360)
+    parser.add_argument("--span", type=float, default=6.0)
+    parser.add_argument("--sections", nargs="*", help="schedule subset (default: all)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    with open(args.output, 'wb') as f:
+        f.write(build_book(args.sections, args.method, args.fy, args.e, args.limit, args.span,
+                           workers=args.workers))
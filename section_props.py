@@ -0,0 +1,190 @@
+import numpy as np
+
+# ==============================================================================
+# 📐 SECTION PROPERTY ENGINE (doubly-symmetric I / H shapes)
+# ==============================================================================
+# Every property of a rolled (root fillet r) or welded (r = 0) I-section from its
+# plate dimensions D, B, tw, tf. All functions take scalars or NumPy arrays, so a
+# whole catalog is evaluated in one pass; catalogs store the results
+# (complete_props / fill_columns) and the calculators only read them.
+#
+# Input dimensions in mm. Output in the database units:
+# A cm2, I / J cm4, S / Z cm3, radii cm, Cw cm6, W kg/m.
+
+STEEL_DENSITY = 7850.0                  # kg/m3
+KG_PER_MM2 = STEEL_DENSITY * 1e-6       # W [kg/m] = A [mm2] × 0.00785
+
+# Root fillet = spandrel between web face, flange face and a radius-r arc (per unit r)
+FILLET_AREA = 1 - np.pi / 4                                            # × r²  (0.2146)
+FILLET_CENTROID = (0.5 - np.pi / 4 * (1 - 4 / (3 * np.pi))) / FILLET_AREA  # × r from each face (0.2234)
+FILLET_INERTIA = (1 / 3 - np.pi / 16 - np.pi / 4 * (1 - 8 / (3 * np.pi))
+                  - FILLET_AREA * FILLET_CENTROID**2)                  # × r⁴ about own centroid (0.0075)
+
+DIMENSIONS = ("D", "B", "tw", "tf")
+TABULATED = ("W", "Ix", "Zx", "Iy", "Zy", "r")   # catalog values win over the engine where given
+DERIVED = ("A", "Sx", "Sy", "rx", "ry", "J", "Cw", "rts")
+PROPERTY_KEYS = DIMENSIONS + TABULATED + DERIVED
+
+def _arr(v):
+    return np.asarray(v, dtype=float)
+
+def _given(v):
+    """Finite mask of an optional input (None -> nothing given)"""
+    return np.zeros((), dtype=bool) if v is None else np.isfinite(_arr(v))
+
+def _plate_area(D, B, tw, tf):
+    return 2 * B * tf + (D - 2 * tf) * tw     # mm2
+
+def fillet_from_weight(D, B, tw, tf, W):
+    """
+    Root radius [mm] that reproduces the tabulated weight W [kg/m]
+    (rolled catalogs rarely list r, but their W includes the four fillets).
+    Clipped to the room available between web and flange tips / flanges.
+    """
+    D, B, tw, tf = _arr(D), _arr(B), _arr(tw), _arr(tf)
+    extra = _arr(W) / KG_PER_MM2 - _plate_area(D, B, tw, tf)
+    with np.errstate(invalid='ignore'):
+        r = np.sqrt(np.clip(extra, 0, None) / (4 * FILLET_AREA))
+    return np.minimum(r, np.minimum((B - tw) / 2, (D - 2 * tf) / 2))
+
+def torsion_constant(D, B, tw, tf, r=0.0):
+    """
+    St. Venant J [mm4] of an I-section with root fillets
+    (El Darwish & Johnston, 1965; valid for tw < 2(tf + r)). r = 0 -> welded plates.
+    """
+    D, B, tw, tf, r = _arr(D), _arr(B), _arr(tw), _arr(tf), _arr(r)
+    J_flange = B * tf**3 * (1 / 3 - 0.21 * (tf / B) * (1 - tf**4 / (12 * B**4)))
+    J_web = (D - 2 * tf) * tw**3 / 3
+    alpha = (-0.042 + 0.2204 * tw / tf + 0.1355 * r / tf
+             - 0.0865 * tw * r / tf**2 - 0.0725 * tw**2 / tf**2)
+    D_joint = ((tf + r)**2 + tw * (r + tw / 4)) / (2 * r + tf)   # circle inscribed in the web-flange joint
+    return 2 * J_flange + J_web + 2 * alpha * D_joint**4
+
+def section_properties(D, B, tw, tf, r=0.0):
+    """All properties from dimensions alone [mm] (welded: r = 0; rolled: root radius r)"""
+    D, B, tw, tf, r = _arr(D), _arr(B), _arr(tw), _arr(tf), _arr(r)
+    hw = D - 2 * tf                       # clear web between flanges
+    a_f = FILLET_AREA * r**2              # one fillet
+    y_f = hw / 2 - FILLET_CENTROID * r    # fillet centroid from the x-axis
+    x_f = tw / 2 + FILLET_CENTROID * r    # ... and from the y-axis
+    I_f = FILLET_INERTIA * r**4
+
+    A = _plate_area(D, B, tw, tf) + 4 * a_f
+    Ix = (B * D**3 - (B - tw) * hw**3) / 12 + 4 * (I_f + a_f * y_f**2)
+    Iy = 2 * tf * B**3 / 12 + hw * tw**3 / 12 + 4 * (I_f + a_f * x_f**2)
+    Zx = B * tf * (D - tf) + tw * hw**2 / 4 + 4 * a_f * y_f
+    Zy = tf * B**2 / 2 + hw * tw**2 / 4 + 4 * a_f * x_f
+    h0 = D - tf
+    Cw = Iy * h0**2 / 4                   # AISC F2 user note (doubly symmetric)
+    Sx = 2 * Ix / D
+    return {
+        "A": A / 1e2, "W": A * KG_PER_MM2,
+        "Ix": Ix / 1e4, "Sx": Sx / 1e3, "Zx": Zx / 1e3,
+        "Iy": Iy / 1e4, "Sy": 2 * Iy / B / 1e3, "Zy": Zy / 1e3,
+        "rx": np.sqrt(Ix / A) / 10, "ry": np.sqrt(Iy / A) / 10,
+        "J": torsion_constant(D, B, tw, tf, r) / 1e4, "Cw": Cw / 1e6,
+        "h0": h0 / 10, "rts": np.sqrt(np.sqrt(Iy * Cw) / Sx) / 10,
+    }
+
+def fill_columns(cols):
+    """
+    Complete catalog columns (NumPy arrays, NaN = blank) in one vectorized pass.
+    Tabulated W / Ix / Zx / Iy / Zy / r are kept where given; blanks come from the
+    engine (r from W when W is given, else 0 = welded). DERIVED columns use the
+    tabulated Ix / Iy, so Sx, ry, Cw and r_ts agree with the catalog values.
+    """
+    D, B, tw, tf = (_arr(cols[k]) for k in DIMENSIONS)
+    get = lambda k: _arr(cols[k]) if cols.get(k) is not None else np.full(np.broadcast(D, B, tw, tf).shape, np.nan)
+    W, r = get("W"), get("r")
+    r = np.where(np.isfinite(r), r, np.where(np.isfinite(W), fillet_from_weight(D, B, tw, tf, W), 0.0))
+
+    eng = section_properties(D, B, tw, tf, r)
+    out = {k: cols[k] for k in DIMENSIONS}
+    out["r"] = r
+    for k in ("W", "Ix", "Zx", "Iy", "Zy"):
+        v = get(k)
+        out[k] = np.where(np.isfinite(v), v, eng[k])
+
+    Ix, Iy = out["Ix"], out["Iy"]
+    A = eng["A"]
+    Sx = Ix / (D / 20)                    # cm3 (D/2 in cm)
+    Cw = Iy * (eng["h0"])**2 / 4
+    out.update({
+        "A": A, "Sx": Sx, "Sy": Iy / (B / 20),
+        "rx": np.sqrt(Ix / A), "ry": np.sqrt(Iy / A),
+        "J": eng["J"], "Cw": Cw, "rts": np.sqrt(np.sqrt(Iy * Cw) / Sx),
+    })
+    return out
+
+def complete_props(props):
+    """
+    props (one section dict, or a dict of arrays) with every PROPERTY_KEYS entry present.
+    Returned unchanged when already complete (catalogs store the derived values).
+    """
+    if all(k in props for k in DERIVED):
+        return props
+    missing = [k for k in DIMENSIONS if k not in props]
+    if missing:
+        raise KeyError(f"Section properties need {', '.join(missing)} [mm]")
+    filled = fill_columns(props)
+    if any(np.ndim(props[k]) for k in DIMENSIONS):
+        return {**props, **filled}
+    # One section: keep the tabulated numbers as written (int stays int for display)
+    keep = lambda k: k in props and np.isfinite(props[k])
+    return {**props, **{k: float(v) for k, v in filled.items() if not keep(k)}}
+
+# ==========================================
+# 🔍 BULK VALIDATION (catalog vs. engine)
+# ==========================================
+def check_properties(cols, tol=0.05):
+    """
+    Compare tabulated properties with the engine (root radius from `r` or W).
+    Returns {'r': ..., 'Ix': ratio, 'Zx': ratio, 'Zx_Sx': ratio, 'Iy': ratio, 'Zy': ratio,
+    'note': [str per row]}; ratio = catalog / engine, NaN where the catalog is blank.
+    """
+    D, B, tw, tf = (_arr(cols[k]) for k in DIMENSIONS)
+    r_given = _arr(cols["r"]) if cols.get("r") is not None else np.full(D.shape, np.nan)
+    W = _arr(cols["W"]) if cols.get("W") is not None else np.full(D.shape, np.nan)
+    r = np.where(np.isfinite(r_given), r_given,
+                 np.where(np.isfinite(W), fillet_from_weight(D, B, tw, tf, W), 0.0))
+    eng = section_properties(D, B, tw, tf, r)
+
+    out = {"r": r}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for k in ("W", "Ix", "Zx", "Iy", "Zy"):
+            v = _arr(cols[k]) if cols.get(k) is not None else np.full(D.shape, np.nan)
+            out[k] = v / eng[k]
+        out["Zx_Sx"] = out["Zx"] * eng["Zx"] / eng["Sx"]
+
+    off = lambda ratio: np.isfinite(ratio) & (np.abs(ratio - 1) > tol)
+    notes = [[] for _ in range(len(D))]
+    def note(mask, text):
+        for i in np.nonzero(mask)[0]:
+            notes[i].append(text)
+
+    note(np.isfinite(r_given) & off(out["W"]), "W ≠ plate + fillet area")
+    note(~np.isfinite(r_given) & np.isfinite(W) & (W < _plate_area(D, B, tw, tf) * KG_PER_MM2 * (1 - tol)),
+         "W below the plate-only weight")
+    note(off(out["Ix"]), "Ix off")
+    zx_elastic = off(out["Zx"]) & ~off(out["Zx_Sx"])
+    note(zx_elastic, "Zx matches elastic Sx")
+    note(off(out["Zx"]) & ~zx_elastic, "Zx off")
+    note(off(out["Iy"]), "Iy off")
+    note(off(out["Zy"]) & off(out["Zy"] * eng["Zy"] / eng["Sy"]), "Zy off")
+    out["note"] = ["; ".join(n) for n in notes]
+    return out
+
+if __name__ == "__main__":
+    import sys
+    from database import SYS_H_BEAMS, sorted_sections, section_arrays
+    if len(sys.argv) > 1:
+        from catalog import parse_catalog
+        names, cols, _ = parse_catalog(sys.argv[1])
+    else:
+        names = sorted_sections(SYS_H_BEAMS)
+        cols = section_arrays(names, SYS_H_BEAMS)
+    chk = check_properties(cols)
+    print(f"{'Section':<24}{'r':>6}{'Ix':>7}{'Zx':>7}{'Iy':>7}{'Zy':>7}  Note")
+    for i, name in enumerate(names):
+        print(f"{name:<24}{chk['r'][i]:>6.1f}" + "".join(f"{chk[k][i]:>7.3f}" for k in ("Ix", "Zx", "Iy", "Zy"))
+              + f"  {chk['note'][i]}")
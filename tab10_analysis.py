@@ -0,0 +1,90 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from database import SYS_H_BEAMS
+from envelope import MODE_NAMES
+from beam_analysis import LOAD_TYPES, check_patterns
+
+LOAD_LABELS = {"point": "Point P (kg)", "udl": "Uniform w (kg/m)", "linear": "Linear w1 → w2 (kg/m)"}
+
+def default_loads(L):
+    return pd.DataFrame([
+        {"type": "udl", "w1 / P": 500.0, "w2": float('nan'), "a (m)": 0.0, "b (m)": L},
+        {"type": "point", "w1 / P": 2000.0, "w2": float('nan'), "a (m)": round(L / 3, 2), "b (m)": float('nan')},
+    ])
+
+def editor_patterns(df, L):
+    """Editor rows -> one beam_analysis pattern (blank a / b = supports, blank w2 = w1)"""
+    loads = []
+    for row in df.to_dict("records"):
+        kind, v = row.get("type"), row.get("w1 / P")
+        if kind not in LOAD_TYPES or pd.isna(v):
+            continue
+        a = 0.0 if pd.isna(row.get("a (m)")) else float(row["a (m)"])
+        b = L if pd.isna(row.get("b (m)")) else float(row["b (m)"])
+        if kind == "point":
+            loads.append({"type": "point", "P": float(v), "a": a})
+        else:
+            w2 = float(v) if kind == "udl" or pd.isna(row.get("w2")) else float(row["w2"])
+            loads.append({"type": kind, "w": float(v), "w1": float(v), "w2": w2, "a": a, "b": b})
+    return [{"L_m": L, "loads": loads}]
+
+def diagram_figure(r, section, L):
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.06,
+                        subplot_titles=("Shear V (kg)", "Moment M (kg·m)", "Deflection δ (mm)"))
+    x = r['x'][0]
+    for i, (key, color) in enumerate((("V", '#d9534f'), ("M", '#f0ad4e'), ("delta", '#5cb85c')), start=1):
+        fig.add_trace(go.Scatter(x=x, y=r[key][0], fill='tozeroy', line=dict(color=color, width=2),
+                                 hovertemplate="x = %{x:.2f} m<br>%{y:,.1f}<extra></extra>", showlegend=False),
+                      row=i, col=1)
+    fig.add_hline(y=r['delta_allow'][0], line_dash="dash", line_color="red", row=3, col=1,
+                  annotation_text=f"L/{int(round(L * 1000 / r['delta_allow'][0]))}")
+    fig.update_yaxes(autorange="reversed", row=3, col=1)   # deflected shape points down
+    fig.update_xaxes(title_text="x (m)", row=3, col=1)
+    fig.update_layout(title=f"Analysis Diagrams: {section}, L = {L:.2f} m", height=750,
+                      template="plotly_white", margin=dict(l=10, r=10, t=70, b=10))
+    return fig
+
+def render_tab10(section, props, L_input, method, Fy, E_gpa, def_val, catalog=SYS_H_BEAMS):
+    st.markdown(f"### 📉 General Load Analysis: {section}")
+    st.caption(f"Simply supported, L = {L_input:.2f} m (sidebar), unbraced length = span. "
+               "Loads in kg / kg/m on the basis of the design method; a / b in m from the left support "
+               "(blank = support). Cb from the quarter-point moments (AISC F1-1).")
+
+    if st.session_state.get('tab10_span') != L_input:
+        st.session_state['tab10_span'] = L_input
+        st.session_state['tab10_loads'] = default_loads(L_input)
+        st.session_state.pop('tab10_editor', None)
+    loads = st.data_editor(st.session_state['tab10_loads'], num_rows="dynamic", use_container_width=True,
+                           key="tab10_editor", column_config={
+                               "type": st.column_config.SelectboxColumn("Type", options=list(LOAD_TYPES), required=True,
+                                                                       help=", ".join(LOAD_LABELS.values())),
+                               "w1 / P": st.column_config.NumberColumn("P (kg) / w1 (kg/m)", format="%.1f"),
+                               "w2": st.column_config.NumberColumn("w2 (kg/m, linear)", format="%.1f"),
+                               "a (m)": st.column_config.NumberColumn("a (m)", min_value=0.0, max_value=L_input, format="%.2f"),
+                               "b (m)": st.column_config.NumberColumn("b (m)", min_value=0.0, max_value=L_input, format="%.2f"),
+                           })
+    self_weight = st.checkbox(f"Include self-weight ({props['W']} kg/m)", value=True, key="tab10_sw")
+
+    try:
+        r = check_patterns(editor_patterns(loads, L_input), props, Fy, E_gpa, method, def_val,
+                           self_weight=self_weight, diagrams=True)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return
+
+    util = r['util'][0]
+    m1, m2, m3, m4, m5 = st.columns(5)
+    m1.metric("Utilization", f"{util:.2f}", delta="PASS" if util <= 1.0 else "FAIL",
+              delta_color="normal" if util <= 1.0 else "inverse")
+    m2.metric("V max / V des", f"{r['V_max'][0]:,.0f} / {r['V_des'][0]:,.0f} kg")
+    m3.metric("M max / M des", f"{r['M_max'][0]:,.0f} / {r['M_des'][0]:,.0f} kg·m",
+              help=f"M max at x = {r['x_Mmax'][0]:.2f} m")
+    m4.metric("δ max / allow", f"{r['delta_max'][0]:.1f} / {r['delta_allow'][0]:.1f} mm")
+    m5.metric("Cb", f"{r['Cb'][0]:.3f}", help=f"LTB Zone {int(r['zone'][0])}")
+    st.caption(f"Governing: **{MODE_NAMES[r['mode'][0]]}** | shear {r['util_V'][0]:.2f}, "
+               f"moment {r['util_M'][0]:.2f}, deflection {r['util_d'][0]:.2f} | "
+               f"reactions R_A = {r['R_A'][0]:,.0f} kg, R_B = {r['R_B'][0]:,.0f} kg")
+
+    st.plotly_chart(diagram_figure(r, section, L_input), use_container_width=True)
@@ -1,11 +1,34 @@
 import streamlit as st
+import streamlit.components.v1 as components
+from calculator import core_calculation
+from report_html import build_report_html
 
-def render_tab1(c, props, method, Fy, section):
+@st.cache_data(show_spinner=False, max_entries=128)
+def cached_report_html(section, props, L_m, method, Fy, E_gpa, def_limit):
+    """Whole report as one HTML/KaTeX document, built once per (section, span, criteria)"""
+    c = core_calculation(L_m, Fy, E_gpa, props, method, def_limit)
+    return build_report_html(section, props, c, method, Fy)
+
+def render_tab1(c, props, method, Fy, section, L_m, E_gpa, def_limit):
     """
     Function to render Tab 1: Detailed Calculation Sheet
     Updated to support dynamic Deflection Limit (L/180, L/240, L/360)
     """
     
+    # === REPORT MODE: one pre-rendered document instead of many elements ===
+    if st.toggle("📄 Report Mode (single HTML document)", key="tab1_report_mode",
+                 help="Render the whole report once as HTML/KaTeX (cached) - fast to redisplay and share"):
+        doc = cached_report_html(section, props, L_m, method, Fy, E_gpa, def_limit)
+        st.download_button("📥 Download Report (HTML)", doc.encode('utf-8'),
+                           file_name=f"Report_{section}_{method}_L{L_m:g}m.html", mime="text/html",
+                           help="Equations are typeset by KaTeX from cdn.jsdelivr.net: "
+                                "opening the file needs network access")
+        st.caption("ℹ️ The HTML file loads KaTeX from the internet to typeset the equations "
+                   "(offline it shows the raw TeX). For offline sharing use the Calculation Book (PDF) "
+                   "in the Master Catalog tab.")
+        components.html(doc, height=2600, scrolling=True)
+        return
+
     st.markdown(f"### 📄 Engineering Report: {section} ({method})")
     
     # === DATA SOURCE TRACING ===
@@ -1,31 +1,32 @@
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
+from database import SYS_H_BEAMS, section_arrays, sorted_sections
+from envelope import adaptive_envelope, batch_envelopes, mode_segments, MODE_NAMES
 
-def render_tab2(c, props, section, L_input, def_val, final_w):
+def render_tab2(c, props, section, L_input, def_val, final_w, method, Fy, E_gpa, catalog=SYS_H_BEAMS):
     """
     Render Behavior Graph (Capacity Envelope)
+    The moment curve follows Mn(L) (LTB zones change along the span axis).
     """
+    view = st.radio("View", ["Single Section", "Compare Sections"], horizontal=True, key="tab2_view")
+    if view == "Compare Sections":
+        render_comparison(section, method, Fy, E_gpa, def_val, catalog)
+        return
+    
     st.subheader(f"📈 Capacity Envelope Analysis: {section}")
     st.caption(f"Load Capacity Envelope (Deflection Limit: **L/{def_val}**)")
 
     # 1. Prepare X-axis (Span)
     L_max = max(15, c['L_md']*1.2, L_input*1.5)
-    x = np.linspace(0.5, L_max, 400)
-    
-    # 2. Calculate Capacities at each x
-    # Shear Limit (Inverse relationship with x)
-    ys = (2 * c['V_des'] / (x*100)) * 100 
-    
-    # Moment Limit (Inverse square relationship with x)
-    ym = (8 * c['M_des'] / (x*100)**2) * 100 
     
-    # Deflection Limit (Inverse cubic relationship with x)
-    k_def = (384 * c['E_ksc'] * props['Ix']) / (5 * def_val)
-    yd = (k_def / (x*100)**3) * 100
+    # 2. Calculate Capacities (adaptive sampling around Lp/Lr and mode changes)
+    env = adaptive_envelope(Fy, E_gpa, props, method, def_val, 0.5, L_max)
+    x = env['x']
+    ys, ym, yd = env['ws'], env['wm'], env['wd']
     
     # 3. Determine Governing Curve
-    y_gov = np.minimum(np.minimum(ys, ym), yd)
+    y_gov = env['w_gov']
     y_lim = max(y_gov) * 1.5 
     
     # 4. Plotting
@@ -72,19 +73,17 @@ def render_tab2(c, props, section, L_input, def_val, final_w):
         name='Your Design'
     ))
 
-    # 5. Add Zone Annotations (Vertical Areas)
-    # Shear Zone
-    fig.add_vrect(x0=0, x1=c['L_vm'], fillcolor="#d9534f", opacity=0.05, layer="below", line_width=0)
-    if c['L_vm'] > 0:
-        fig.add_annotation(x=c['L_vm']/2, y=y_lim*0.9, text="SHEAR", showarrow=False, font=dict(color="#d9534f", weight="bold"))
+    # 5. Add Zone Annotations (Vertical Areas, from the actual governing mode)
+    zone_colors = ["#d9534f", "#f0ad4e", "#5cb85c"]
+    for x0, x1, mode in mode_segments(x, env['mode']):
+        fig.add_vrect(x0=0 if x0 == x[0] else x0, x1=x1, fillcolor=zone_colors[mode], opacity=0.05, layer="below", line_width=0)
+        fig.add_annotation(x=(x0+x1)/2, y=y_lim*0.9, text=MODE_NAMES[mode].upper(), showarrow=False, font=dict(color=zone_colors[mode], weight="bold"))
     
-    # Moment Zone
-    fig.add_vrect(x0=c['L_vm'], x1=c['L_md'], fillcolor="#f0ad4e", opacity=0.05, layer="below", line_width=0)
-    fig.add_annotation(x=(c['L_vm']+c['L_md'])/2, y=y_lim*0.9, text="MOMENT", showarrow=False, font=dict(color="#f0ad4e", weight="bold"))
-    
-    # Deflection Zone
-    fig.add_vrect(x0=c['L_md'], x1=L_max, fillcolor="#5cb85c", opacity=0.05, layer="below", line_width=0)
-    fig.add_annotation(x=(c['L_md']+L_max)/2, y=y_lim*0.9, text="DEFLECTION", showarrow=False, font=dict(color="#5cb85c", weight="bold"))
+    # LTB limits (Moment curve changes formula here)
+    for name, val in env['breaks'].items():
+        if 0.5 < val < L_max:
+            fig.add_vline(x=val, line=dict(color="#f0ad4e", width=1, dash="dot"),
+                          annotation_text=f"{name}={val:.2f} m", annotation_position="bottom right")
 
     # 6. Final Layout
     fig.update_layout(
@@ -99,3 +98,67 @@ def render_tab2(c, props, section, L_input, def_val, final_w):
     )
     
     st.plotly_chart(fig, use_container_width=True)
+
+def render_comparison(section, method, Fy, E_gpa, def_val, catalog=SYS_H_BEAMS):
+    """
+    Overlay the governing envelopes of many sections (one batched evaluation, WebGL traces)
+    """
+    st.subheader("📈 Section Comparison: Governing Envelopes")
+    
+    all_sections = sorted_sections(catalog)
+    c1, c2 = st.columns([3, 2])
+    with c1:
+        chosen = st.multiselect("Sections", all_sections, default=all_sections, key="tab2_cmp_sections")
+    with c2:
+        L_lo, L_hi = st.slider("Span Range (m)", 0.5, 30.0, (1.0, 15.0), 0.5, key="tab2_cmp_range")
+    st.caption("Best section = highest capacity per kg of steel (capacity alone always picks the heaviest).")
+    
+    if not chosen:
+        st.info("Select at least one section.")
+        return
+    
+    # 1. One batched pass: sections × spans
+    x = np.linspace(L_lo, L_hi, 300)
+    arrays = section_arrays(chosen, catalog)
+    w_gov, mode = batch_envelopes(Fy, E_gpa, arrays, method, def_val, x)
+    
+    # 2. Best section at each span (capacity / weight)
+    score = w_gov / arrays['W'][:, None]
+    best_idx = np.argmax(score, axis=0)
+    best_names = np.array(chosen)[best_idx]
+    best_w = w_gov[best_idx, np.arange(len(x))]
+    
+    # 3. Plotting (Scattergl keeps many curves responsive)
+    fig = go.Figure()
+    for i, name in enumerate(chosen):
+        fig.add_trace(go.Scattergl(
+            x=x, y=w_gov[i], mode='lines', name=name,
+            line=dict(width=3 if name == section else 1.5),
+            customdata=np.array(MODE_NAMES)[mode[i]],
+            hovertemplate=f"<b>{name}</b><br>Span: %{{x:.2f}} m<br>Load: %{{y:,.0f}} kg/m<br>Mode: %{{customdata}}<extra></extra>"
+        ))
+    fig.add_trace(go.Scattergl(
+        x=x, y=best_w, mode='lines', name='Best (Capacity / Weight)',
+        line=dict(color='black', width=2, dash='dot'),
+        customdata=best_names,
+        hovertemplate="<b>Best: %{customdata}</b><br>Span: %{x:.2f} m<br>Load: %{y:,.0f} kg/m<extra></extra>"
+    ))
+    
+    fig.update_layout(
+        title=dict(text=f"Governing Capacity Envelopes ({method}, L/{def_val})", font=dict(size=20)),
+        height=650,
+        hovermode="closest",
+        xaxis_title="Span Length (m)",
+        yaxis_title="Load Capacity (kg/m)",
+        yaxis_type="log",
+        template="plotly_white"
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # 4. Best-section lookup
+    if L_lo < L_hi:
+        L_pick = st.slider("Look up best section at span (m)", L_lo, L_hi, (L_lo + L_hi) / 2, 0.05, key="tab2_cmp_pick")
+    else:
+        L_pick = L_lo   # single-span range: nothing to pick
+    k = int(np.argmin(np.abs(x - L_pick)))
+    st.success(f"**Best at {x[k]:.2f} m:** {best_names[k]} — {best_w[k]:,.0f} kg/m ({MODE_NAMES[mode[best_idx[k], k]]})")
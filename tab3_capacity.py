@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
-from calculator import core_calculation
+import numpy as np
+from calculator import core_calculation, core_calculation_vec
 
 def render_tab3(props, method, Fy, E_gpa, section, def_val=360):
     """
@@ -9,11 +10,18 @@ def render_tab3(props, method, Fy, E_gpa, section, def_val=360):
     """
     st.markdown(f"### 📊 Capacity Summary: {section} ({method})")
     
+    # Table Resolution
+    r1, r2 = st.columns([2, 1])
+    with r1:
+        L_lo, L_hi = st.slider("Span Range (m)", 0.5, 30.0, (1.0, 30.0), 0.5, key="tab3_range")
+    with r2:
+        L_step = st.select_slider("Span Step (m)", options=[1.0, 0.5, 0.25, 0.1, 0.05], value=1.0, key="tab3_step")
+    
     # Header Info
     c1, c2, c3 = st.columns(3)
     c1.info(f"**Limit Criteria:** L/{def_val}")
     c2.info(f"**Beam Weight:** {props['W']} kg/m")
-    c3.info(f"**Span Range:** 1 - 30 m")
+    c3.info(f"**Span Range:** {L_lo:g} - {L_hi:g} m (step {L_step:g} m)")
     
     st.markdown("---")
 
@@ -52,68 +60,44 @@ def render_tab3(props, method, Fy, E_gpa, section, def_val=360):
     $$ \\text{{Net Safe Load}} = \\text{{Min}}(\\text{{Shear}}, \\text{{Moment}}, \\text{{Deflection}}) - \\text{{Beam Weight}} ({props['W']} \\text{{ kg/m}}) $$
     """)
 
-    # Generate data for 1 - 30 meters
-    spans = range(1, 31) 
-    data = []
-
-    for L in spans:
-        # Core Calculation
-        c = core_calculation(float(L), Fy, E_gpa, props, method, def_val)
-        
-        # Gross Capacities
-        w_shear = c['ws']
-        w_moment = c['wm']
-        w_deflect = c['wd']
-        
-        # Find Governing Gross Capacity
-        gross_min = min(w_shear, w_moment, w_deflect)
-        
-        # Net Load Calculation (Ensure non-negative)
-        net_load = max(0, gross_min - props['W'])
-
-        # Determine Control Mode
-        if gross_min == w_shear: 
-            control_txt = "Shear"
-        elif gross_min == w_moment: 
-            control_txt = "Moment"
-        else: 
-            control_txt = f"Deflection"
-
-        # Append Data (English Headers)
-        data.append({
-            "Span Length (m)": f"{L:.1f}",
-            "✅ Net Safe Load (kg/m)": net_load,
-            "Governing Mode": control_txt,
-            "Shear Cap. (kg/m)": w_shear,
-            "Moment Cap. (kg/m)": w_moment,
-            "Deflection Limit (kg/m)": w_deflect
-        })
-
-    df = pd.DataFrame(data)
-
-    # Highlight Function
-    def highlight_mode(row):
-        mode = row['Governing Mode']
-        color = ''
-        if 'Shear' in mode: color = 'background-color: #ffe6e6' # Red tint
-        elif 'Moment' in mode: color = 'background-color: #fff4e6' # Orange tint
-        elif 'Deflection' in mode: color = 'background-color: #e6ffe6' # Green tint
-        return [color if col == 'Governing Mode' else '' for col in row.index]
+    # Generate data in one vectorized pass
+    spans = np.round(np.arange(L_lo, L_hi + L_step / 2, L_step), 2)
+    c = core_calculation_vec(spans, Fy, E_gpa, props, method, def_val)
+    
+    # Net Load Calculation (Ensure non-negative)
+    net_load = np.maximum(0, c['w_gov'] - props['W'])
+    
+    # Full-precision data (CSV)
+    df = pd.DataFrame({
+        "Span Length (m)": spans,
+        "✅ Net Safe Load (kg/m)": net_load,
+        "Governing Mode": np.array(["Shear", "Moment", "Deflection"])[c['mode']],
+        "Shear Cap. (kg/m)": c['ws'],
+        "Moment Cap. (kg/m)": c['wm'],
+        "Deflection Limit (kg/m)": c['wd'],
+    })
+    
+    # Pre-formatted display columns (plain dataframe, no Styler)
+    mode_labels = np.array(["🔴 Shear", "🟠 Moment", "🟢 Deflection"])
+    df_display = pd.DataFrame({
+        "Span Length (m)": spans,
+        "✅ Net Safe Load (kg/m)": np.round(net_load).astype(np.int64),
+        "Governing Mode": mode_labels[c['mode']],
+        "Shear Cap. (kg/m)": np.round(c['ws']).astype(np.int64),
+        "Moment Cap. (kg/m)": np.round(c['wm']).astype(np.int64),
+        "Deflection Limit (kg/m)": np.round(c['wd']).astype(np.int64),
+    })
 
     # Display Table
     st.dataframe(
-        df.style.apply(highlight_mode, axis=1).format({
-            "✅ Net Safe Load (kg/m)": "{:,.0f}",
-            "Shear Cap. (kg/m)": "{:,.0f}",
-            "Moment Cap. (kg/m)": "{:,.0f}",
-            "Deflection Limit (kg/m)": "{:,.0f}",
-        }),
+        df_display,
         use_container_width=True,
         hide_index=True,
         column_config={
-            "Span Length (m)": st.column_config.TextColumn(
+            "Span Length (m)": st.column_config.NumberColumn(
                 "Span Length (m)", 
-                help="Length of the beam span in meters."
+                help="Length of the beam span in meters.",
+                format="%.2f"
             ),
             "✅ Net Safe Load (kg/m)": st.column_config.NumberColumn(
                 "✅ Net Safe Load (kg/m)", 
@@ -143,11 +127,10 @@ def render_tab3(props, method, Fy, E_gpa, section, def_val=360):
         height=600
     )
     
-    # Export CSV
-    csv = df.to_csv(index=False).encode('utf-8')
+    # Export CSV (generated only when the button is clicked)
     st.download_button(
         label="📥 Download CSV Table",
-        data=csv,
+        data=lambda: df.to_csv(index=False).encode('utf-8'),
         file_name=f'Capacity_Table_{section}_L{def_val}.csv',
         mime='text/csv',
     )
@@ -1,9 +1,94 @@
 import streamlit as st
 import pandas as pd
-from database import SYS_H_BEAMS
-from calculator import core_calculation
+import numpy as np
+import plotly.graph_objects as go
+from database import SYS_H_BEAMS, section_arrays, sorted_sections
+from catalog import CACHE_HASH
+from calculator import core_calculation_vec
+from envelope import MODE_NAMES
+from export_catalog import FORMATS, METHODS, DEF_LIMITS, export_bytes
+from job_queue import ACTIVE, artifact_bytes, get_job, submit
+from report_pdf import PAGES, build_book
+from section_props import check_properties
 
-def render_tab4(method, Fy, E_gpa, def_limit):
+# Span grid of the comparison slider (the matrix is computed on exactly these spans)
+SPAN_MIN, SPAN_MAX, SPAN_STEP = 2.0, 20.0, 0.5
+
+@st.cache_data(show_spinner=False, max_entries=32, hash_funcs=CACHE_HASH)
+def capacity_matrix(method, Fy, E_gpa, def_limit, catalog=SYS_H_BEAMS):
+    """
+    Every section × every slider span in one broadcast pass (cached per criteria set).
+    Returns (sections, spans, data) with data['cap'], data['net'], data['mode'] shaped
+    (n_sections, n_spans) and the per-section critical lengths L_vm, L_md.
+    """
+    sections = sorted_sections(catalog)
+    spans = np.round(np.arange(SPAN_MIN, SPAN_MAX + SPAN_STEP / 2, SPAN_STEP), 2)
+    arrays = section_arrays(sections, catalog)
+    props = {k: v[:, None] for k, v in arrays.items()}
+    c = core_calculation_vec(spans[None, :], Fy, E_gpa, props, method, def_limit)
+    data = {
+        'W': arrays['W'],
+        'cap': c['w_gov'],
+        'net': np.maximum(0, c['w_gov'] - props['W']),
+        'mode': c['mode'],
+        'L_vm': np.broadcast_to(c['L_vm'], (len(sections), 1))[:, 0],
+        'L_md': np.broadcast_to(c['L_md'], (len(sections), 1))[:, 0],
+    }
+    return sections, spans, data
+
+@st.cache_data(hash_funcs=CACHE_HASH)
+def property_check(catalog=SYS_H_BEAMS, tol=0.05):
+    """Tabulated vs. computed properties for the whole catalog (ratio = catalog / engine)"""
+    sections = sorted_sections(catalog)
+    chk = check_properties(section_arrays(sections, catalog), tol)
+    return pd.DataFrame({
+        "Section": sections, "r (mm)": chk["r"],
+        "Ix": chk["Ix"], "Zx": chk["Zx"], "Zx / Sx": chk["Zx_Sx"], "Iy": chk["Iy"], "Zy": chk["Zy"],
+        "Note": chk["note"],
+    })
+
+def matrix_figure(sections, spans, data, compare_L):
+    """Heatmap of net capacity (hover shows governing mode), current span marked"""
+    modes = np.array(MODE_NAMES)[data['mode']]
+    fig = go.Figure(go.Heatmap(
+        x=spans, y=sections, z=data['net'], customdata=modes,
+        colorscale='Viridis', colorbar=dict(title="Net (kg/m)"),
+        hovertemplate="%{y} @ %{x:.1f} m<br>Net: %{z:,.0f} kg/m<br>Governing: %{customdata}<extra></extra>"
+    ))
+    # Mode boundaries (L_vm: Shear→Moment, L_md: Moment→Deflection)
+    fig.add_trace(go.Scatter(x=data['L_vm'], y=sections, mode='markers', name='Shear → Moment',
+                             marker=dict(symbol='line-ns-open', size=10, color='#d9534f', line=dict(width=3))))
+    fig.add_trace(go.Scatter(x=data['L_md'], y=sections, mode='markers', name='Moment → Deflection',
+                             marker=dict(symbol='line-ns-open', size=10, color='#5cb85c', line=dict(width=3))))
+    fig.add_vline(x=compare_L, line_width=2, line_dash="dash", line_color="white")
+    fig.update_layout(
+        height=max(450, 22 * len(sections)), template="plotly_white",
+        xaxis=dict(title="Span Length (m)", range=[spans[0] - SPAN_STEP / 2, spans[-1] + SPAN_STEP / 2]),
+        yaxis=dict(title="Section", type='category'),
+        legend=dict(orientation="h", y=1.02, x=0),
+        margin=dict(l=10, r=10, t=40, b=10)
+    )
+    return fig
+
+@st.fragment(run_every=1.0)
+def export_job_status(job_id):
+    """Progress of a queued bulk export; download of the stored file once done"""
+    job = get_job(job_id)
+    if job is None:
+        return
+    if job['status'] in ACTIVE:
+        st.progress(job['progress'], text=f"Job `{job_id}` ({job['status']}): {job['message']}")
+    elif job['status'] == "done":
+        fmt = job['result']['format']
+        _, ext, mime = FORMATS[fmt]
+        st.caption(f"Job `{job_id}` done: {job['result']['rows']:,} rows (stored, reused for identical exports)")
+        st.download_button(f"📥 Download {fmt} (job)", data=lambda: artifact_bytes(job),
+                           file_name=f"SYS_Catalog_Fy{job['params']['Fy']}{ext}", mime=mime,
+                           key="tab4_ex_job_download")
+    else:
+        st.error(f"Job `{job_id}` {job['status']}: {job['message']}")
+
+def render_tab4(method, Fy, E_gpa, def_limit, catalog=SYS_H_BEAMS):
     """
     Tab 4: Master Summary Table
     แสดงตารางเปรียบเทียบหน้าตัดทั้งหมด โดยอัปเดตตาม Deflection Limit ที่เลือก
@@ -17,53 +102,34 @@ def render_tab4(method, Fy, E_gpa, def_limit):
     with st.expander("⚙️ Comparison Settings (ตั้งค่าระยะเปรียบเทียบ)", expanded=True):
         col_inp1, col_inp2 = st.columns([1, 2])
         with col_inp1:
-            compare_L = st.slider("Select Span (m)", 2.0, 20.0, 6.0, 0.5)
+            compare_L = st.slider("Select Span (m)", SPAN_MIN, SPAN_MAX, 6.0, SPAN_STEP)
         with col_inp2:
             st.caption(f"Comparing capacity of all sections at Span = **{compare_L} m**")
+            view = st.radio("View", ["Table", "Matrix"], horizontal=True, key="tab4_view")
 
-    # --- Loop Calculation ---
-    data = []
-    
-    # Sort sections by size
-    sorted_sections = sorted(SYS_H_BEAMS.keys(), key=lambda x: int(x.split('x')[0].split('-')[1]))
-    
-    for section_name in sorted_sections:
-        props = SYS_H_BEAMS[section_name]
-        
-        # [IMPORTANT] ส่ง def_limit เข้าไปคำนวณหา Critical Lengths ใหม่
-        c_const = core_calculation(10.0, Fy, E_gpa, props, method, def_limit)
-        L_vm = c_const['L_vm']
-        L_md = c_const['L_md']
-        
-        # [IMPORTANT] คำนวณ Capacity ที่ระยะ compare_L โดยใช้ def_limit ใหม่
-        c_active = core_calculation(compare_L, Fy, E_gpa, props, method, def_limit)
-        
-        # หาค่า Control
-        cap_val = min(c_active['ws'], c_active['wm'], c_active['wd'])
-        
-        if cap_val == c_active['ws']: mode = "Shear"
-        elif cap_val == c_active['wm']: mode = "Moment"
-        else: mode = "Deflection"
-        
-        net_load = max(0, cap_val - props['W'])
-
-        data.append({
-            "Section": section_name,
-            "Weight": props['W'],
-            "L_Shear_End": L_vm,  
-            "L_Deflect_Start": L_md,
-            
-            # Display Strings
-            "Shear Zone": f"0 - {L_vm:.2f} m",
-            "Moment Zone": f"{L_vm:.2f} - {L_md:.2f} m",
-            "Deflect Zone": f"> {L_md:.2f} m",
-            
-            f"Cap @ {compare_L}m": int(cap_val),
-            f"Net @ {compare_L}m": int(net_load),
-            "Mode": mode
-        })
+    # --- Matrix (computed once per criteria set; the slider only picks a column) ---
+    sections, spans, mat = capacity_matrix(method, Fy, E_gpa, def_limit, catalog)
+    j = int(round((compare_L - SPAN_MIN) / SPAN_STEP))
+
+    if view == "Matrix":
+        st.plotly_chart(matrix_figure(sections, spans, mat, compare_L), use_container_width=True)
+
+    L_vm, L_md = mat['L_vm'], mat['L_md']
+    df = pd.DataFrame({
+        "Section": sections,
+        "Weight": mat['W'],
+        "L_Shear_End": L_vm,
+        "L_Deflect_Start": L_md,
+
+        # Display Strings
+        "Shear Zone": [f"0 - {a:.2f} m" for a in L_vm],
+        "Moment Zone": [f"{a:.2f} - {b:.2f} m" for a, b in zip(L_vm, L_md)],
+        "Deflect Zone": [f"> {b:.2f} m" for b in L_md],
 
-    df = pd.DataFrame(data)
+        f"Cap @ {compare_L}m": mat['cap'][:, j].astype(np.int64),
+        f"Net @ {compare_L}m": mat['net'][:, j].astype(np.int64),
+        "Mode": np.array(MODE_NAMES)[mat['mode'][:, j]],
+    })
 
     # --- Styling ---
     def highlight_mode(val):
@@ -106,3 +172,75 @@ def render_tab4(method, Fy, E_gpa, def_limit):
         file_name=f"Master_Catalog_{method}_L{def_limit}.csv",
         mime='text/csv',
     )
+
+    # --- Bulk Export (every section × span × method × deflection limit) ---
+    with st.expander("📦 Bulk Export (Parquet / Arrow / Excel)"):
+        e1, e2, e3, e4 = st.columns(4)
+        with e1:
+            ex_methods = st.multiselect("Methods", list(METHODS), default=list(METHODS), key="tab4_ex_methods")
+        with e2:
+            ex_limits = st.multiselect("Deflection Limits (L/…)", list(DEF_LIMITS), default=list(DEF_LIMITS), key="tab4_ex_limits")
+        with e3:
+            ex_step = st.select_slider("Span Step (m)", options=[1.0, 0.5, 0.25, 0.1], value=0.5, key="tab4_ex_step")
+        with e4:
+            ex_fmt = st.selectbox("Format", list(FORMATS), key="tab4_ex_fmt")
+
+        ex_spans = np.round(np.arange(1.0, 30.0 + 1e-9, ex_step), 2)
+        n_rows = len(catalog) * len(ex_spans) * len(ex_methods) * len(ex_limits)
+        st.caption(f"Span 1 - 30 m | **{n_rows:,} rows** | Fy = {Fy} ksc, E = {E_gpa} GPa "
+                   "(Arrow IPC files can be memory-mapped directly by pyarrow / polars / DuckDB)")
+        if ex_fmt == "XLSX" and n_rows > 200_000:
+            st.warning("⚠️ Large Excel exports are slow to write; Parquet or Arrow is recommended.")
+
+        _, ext, mime = FORMATS[ex_fmt]
+        st.download_button(
+            label=f"📥 Download {ex_fmt}",
+            data=lambda: export_bytes(ex_fmt, Fy, E_gpa, spans=ex_spans,
+                                      methods=tuple(ex_methods), def_limits=tuple(ex_limits), catalog=catalog),
+            file_name=f"SYS_Catalog_Fy{Fy}{ext}",
+            mime=mime,
+            disabled=not (ex_methods and ex_limits),
+            key="tab4_ex_download",
+        )
+        # Large exports: write the file in a background worker instead of this session
+        ex_params = {"fmt": ex_fmt, "Fy": Fy, "E_gpa": E_gpa, "spans": ex_spans.tolist(),
+                     "methods": list(ex_methods), "def_limits": list(ex_limits),
+                     "catalog": getattr(catalog, 'key', 'builtin')}
+        if st.button("⏳ Export as Background Job", disabled=not (ex_methods and ex_limits), key="tab4_ex_job"):
+            st.session_state['tab4_ex_job_id'] = submit("export", ex_params)
+        if st.session_state.get('tab4_ex_job_id'):
+            export_job_status(st.session_state['tab4_ex_job_id'])
+
+    # --- Calculation Book (vector PDF) ---
+    with st.expander("📚 Calculation Book (PDF)"):
+        b1, b2 = st.columns([2, 1])
+        with b1:
+            book_sections = st.multiselect("Sections (empty = whole catalog)", sections, key="tab4_book_sections")
+        with b2:
+            book_L = st.number_input("Span for calc sheets (m)", 1.0, 30.0, 6.0, 0.5, key="tab4_book_span")
+        page_labels = {"calc": "Calculation Sheet", "envelope": "Capacity Envelope", "connection": "Shear Tab Check"}
+        book_pages = st.multiselect("Pages per section", list(PAGES), default=list(PAGES),
+                                    format_func=page_labels.get, key="tab4_book_pages")
+        n_book = len(book_sections or sections)
+        st.caption(f"{n_book} sections × {len(book_pages)} pages | {method}, L/{def_limit} | rendered in parallel worker processes")
+        st.download_button(
+            label="📥 Download Calculation Book",
+            data=lambda: build_book(book_sections or sections, method, Fy, E_gpa, def_limit, book_L, pages=book_pages, catalog=catalog),
+            file_name=f"SYS_Calc_Book_{method}_L{def_limit}.pdf",
+            mime="application/pdf",
+            disabled=not book_pages,
+            key="tab4_book_download",
+        )
+
+    # --- Section property check (catalog vs. property engine) ---
+    with st.expander("🔍 Section Property Check"):
+        tol = st.select_slider("Tolerance", options=[0.02, 0.05, 0.10], value=0.05,
+                               format_func=lambda t: f"±{t:.0%}", key="tab4_chk_tol")
+        df_chk = property_check(catalog, tol)
+        flagged = df_chk["Note"] != ""
+        st.caption(f"Ratios = catalog / computed from D, B, tw, tf and root radius r "
+                   f"(r inferred from W where not listed) | **{int(flagged.sum())} of {len(df_chk)} sections flagged**")
+        only = st.checkbox("Flagged only", value=bool(flagged.any()), key="tab4_chk_only")
+        fmt = {k: st.column_config.NumberColumn(format="%.3f") for k in ("Ix", "Zx", "Zx / Sx", "Iy", "Zy")}
+        fmt["r (mm)"] = st.column_config.NumberColumn(format="%.1f")
+        st.dataframe(df_chk[flagged] if only else df_chk, use_container_width=True, hide_index=True, column_config=fmt)
@@ -2,78 +2,107 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from database import SYS_H_BEAMS
-from calculator import core_calculation
+from database import SYS_H_BEAMS, section_arrays
+from catalog import CACHE_HASH
+from calculator import core_calculation_vec
 
-def render_tab5(method, Fy, E_gpa, def_limit):
+# Series by flange width / depth ratio (JIS G 3192 style: H = wide, HM = medium, HN = narrow)
+SERIES = ["Wide (H)", "Medium (HM)", "Narrow (HN)"]
+SORT_KEYS = {"Depth": ["Depth", "Weight"], "Weight": ["Weight", "Depth"], "Name": ["Section"]}
+PAGE_SIZES = [25, 50, 100]
+ROW_HEIGHT = 24  # px per bar in the timeline
+
+def section_series(B, D):
+    """Series label per section from B/D"""
+    ratio = np.asarray(B, dtype=float) / np.asarray(D, dtype=float)
+    return np.select([ratio >= 0.8, ratio >= 0.6], SERIES[:2], SERIES[2])
+
+@st.cache_data(show_spinner=False, max_entries=32, hash_funcs=CACHE_HASH)
+def timeline_columns(method, Fy, E_gpa, def_limit, catalog=SYS_H_BEAMS):
+    """Timeline data of the whole catalog as vectorized columns (cached per criteria set)"""
+    names = list(catalog.keys())
+    arr = section_arrays(names, catalog)
+    c = core_calculation_vec(10.0, Fy, E_gpa, arr, method, def_limit)
+
+    # Critical Points
+    L_vm = np.broadcast_to(c['L_vm'], arr['D'].shape)  # Shear Limit
+    L_md = np.broadcast_to(c['L_md'], arr['D'].shape)  # Moment Limit / Deflection Start
+
+    # Load Scenarios: max load at the shear limit, span at 75% of it (moment based)
+    safe_vm = np.where(L_vm > 0, L_vm, 1.0)
+    w_max_shear_limit = np.where(L_vm > 0, (2 * c['V_des'] / (safe_vm * 100)) * 100, 0.0)
+    w_75 = 0.75 * w_max_shear_limit
+    safe_75 = np.where(w_75 > 0, w_75, 1.0)
+    L_75 = np.where(w_75 > 0, np.sqrt((8 * c['M_des']) / (safe_75 / 100)) / 100, 0.0)
+
+    # Auto-Scaling for Graph: Green Zone covers the L_75 point
+    visual_end_point = np.maximum(np.maximum(L_md, L_75) * 1.15, L_md + 1.0)
+
+    return pd.DataFrame({
+        "Section": names,
+        "Series": section_series(arr['B'], arr['D']),
+        "Depth": arr['D'],
+        "Weight": arr['W'],
+        "Ix": arr['Ix'],
+        # Graph Data
+        "L_shear": L_vm,
+        "L_moment_width": np.maximum(0, L_md - L_vm),
+        "L_deflect_width": np.maximum(0, visual_end_point - L_md),
+        # Reference Points
+        "Ref_Start_Moment": L_vm,
+        "Ref_Start_Deflect": L_md,
+        # Scenarios
+        "L_75": L_75,
+        "Max_Load": w_max_shear_limit,
+        "Load_75": w_75,
+    })
+
+def render_tab5(method, Fy, E_gpa, def_limit, catalog=SYS_H_BEAMS):
     st.markdown("### 📊 Master Structural Timeline")
     st.caption(f"Beam Behavior Analysis: Shear (Red) ➔ Moment (Orange) ➔ Deflection (Green) | Criteria: **L/{def_limit}**")
 
     # --- 1. Data Processing ---
-    all_sections = sorted(SYS_H_BEAMS.keys(), key=lambda x: int(x.split('x')[0].split('-')[1]))
-    data_list = []
-    
-    prog_bar = st.progress(0, text="Performing structural analysis...")
-    total = len(all_sections)
+    df_all = timeline_columns(method, Fy, E_gpa, def_limit, catalog)
 
-    for i, section_name in enumerate(all_sections):
-        props = SYS_H_BEAMS[section_name]
-        
-        # 1.1 Core Calculation
-        c = core_calculation(10.0, Fy, E_gpa, props, method, def_limit)
-        
-        # 1.2 Critical Points
-        L_vm = c['L_vm']  # Shear Limit
-        L_md = c['L_md']  # Moment Limit / Deflection Start
-        
-        # 1.3 Load Scenarios
-        if L_vm > 0:
-            # Max Load at Shear Limit (Strength Based)
-            w_max_shear_limit = (2 * c['V_des'] / (L_vm * 100)) * 100 
-        else:
-            w_max_shear_limit = 0
-            
-        w_75 = 0.75 * w_max_shear_limit
-        
-        # Span at 75% Load (Moment Based)
-        if w_75 > 0:
-            L_75 = np.sqrt((8 * c['M_des']) / (w_75 / 100)) / 100 
+    # --- 1.1 Filter / Sort (server side) ---
+    f1, f2, f3 = st.columns([2, 2, 1])
+    with f1:
+        series = st.multiselect("Series", SERIES, default=SERIES, key="tab5_series")
+    with f2:
+        d_min, d_max = float(df_all['Depth'].min()), float(df_all['Depth'].max())
+        if d_min < d_max:
+            depth = st.slider("Depth D (mm)", d_min, d_max, (d_min, d_max), 25.0, key="tab5_depth")
         else:
-            L_75 = 0
-
-        # 1.4 Auto-Scaling for Graph
-        # Ensure Green Zone covers the L_75 point
-        max_dist = max(L_md, L_75)
-        visual_end_point = max(max_dist * 1.15, L_md + 1.0) 
-        L_deflect_width = max(0, visual_end_point - L_md)
-
-        data_list.append({
-            "Section": section_name,
-            "Weight": props['W'],
-            "Ix": props['Ix'],
-            # Graph Data
-            "L_shear": L_vm,
-            "L_moment_width": max(0, L_md - L_vm),
-            "L_deflect_width": L_deflect_width,
-            # Reference Points
-            "Ref_Start_Moment": L_vm,
-            "Ref_Start_Deflect": L_md,
-            # Scenarios
-            "L_75": L_75,
-            "Max_Load": w_max_shear_limit,
-            "Load_75": w_75
-        })
-        prog_bar.progress((i + 1) / total, text=f"Analyzing {section_name}...")
-    
-    prog_bar.empty()
-    df = pd.DataFrame(data_list)
+            depth = (d_min, d_max)
+    with f3:
+        sort_by = st.selectbox("Sort by", list(SORT_KEYS), key="tab5_sort")
+        descending = st.toggle("Descending", value=False, key="tab5_desc")
+
+    mask = df_all['Series'].isin(series) & df_all['Depth'].between(*depth)
+    df = df_all[mask].sort_values(SORT_KEYS[sort_by], ascending=not descending, kind='stable').reset_index(drop=True)
+
+    if df.empty:
+        st.warning("⚠️ No sections match the current filter.")
+        return
+
+    # --- 1.2 Pagination: the chart only carries one page ---
+    p1, p2, p3 = st.columns([1, 1, 2])
+    with p1:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key="tab5_page_size")
+    n_pages = -(-len(df) // page_size)
+    with p2:
+        page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1, key="tab5_page")
+    page = min(int(page), n_pages)
+    start = (page - 1) * page_size
+    df_page = df.iloc[start:start + page_size]
+    p3.caption(f"Showing **{start + 1}-{start + len(df_page)}** of **{len(df)}** sections ({len(df_all)} in catalog)")
 
     # --- 2. Visualization ---
     fig = go.Figure()
 
     # Layer 1: Shear (Red)
     fig.add_trace(go.Bar(
-        y=df['Section'], x=df['L_shear'],
+        y=df_page['Section'], x=df_page['L_shear'],
         name='Shear Control', orientation='h',
         marker=dict(color='#d9534f', line=dict(width=0)),
         hovertemplate="<b>%{y}</b><br>🔴 <b>Shear Zone</b>: 0 - %{x:.2f} m<br><i>(Shear Force Controlled)</i><extra></extra>"
@@ -81,40 +110,40 @@ def render_tab5(method, Fy, E_gpa, def_limit):
 
     # Layer 2: Moment (Orange)
     fig.add_trace(go.Bar(
-        y=df['Section'], x=df['L_moment_width'],
+        y=df_page['Section'], x=df_page['L_moment_width'],
         name='Moment Control', orientation='h',
         marker=dict(color='#f0ad4e', line=dict(width=0)),
-        base=df['L_shear'],
+        base=df_page['L_shear'],
         hovertemplate="🟠 <b>Moment Zone</b>: %{base:.2f} - %{customdata:.2f} m<br><i>(Bending Moment Controlled)</i><extra></extra>",
-        customdata=df['Ref_Start_Deflect']
+        customdata=df_page['Ref_Start_Deflect']
     ))
 
     # Layer 3: Deflection (Green)
     # Using f-string for Python variables, double curly braces {{}} for Plotly variables
     fig.add_trace(go.Bar(
-        y=df['Section'], x=df['L_deflect_width'],
+        y=df_page['Section'], x=df_page['L_deflect_width'],
         name='Deflection Control', orientation='h',
         marker=dict(color='#5cb85c', opacity=0.4, line=dict(width=0)),
-        base=df['Ref_Start_Deflect'],
+        base=df_page['Ref_Start_Deflect'],
         hovertemplate=f"🟢 <b>Deflection Zone</b>: > %{{base:.2f}} m<br><i>(Check L/{def_limit} Limit)</i><extra></extra>"
     ))
 
     # Layer 4: 75% Point
     fig.add_trace(go.Scatter(
-        x=df['L_75'], y=df['Section'],
+        x=df_page['L_75'], y=df_page['Section'],
         mode='markers', name='Point @ 75%',
         marker=dict(symbol='diamond', size=9, color='#0275d8', line=dict(width=1, color='white')),
         hovertemplate="🔷 <b>Span @ 75% Load</b>: %{x:.2f} m<br>Load: %{customdata:,.0f} kg/m<extra></extra>",
-        customdata=df['Load_75']
+        customdata=df_page['Load_75']
     ))
 
     fig.update_layout(
         title="Structural Behavior Timeline",
-        barmode='stack', height=850,
+        barmode='stack', height=min(1400, 160 + ROW_HEIGHT * len(df_page)),
         xaxis_title="Span Length (m)", yaxis_title="Section Size",
         legend=dict(orientation="h", y=1.02, x=1, xanchor="right"),
         template="plotly_white",
-        yaxis=dict(categoryorder='array', categoryarray=df['Section'].tolist()),
+        yaxis=dict(categoryorder='array', categoryarray=df_page['Section'].tolist()),
         margin=dict(l=10, r=10, t=80, b=10)
     )
     st.plotly_chart(fig, use_container_width=True)
@@ -125,14 +154,16 @@ def render_tab5(method, Fy, E_gpa, def_limit):
     
     df_display = df.copy()
     # Formatting ranges as strings
-    df_display['Moment Range'] = df.apply(lambda r: f"{r['Ref_Start_Moment']:.2f} - {r['Ref_Start_Deflect']:.2f}", axis=1)
-    df_display['Deflect Start'] = df.apply(lambda r: f"> {r['Ref_Start_Deflect']:.2f}", axis=1)
+    df_display['Moment Range'] = [f"{a:.2f} - {b:.2f}" for a, b in zip(df['Ref_Start_Moment'], df['Ref_Start_Deflect'])]
+    df_display['Deflect Start'] = [f"> {b:.2f}" for b in df['Ref_Start_Deflect']]
 
     st.dataframe(
         df_display,
         use_container_width=True, height=600, hide_index=True,
         column_config={
             "Section": st.column_config.TextColumn("Section", pinned=True),
+            "Series": st.column_config.TextColumn("Series", width="small"),
+            "Depth": st.column_config.NumberColumn("D (mm)", format="%d"),
             "Weight": st.column_config.NumberColumn("Wt (kg/m)", format="%.1f"),
             "Ix": st.column_config.NumberColumn("Ix (cm⁴)", format="%d"),
             "L_shear": st.column_config.NumberColumn("Shear Limit", format="%.2f", help="End of Shear Zone (m)"),
@@ -146,8 +177,8 @@ def render_tab5(method, Fy, E_gpa, def_limit):
         }
     )
     
-    csv = df_display.to_csv(index=False).encode('utf-8')
-    st.download_button("📥 Download Data CSV", csv, "SYS_Full_Data.csv", "text/csv")
+    st.download_button("📥 Download Data CSV", lambda: df_display.to_csv(index=False).encode('utf-8'),
+                       "SYS_Full_Data.csv", "text/csv")
 
     # --- 4. Methodology ---
     st.markdown("---")
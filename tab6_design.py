@@ -1,40 +1,30 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from database import SYS_H_BEAMS
-from drawer_3d import create_connection_figure
+from database import SYS_H_BEAMS, sorted_sections
+from drawer_3d import create_connection_figure, connection_meshes, geometry_key
+from export_3d import glb_bytes, stl_bytes
 import calculator_tab as calc 
-
-# ==========================================
-# 📐 HELPER FUNCTIONS
-# ==========================================
-def get_max_rows(beam_d, beam_tf, k_dist, margin_top, margin_bot, pitch, lev):
-    """คำนวณจำนวนแถวน็อตสูงสุดที่เป็นไปได้"""
-    workable_depth = beam_d - (2 * k_dist) 
-    available_h = beam_d - (2 * beam_tf) - margin_top - margin_bot
-    if available_h <= (2 * lev): return 0
-    max_n = int(((available_h - (2 * lev)) / pitch) + 1)
-    return max(0, max_n)
+from connection_geometry import get_row_limits
 
 # ==========================================
 # 🏗️ MAIN UI RENDERER
 # ==========================================
-def render_tab6(method, Fy, E_gpa, def_limit):
+def render_tab6(method, Fy, E_gpa, def_limit, catalog=SYS_H_BEAMS):
     st.markdown("### 🏗️ Shear Plate Design (Detailed Report)")
     col_input, col_viz = st.columns([1.3, 2.5])
 
     # --- 1. INPUT SECTION ---
     with col_input:
         with st.expander("1️⃣ Host Beam & Load", expanded=True):
-            sec_name = st.selectbox("Section", list(SYS_H_BEAMS.keys()))
-            beam = SYS_H_BEAMS[sec_name]
+            sec_name = st.selectbox("Section", sorted_sections(catalog))
+            beam = catalog[sec_name]
             
             # Extract Beam Props
             d_factor = 10 if beam['D'] < 100 else 1
             bm_D = beam['D'] * d_factor
-            bm_Tw = beam.get('t1', 6.0)
-            bm_Tf = beam.get('t2', 9.0)
-            k_des = 30 
+            bm_Tw = beam['tw']
+            bm_Tf = beam['tf']
             
             st.caption(f"D:{bm_D:.0f} | Tw:{bm_Tw} | Tf:{bm_Tf}")
             
@@ -54,12 +44,17 @@ def render_tab6(method, Fy, E_gpa, def_limit):
             lev = st.number_input("V-Edge (Lev)", value=int(1.5*d_b))
             
             # Row Logic
-            max_rows = get_max_rows(bm_D, bm_Tf, k_des, 10, 10, pitch, lev)
+            limits = get_row_limits(beam, d_b, pitch=pitch, lev=lev)
+            max_rows = limits['max_rows']
+            if not limits['feasible']:
+                st.warning(f"Clear web height {limits['clear_h']:.0f} mm fits < 2 rows at this pitch/edge.")
             n_rows = st.number_input("Rows", min_value=2, max_value=max(2, max_rows), value=max(2, min(3, max_rows)))
             
             st.markdown("---")
             setback = st.slider("Setback", 0, 25, 12)
             leh = st.number_input("H-Edge (Leh)", value=40)
+            bolt_group = st.radio("Bolt Group", ["Concentric", "IC"], horizontal=True,
+                                  help="IC = Instantaneous Center method with eccentricity e = Setback + Leh")
 
         with st.expander("3️⃣ Plate & Weld", expanded=True):
             # Width Logic
@@ -86,6 +81,7 @@ def render_tab6(method, Fy, E_gpa, def_limit):
         'bolt_dia': d_b, 'bolt_grade': bolt_grade,
         'n_rows': n_rows, 'pitch': pitch,
         'lev': lev, 'leh': leh, 
+        'setback': setback, 'bolt_group': bolt_group,
         'weld_sz': weld_sz
     }
     
@@ -119,6 +115,14 @@ def render_tab6(method, Fy, E_gpa, def_limit):
                 st.plotly_chart(fig, use_container_width=True)
             except Exception as e:
                 st.error(f"❌ Error Plotting: {e}")
+            
+            # Offline viewers (built only when the button is clicked)
+            key = geometry_key(beam_dims, plate_dims, bolt_dims, config)
+            dl1, dl2 = st.columns(2)
+            dl1.download_button("📥 Download glTF (.glb)", data=lambda: glb_bytes(connection_meshes(key)),
+                                file_name=f"ShearTab_{sec_name}.glb", mime="model/gltf-binary")
+            dl2.download_button("📥 Download STL", data=lambda: stl_bytes(connection_meshes(key)),
+                                file_name=f"ShearTab_{sec_name}.stl", mime="model/stl")
 
         with tab2:
             st.markdown("#### 📐 Engineering Calculation Report (AISC LRFD)")
@@ -2,112 +2,30 @@ import streamlit as st
 import pandas as pd
 import math
 from database import SYS_H_BEAMS
-from calculator import core_calculation
-from calculator_tab import calculate_shear_tab
+from connection_solver import solve_typical, typical_geometry
+from assembly_3d import create_assembly_figure, build_assembly_meshes, grid_placements
+from export_3d import glb_bytes, stl_bytes
+from job_queue import ACTIVE, cancel, get_job, params_hash, submit
 
-def solve_connection(beam_props, Vu_target, method):
-    """
-    Super Solver Algorithm:
-    พยายามหา Connection ที่ 'เล็กที่สุด' ที่ผ่านเงื่อนไข
-    โดยการปรับตัวแปร: Rows -> Plate/Weld -> Bolt Size
-    """
-    # --- 1. Geometry Constraints ---
-    D = beam_props['D']
-    Tf = beam_props.get('t2', 10)
-    Tw = beam_props.get('t1', 6)
-    
-    # กำหนด Option ความเป็นไปได้ (เรียงจากเล็กไปใหญ่)
-    # Bolt Options: (Dia, Min_Plate_T, Min_Weld)
-    bolt_options = [
-        {'dia': 12.0, 'p_t': 6.0,  'w_sz': 4.0}, # สำหรับคานเล็กมาก
-        {'dia': 16.0, 'p_t': 9.0,  'w_sz': 6.0},
-        {'dia': 20.0, 'p_t': 10.0, 'w_sz': 6.0},
-        {'dia': 22.0, 'p_t': 12.0, 'w_sz': 8.0},
-        {'dia': 24.0, 'p_t': 12.0, 'w_sz': 8.0},
-        {'dia': 27.0, 'p_t': 16.0, 'w_sz': 10.0},
-        {'dia': 30.0, 'p_t': 19.0, 'w_sz': 12.0}
-    ]
-    
-    # เลือกจุดเริ่มต้นตามขนาดคาน (Best Practice)
-    start_idx = 0
-    if D >= 600: start_idx = 4 # Start M24
-    elif D >= 400: start_idx = 2 # Start M20
-    elif D >= 200: start_idx = 1 # Start M16
-    
-    # --- 2. Optimization Loop ---
-    # Loop 1: ไล่ขนาดน็อตจาก (แนะนำ -> ใหญ่สุด)
-    for b_idx in range(start_idx, len(bolt_options)):
-        opt = bolt_options[b_idx]
-        bolt_dia = opt['dia']
-        
-        # Geometry Parameters
-        pitch = 3 * bolt_dia
-        lev = 1.5 * bolt_dia
-        leh = 35 # Standard edge
-        margin = 10
-        
-        # คำนวณ Max Rows ที่ใส่ได้ในหน้าตัดนี้
-        clear_h = D - (2 * Tf) - (2 * margin)
-        max_rows_geo = int(((clear_h - (2 * lev)) / pitch) + 1)
-        max_rows_geo = max(2, max_rows_geo) # อย่างน้อย 2
-        
-        # Loop 2: เพิ่มจำนวนแถว (2 -> Max)
-        for rows in range(2, max_rows_geo + 1):
-            
-            # Loop 3: เพิ่มความหนาเพลท/รอยเชื่อม (Normal -> Heavy)
-            # กรณีที่น็อตผ่าน แต่เพลทฉีก หรือรอยเชื่อมไม่พอ เราจะลองเพิ่มความหนาดู
-            plate_steps = [
-                {'t': opt['p_t'],      'w': opt['w_sz']},       # Standard
-                {'t': opt['p_t'] + 3,  'w': opt['w_sz'] + 2},   # Stronger
-                {'t': opt['p_t'] + 6,  'w': opt['w_sz'] + 4},   # Extra Strong
-                {'t': 25.0,            'w': 14.0}               # Maximum Limit
-            ]
-            
-            for p_step in plate_steps:
-                plate_t = p_step['t']
-                weld_sz = p_step['w']
-                plate_h = (2 * lev) + ((rows - 1) * pitch)
-                
-                inputs = {
-                    'load': Vu_target,
-                    'method': method,
-                    'beam_tw': Tw, 'beam_mat': "SS400", 
-                    'plate_t': plate_t, 'plate_h': plate_h, 'plate_mat': "SS400",
-                    'bolt_dia': bolt_dia, 'bolt_grade': "A325",
-                    'n_rows': rows, 'pitch': pitch,
-                    'lev': lev, 'leh': leh, 
-                    'weld_sz': weld_sz
-                }
-                
-                try:
-                    res = calculate_shear_tab(inputs)
-                    if res['summary']['status'] == "PASS":
-                        # เย้! เจอแล้ว ส่งคำตอบกลับทันที (เพราะเราเริ่มจากตัวเล็กสุดเสมอ)
-                        return {
-                            "Rows": rows,
-                            "Bolt": f"M{int(bolt_dia)}",
-                            "Plate": f"{int(plate_t)}x{int(plate_h)}",
-                            "Weld": f"{int(weld_sz)}",
-                            "Ratio": res['summary']['utilization'],
-                            "Note": "Optimized",
-                            "Status": "✅ PASS"
-                        }
-                except:
-                    continue
-                    
-    # --- 3. Fallback (ถ้าหาทางไม่ได้จริงๆ) ---
-    # จะเกิดขึ้นยากมาก นอกจากคานเล็กจิ๋วแต่รับแรงมหาศาล
-    return {
-        "Rows": max_rows_geo,
-        "Bolt": f"M{int(bolt_options[-1]['dia'])}", # ใช้ใหญ่สุด
-        "Plate": "Check Detail",
-        "Weld": "Check Detail",
-        "Ratio": 9.99,
-        "Note": "Exceed Capacity",
-        "Status": "❌ FAIL"
-    }
+BACKGROUND_MIN = 200 # catalogs larger than this default to the background job queue
 
-def render_tab7(method, Fy, E_gpa, def_val):
+@st.fragment(run_every=1.0)
+def background_status(job_id):
+    """Poll the queued solve; rerun the page once it has finished"""
+    job = get_job(job_id)
+    if job is None:
+        st.warning(f"Job `{job_id}` not found.")
+        return
+    if job['status'] in ACTIVE:
+        st.progress(job['progress'], text=f"Job `{job_id}` ({job['status']}): {job['message']}")
+        if job['partial']:
+            st.dataframe(pd.DataFrame(job['partial']).drop(columns="Detail"), use_container_width=True, height=300)
+        if st.button("⏹️ Cancel Job", key="tab7_job_cancel"):
+            cancel(job_id)
+        return
+    st.rerun()
+
+def render_tab7(method, Fy, E_gpa, def_val, catalog=SYS_H_BEAMS):
     st.markdown("### 🛠️ Intelligent Typical Detail Summary")
     st.markdown("""
     **Algorithm:** The system uses a **multi-variable solver** to find the most economical connection that passes.
@@ -115,55 +33,68 @@ def render_tab7(method, Fy, E_gpa, def_val):
     2. **Optimization Strategy:** Try Standard Config → Increase Rows → Upgrade Plate/Weld → Upgrade Bolt Size.
     """)
     
-    # Progress Bar Setup
-    progress_text = "Running AI Solver for all sections..."
-    my_bar = st.progress(0, text=progress_text)
+    bolt_group = st.radio("Bolt Group Analysis", ["Concentric", "IC"], horizontal=True,
+                          help="IC = Instantaneous Center method (eccentricity = Setback + Leh)")
     
-    # Sort Beams
-    beams = sorted(SYS_H_BEAMS.keys(), key=lambda x: int(x.split('x')[0].split('-')[1]))
-    total = len(beams)
-    results = []
-
+    # Large catalogs: solve in the background job queue (survives reruns, result shared)
+    background = st.toggle("⏳ Run in background job", value=len(catalog) > BACKGROUND_MIN, key="tab7_background",
+                           help="Solve in a worker process. Progress can be followed from any session "
+                                "with the job ID; finished runs with the same criteria are reused.")
+    cat_key = getattr(catalog, 'key', 'builtin')
+    
+    total = len(catalog)
     col1, col2, col3 = st.columns(3)
     with col1:
         st.info(f"**Total Sections:** {total}")
     
-    # --- MAIN LOOP ---
-    pass_count = 0
-    
-    for i, section_name in enumerate(beams):
-        props = SYS_H_BEAMS[section_name]
-        
-        # 1. Core Calculation
-        c = core_calculation(6.0, Fy, E_gpa, props, method, def_val)
-        V_full = c['V_des']
-        V_target = 0.75 * V_full # Target 75%
-        
-        # 2. AI Solver Design
-        conn = solve_connection(props, V_target, method)
-        
-        if conn['Status'] == "✅ PASS":
-            pass_count += 1
+    if background:
+        params = {"method": method, "Fy": Fy, "E_gpa": E_gpa, "def_val": def_val,
+                  "bolt_group": bolt_group, "catalog": cat_key}
+        j1, j2 = st.columns([3, 1])
+        with j2:
+            if st.button("🔁 Re-run", key="tab7_job_rerun", help="Ignore the stored result and solve again"):
+                st.session_state['tab7_job_id'] = submit("typical", params, reuse=False)
+        with j1:
+            attach = st.text_input("Follow job ID", key="tab7_job_attach", placeholder="paste a job ID from another session")
+        followed = get_job(attach.strip()) if attach else None
+        if followed is not None and (followed['kind'] != "typical" or followed['params_hash'] != params_hash("typical", params)):
+            st.warning(f"Job `{attach.strip()}` is not a typical-detail run for the current criteria / catalog; "
+                       "showing this session's job.")
+            followed = None
+        if followed is not None:
+            job_id = followed['id']
+        else:
+            job_id = st.session_state.get('tab7_job_id')
+            job = get_job(job_id) if job_id else None
+            if job is None or job['params'] != params:
+                job_id = submit("typical", params)
+                st.session_state['tab7_job_id'] = job_id
+        job = get_job(job_id)
+        st.caption(f"Job ID: `{job_id}` | status: {job['status']}")
+        if job['status'] != "done":
+            if job['status'] in ACTIVE:
+                background_status(job_id)
+            else:
+                st.error(f"Job {job['status']}: {job['message']} (press Re-run to solve again)")
+            return
+        results = job['result']
+    else:
+        # Progress Bar Setup
+        progress_text = "Running AI Solver for all sections..."
+        my_bar = st.progress(0, text=progress_text)
         
-        # 3. Collect Data
-        results.append({
-            "Section": section_name,
-            "D": props['D'],
-            "Shear (100%)": V_full,
-            "Design (75%)": V_target,
-            "Zone (m)": f"{c['L_vm']:.2f}-{c['L_md']:.2f}",
-            "Bolt": conn['Bolt'],
-            "Rows": conn['Rows'],
-            "Plate (mm)": conn['Plate'],
-            "Weld (mm)": conn['Weld'],
-            "Ratio": conn['Ratio'],
-            "Status": conn['Status']
-        })
+        # Warm-start state per section (kept across reruns, so criteria tweaks re-solve fast)
+        # (keyed by catalog too: imported catalogs may reuse section names)
+        warm_store = st.session_state.setdefault('tab7_warm', {}).setdefault(cat_key, {})
         
-        # Update Progress
-        my_bar.progress((i + 1) / total, text=f"Solving: {section_name}...")
-
-    my_bar.empty() # Clear progress bar
+        # --- MAIN LOOP ---
+        results = solve_typical(method, Fy, E_gpa, def_val, catalog, bolt_group, warm_store,
+                                progress=lambda i, n, row: my_bar.progress((i + 1) / n, text=f"Solving: {row['Section']}..."))
+        my_bar.empty() # Clear progress bar
+    
+    details = {r['Section']: typical_geometry(catalog[r['Section']], r['Detail'])
+               for r in results if r['Status'] == "✅ PASS"}
+    pass_count = len(details)
     
     with col2:
         st.success(f"**Passed:** {pass_count}/{total}")
@@ -174,7 +105,7 @@ def render_tab7(method, Fy, E_gpa, def_val):
             st.success("**Performance:** 100% Solved")
     
     # --- DISPLAY ---
-    df = pd.DataFrame(results)
+    df = pd.DataFrame(results).drop(columns="Detail")
     
     # Styling logic for Ratio (Green/Red)
     st.dataframe(
@@ -205,3 +136,34 @@ def render_tab7(method, Fy, E_gpa, def_val):
         file_name=f"SYS_Smart_Typical_{method}.csv",
         mime="text/csv"
     )
+
+    # --- FLOOR ASSEMBLY 3D ---
+    with st.expander("🏢 Floor Assembly 3D (All Typical Details)", expanded=False):
+        copies = st.number_input("Connections per section", min_value=1, max_value=50, value=4)
+        # Built assembly kept in session_state: later reruns still show it and its downloads
+        asm_key = (cat_key, method, Fy, E_gpa, def_val, bolt_group, int(copies))
+        if st.button("Build 3D Assembly"):
+            geoms, names = [], []
+            for section_name, geom in details.items():
+                for k in range(int(copies)):
+                    geoms.append(geom)
+                    names.append(f"{section_name} #{k+1}")
+            placements = grid_placements(geoms, names, per_row=int(copies))
+            fig, lod = create_assembly_figure(placements)
+            st.session_state['tab7_assembly'] = {"key": asm_key, "placements": placements, "fig": fig,
+                                                 "lod": lod, "n": len(geoms)}
+        asm = st.session_state.get('tab7_assembly')
+        if asm is not None and asm["key"] == asm_key:
+            placements = asm["placements"]
+            lod_txt = ["Full Detail", "Simplified Bolts", "Beam + Plate Only"][asm["lod"]]
+            st.caption(f"{asm['n']} connections | Level of Detail: {lod_txt}")
+            st.plotly_chart(asm["fig"], use_container_width=True)
+            
+            # Full-detail files for offline viewers
+            dl1, dl2 = st.columns(2)
+            dl1.download_button("📥 Download Assembly glTF (.glb)",
+                                data=lambda: glb_bytes(build_assembly_meshes(placements, lod=0)[0]),
+                                file_name=f"SYS_Typical_Assembly_{method}.glb", mime="model/gltf-binary")
+            dl2.download_button("📥 Download Assembly STL",
+                                data=lambda: stl_bytes(build_assembly_meshes(placements, lod=0)[0]),
+                                file_name=f"SYS_Typical_Assembly_{method}.stl", mime="model/stl")
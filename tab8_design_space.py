@@ -0,0 +1,71 @@
+import streamlit as st
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from database import SYS_H_BEAMS
+from catalog import CACHE_HASH
+from calculator import core_calculation_vec
+from envelope import MODE_NAMES
+
+# ==========================================
+# 🗺️ DESIGN SPACE: SPAN × LOAD UTILIZATION
+# ==========================================
+@st.cache_data(show_spinner=False, max_entries=64, hash_funcs=CACHE_HASH)
+def design_space_figure(section, Fy, E_gpa, method, def_val, L_range, w_max, n_span=400, n_load=300, catalog=SYS_H_BEAMS):
+    """
+    Utilization heatmap for one section (cached per section & criteria).
+    Utilization = (superimposed load + self-weight) / governing capacity.
+    """
+    props = catalog[section]
+    x = np.linspace(L_range[0], L_range[1], n_span)
+    y = np.linspace(0, w_max, n_load)
+
+    # 1. One broadcast evaluation: capacities along the span axis, loads down the other
+    c = core_calculation_vec(x, Fy, E_gpa, props, method, def_val)
+    util = (y[:, None] + props['W']) / c['w_gov'][None, :]
+
+    # 2. Figure: utilization map + governing-mode strip
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.9, 0.1], vertical_spacing=0.03)
+    fig.add_trace(go.Heatmap(
+        x=x, y=y, z=np.minimum(util, 2.0),
+        zmin=0, zmax=2.0, colorscale=[[0, '#2c7bb6'], [0.375, '#abd9e9'], [0.5, '#ffffbf'], [0.75, '#fdae61'], [1, '#d7191c']],
+        colorbar=dict(title="Util.", len=0.85, y=0.55),
+        hovertemplate="Span: %{x:.2f} m<br>Load: %{y:,.0f} kg/m<br>Util.: %{z:.2f}<extra></extra>"
+    ), row=1, col=1)
+    fig.add_trace(go.Contour(
+        x=x, y=y, z=util,
+        contours=dict(start=0.75, end=1.0, size=0.25, coloring='lines', showlabels=True,
+                      labelfont=dict(size=12, color='black')),
+        line=dict(width=2, color='black'), showscale=False, hoverinfo='skip'
+    ), row=1, col=1)
+    fig.add_trace(go.Heatmap(
+        x=x, y=["Mode"], z=c['mode'][None, :],
+        zmin=0, zmax=2, showscale=False,
+        colorscale=[[0, '#d9534f'], [0.5, '#f0ad4e'], [1, '#5cb85c']],
+        customdata=np.array(MODE_NAMES)[c['mode']][None, :],
+        hovertemplate="Span: %{x:.2f} m<br>Governing: %{customdata}<extra></extra>"
+    ), row=2, col=1)
+
+    fig.update_layout(
+        title=dict(text=f"Utilization Map: {section} ({method}, L/{def_val})", font=dict(size=20)),
+        height=700, template="plotly_white", margin=dict(l=10, r=10, t=60, b=10)
+    )
+    fig.update_yaxes(title_text="Uniform Load (kg/m, excl. self-weight)", row=1, col=1)
+    fig.update_xaxes(title_text="Span Length (m)", row=2, col=1)
+    return fig
+
+def render_tab8(section, method, Fy, E_gpa, def_val, catalog=SYS_H_BEAMS):
+    st.markdown(f"### 🗺️ Design Space Explorer: {section}")
+    st.caption("Utilization = (Load + Self-Weight) / Governing Capacity. Contours at **0.75** and **1.00**.")
+
+    c1, c2, c3 = st.columns([2, 1, 1])
+    with c1:
+        L_range = st.slider("Span Range (m)", 0.5, 30.0, (1.0, 15.0), 0.5, key="tab8_range")
+    with c2:
+        w_max = st.number_input("Max Load (kg/m)", min_value=100, value=5000, step=500, key="tab8_wmax")
+    with c3:
+        res = st.selectbox("Resolution", ["Standard", "High"], key="tab8_res")
+    n_span, n_load = (400, 300) if res == "Standard" else (1000, 600)
+
+    fig = design_space_figure(section, Fy, E_gpa, method, def_val, tuple(L_range), float(w_max), n_span, n_load, catalog)
+    st.plotly_chart(fig, use_container_width=True)
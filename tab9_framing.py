@@ -0,0 +1,144 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from database import SYS_H_BEAMS, section_arrays, sorted_sections
+from catalog import CACHE_HASH
+from envelope import MODE_NAMES
+from framing_optimizer import BEAM_FIELDS, COMBO_FIELDS, grid_layout, optimize_layout
+from load_combos import COMPONENTS, COMPONENT_NAMES, SERVICE, combo_table
+
+MODE_COLORS = {"Shear": '#d9534f', "Moment": '#f0ad4e', "Deflection": '#5cb85c'}
+EDITOR_COLUMNS = {
+    "mark": st.column_config.TextColumn("Mark"),
+    "L_m": st.column_config.NumberColumn("Span (m)", min_value=0.5, max_value=30.0, format="%.2f"),
+    "trib_m": st.column_config.NumberColumn("Trib. Width (m)", min_value=0.0, format="%.2f"),
+    "q": st.column_config.NumberColumn("Area Load (kg/m²)", min_value=0.0, format="%d"),
+    "w_line": st.column_config.NumberColumn("Line Load (kg/m)", min_value=0.0, format="%d",
+                                            help="Walls, façade... added to q × width"),
+    **{f"q_{k}": st.column_config.NumberColumn(f"{k} (kg/m²)", format="%d", help=f"{COMPONENT_NAMES[k]} area load"
+                                               + (" (negative = uplift)" if k in ("W", "E") else ""))
+       for k in COMPONENTS},
+    "count": st.column_config.NumberColumn("Count", min_value=1, step=1, format="%d"),
+    "def_limit": st.column_config.NumberColumn("L/ (blank = sidebar)", min_value=120, step=60, format="%d"),
+    "D_max": st.column_config.NumberColumn("D max (mm)", min_value=100, format="%d",
+                                           help="Depth limit of this beam (ceiling / services)"),
+}
+
+def _floats(text):
+    return [float(v) for v in text.replace(";", ",").split(",") if v.strip()]
+
+@st.cache_data(show_spinner=False, max_entries=32, hash_funcs=CACHE_HASH)
+def framing_result(beams, Fy, E_gpa, method, def_val, max_sizes, D_min, D_max, combos=False, catalog=SYS_H_BEAMS):
+    """optimize_layout (cached per layout & criteria)"""
+    return optimize_layout(beams, Fy, E_gpa, method, def_val, max_sizes or None, catalog,
+                           D_min=D_min, D_max=D_max, combos=combos)
+
+def combo_frame(method):
+    """Combination factors of `method` (+ the service set for deflection) as a table"""
+    rows = [{"Check": "Strength", "Combination": name, **{k: fac.get(k, 0.0) for k in COMPONENTS}}
+            for name, fac in combo_table(method)]
+    if method != SERVICE:
+        rows += [{"Check": "Deflection", "Combination": name, **{k: fac.get(k, 0.0) for k in COMPONENTS}}
+                 for name, fac in combo_table(SERVICE)]
+    return pd.DataFrame(rows)
+
+def render_tab9(method, Fy, E_gpa, def_val, catalog=SYS_H_BEAMS):
+    st.markdown("### 🏢 Floor Framing Optimizer")
+    combos = st.toggle("⚖️ Load Combinations (ASCE 7)", key="tab9_combos",
+                       help="Enter unfactored D, L, Lr, S, R, W, E area loads; the governing combination is found per beam")
+    if combos:
+        st.caption(f"Lightest {method} section per beam line; component loads × tributary width (line load = "
+                   f"superimposed dead) + self-weight as D. Strength: {method} combinations; deflection: service (ASD) combinations.")
+        with st.expander(f"📋 {method} Combination Table"):
+            st.dataframe(combo_frame(method), use_container_width=True, hide_index=True)
+    else:
+        st.caption(f"Lightest {method} section per beam line; load = area load × tributary width + line load "
+                   "+ self-weight (use service loads for ASD, factored loads for LRFD).")
+
+    # --- 1. Layout ---
+    columns = list(BEAM_FIELDS) + list(COMBO_FIELDS)
+    if 'tab9_layout' not in st.session_state:
+        st.session_state['tab9_layout'] = pd.DataFrame(
+            grid_layout([8.0, 8.0, 8.0], [6.0, 9.0, 6.0], 2.5, 500.0, q_D=250.0, q_L=250.0), columns=columns)
+    with st.expander("🧱 Generate from Grid"):
+        g1, g2, g3, g4, g5 = st.columns(5)
+        bays_x = g1.text_input("Bays across beams (m)", "8, 8, 8", key="tab9_bays_x")
+        bays_y = g2.text_input("Beam spans (m)", "6, 9, 6", key="tab9_bays_y")
+        spacing = g3.number_input("Beam spacing (m)", 0.5, 10.0, 2.5, 0.25, key="tab9_spacing")
+        if combos:
+            q_D = g4.number_input("Dead D (kg/m²)", 0.0, 5000.0, 250.0, 50.0, key="tab9_qD")
+            q_L = g5.number_input("Live L (kg/m²)", 0.0, 5000.0, 250.0, 50.0, key="tab9_qL")
+            q = q_D + q_L
+        else:
+            q = g4.number_input("Area load (kg/m²)", 0.0, 5000.0, 500.0, 50.0, key="tab9_q")
+            q_D, q_L = q / 2, q / 2
+        if st.button("Generate Layout", key="tab9_generate"):
+            try:
+                beams = grid_layout(_floats(bays_x), _floats(bays_y), spacing, q, q_D=q_D, q_L=q_L)
+                st.session_state['tab9_layout'] = pd.DataFrame(beams, columns=columns)
+                st.session_state.pop('tab9_editor', None)
+            except ValueError:
+                st.error("Bays must be comma-separated numbers, e.g. `8, 8, 6`.")
+
+    shown = [c for c in columns if c not in (("q",) if combos else COMBO_FIELDS)]
+    layout = st.data_editor(st.session_state['tab9_layout'], num_rows="dynamic", use_container_width=True,
+                            column_config=EDITOR_COLUMNS, column_order=shown, key="tab9_editor")
+
+    # --- 2. Constraints ---
+    depths = section_arrays(sorted_sections(catalog), catalog)['D']
+    c1, c2 = st.columns([1, 2])
+    with c1:
+        max_sizes = st.number_input("Max distinct sizes (0 = no limit)", 0, 20, 3, key="tab9_sizes")
+    with c2:
+        d_lo, d_hi = float(depths.min()), float(depths.max())
+        D_min, D_max = st.slider("Depth range (mm)", d_lo, d_hi, (d_lo, d_hi), key="tab9_depth")
+
+    beams = [{k: (None if pd.isna(v) else v) for k, v in row.items()}
+             for row in layout.to_dict("records") if pd.notna(row.get("L_m")) and row.get("L_m", 0) > 0]
+    if not beams:
+        st.info("Add at least one beam with a span.")
+        return
+    try:
+        res = framing_result(beams, Fy, E_gpa, method, def_val, int(max_sizes), D_min, D_max, combos, catalog)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return
+
+    # --- 3. Results ---
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Total Steel", f"{res['total_kg'] / 1000:,.2f} t")
+    m2.metric("Free Choice", f"{res['free_kg'] / 1000:,.2f} t",
+              delta=f"{(res['total_kg'] - res['free_kg']) / 1000:+,.2f} t for grouping", delta_color="off")
+    m3.metric("Beams", f"{res['n_beams']:,}")
+    m4.metric("Sizes Used", len(res['sizes']))
+    if res['failed']:
+        st.error(f"No section passes: {', '.join(res['failed'])} (check loads, depth limits or deflection criteria)")
+
+    df = pd.DataFrame(res['rows'])
+    st.dataframe(df, use_container_width=True, hide_index=True, column_config={
+        "Util.": st.column_config.ProgressColumn("Util.", format="%.2f", min_value=0, max_value=1.0),
+        "W (kg/m)": st.column_config.NumberColumn(format="%.1f"),
+        "Weight (kg)": st.column_config.NumberColumn(format="%.0f"),
+        "Load (kg/m)": st.column_config.NumberColumn(format="%.0f"),
+    })
+
+    s1, s2 = st.columns([3, 2])
+    with s1:
+        ok = df[df["Weight (kg)"].notna()].assign(Length=lambda d: d["Span (m)"] * d["Count"])
+        schedule = (ok.groupby("Section", sort=False)
+                      .agg(Beams=("Count", "sum"), Length=("Length", "sum"), Weight=("Weight (kg)", "sum"))
+                      .reset_index())
+        schedule["Weight (t)"] = schedule.pop("Weight") / 1000
+        st.markdown("**Size Schedule**")
+        st.dataframe(schedule.rename(columns={"Length": "Length (m)"}), use_container_width=True, hide_index=True,
+                     column_config={"Weight (t)": st.column_config.NumberColumn(format="%.2f"),
+                                    "Length (m)": st.column_config.NumberColumn(format="%.1f")})
+    with s2:
+        fig = go.Figure(go.Bar(x=list(res['modes'].values()), y=list(MODE_NAMES), orientation='h',
+                               marker_color=[MODE_COLORS[m] for m in MODE_NAMES]))
+        fig.update_layout(title="Governing Mode (beams)", height=250, template="plotly_white",
+                          margin=dict(l=10, r=10, t=40, b=10))
+        st.plotly_chart(fig, use_container_width=True)
+
+    st.download_button("📥 Download Framing Schedule (CSV)", data=df.to_csv(index=False).encode('utf-8'),
+                       file_name=f"SYS_Framing_{method}_L{def_val}.csv", mime="text/csv", key="tab9_csv")